@@ -0,0 +1,142 @@
+"""
+Benchmark Preprocessing.aggregate_columns on a synthetic export with many aggregated groups, against the previous
+implementation (one drop and one insert per group), counting the block manager copies of each.
+
+Copies are the block manager operations allocating new column data: reindexing/taking columns (drop, column
+selection), deep copies, consolidations and concatenations, along with the number of columns copied by reindexing and
+deep copies. Inserts themselves add a block without copying, but fragment the frame until a later operation
+consolidates it.
+
+Run from the repository root:
+    python -m benchmarks.bench_column_edits --rows 5000 --groups 150 --width 4
+"""
+import argparse
+import logging
+import re
+import time
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from pandas.core.internals.managers import BlockManager
+import pandas.core.reshape.concat as reshape_concat
+
+from pyredcap import Preprocessing
+
+
+def make_project(rows: int, groups: int, width: int, seed: int = 0) -> SimpleNamespace:
+    """Flat export with ``groups`` groups of ``width`` sparse columns, each group followed by a text field."""
+    rng = np.random.default_rng(seed)
+    columns = {'record_id': np.arange(1, rows + 1)}
+    for group in range(groups):
+        for i in range(width):
+            columns[f'group{group}_{i}'] = np.where(rng.random(rows) < 0.2, f'value{i}', None)
+        columns[f'text_{group}'] = 'value'
+    df = DataFrame(columns)
+    codebook = DataFrame({'field_name': df.columns, 'field_type': 'text'})
+    return SimpleNamespace(df=df, codebook=codebook, missing_datacodes={})
+
+
+def insert_drop_aggregate(df: DataFrame, agg_map: list[dict[str, str]]) -> DataFrame:
+    """Previous implementation: one drop and one insert per group."""
+    for params in agg_map:
+        search_str = params['search_str']
+        col_name = params.get('col_name') or re.sub(r'\b[_\W]+|[_\W]+\b', '', search_str)
+        col_map = {index: col for index, col in enumerate(df.columns) if re.search(search_str, col)}
+        insert_index = next(iter(col_map.keys()))
+        sub_df = df[col_map.values()].copy().stack().reset_index(level=1, drop=True)
+        if sub_df.index.duplicated(keep=False).any():
+            sub_df = sub_df.groupby(level=0).agg(list)
+        df = df.drop(columns=col_map.values())
+        df.insert(insert_index, col_name, sub_df)
+    return df
+
+
+@contextmanager
+def count_copies(counter: Counter):
+    """Count block manager copies and PerformanceWarnings raised in the block."""
+    def reindex(self, new_axis, indexer, axis, *args, **kwargs):
+        counter['reindex'] += 1
+        if axis == 0:
+            counter['columns copied'] += len(new_axis)
+        return original_reindex(self, new_axis, indexer, axis, *args, **kwargs)
+
+    def concat(*args, **kwargs):
+        counter['concat'] += 1
+        return original_concat(*args, **kwargs)
+
+    def consolidate(self):
+        if not self.is_consolidated():
+            counter['consolidate'] += 1
+        return original_consolidate(self)
+
+    def copy(self, deep=True):
+        if deep:
+            counter['copy'] += 1
+            counter['columns copied'] += self.shape[0]
+        return original_copy(self, deep=deep)
+
+    original_reindex = BlockManager.reindex_indexer
+    original_consolidate = BlockManager._consolidate_inplace
+    original_copy = BlockManager.copy
+    original_concat = reshape_concat.concatenate_managers
+    with warnings.catch_warnings(record=True) as caught, \
+            mock.patch.object(BlockManager, 'reindex_indexer', reindex), \
+            mock.patch.object(BlockManager, '_consolidate_inplace', consolidate), \
+            mock.patch.object(BlockManager, 'copy', copy), \
+            mock.patch.object(reshape_concat, 'concatenate_managers', concat):
+        warnings.simplefilter('always', pd.errors.PerformanceWarning)
+        yield
+    counter['PerformanceWarning'] = sum(issubclass(w.category, pd.errors.PerformanceWarning) for w in caught)
+
+
+def measure(func) -> tuple[float, Counter]:
+    counter = Counter()
+    with count_copies(counter):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+    return elapsed, counter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--groups', type=int, default=150)
+    parser.add_argument('--width', type=int, default=4)
+    args = parser.parse_args()
+    # Every group holds multiple values, skip the warning of each one
+    logging.disable(logging.WARNING)
+
+    project = make_project(args.rows, args.groups, args.width)
+    agg_map = [{'search_str': f'^group{group}_'} for group in range(args.groups)]
+
+    result = {}
+
+    def staged():
+        preprocessing = Preprocessing(project)
+        preprocessing.aggregate_columns(agg_map)
+        result['staged'] = preprocessing.df
+
+    def insert_drop():
+        result['insert_drop'] = insert_drop_aggregate(project.df, agg_map)
+
+    staged_time, staged_copies = measure(staged)
+    insert_drop_time, insert_drop_copies = measure(insert_drop)
+    pd.testing.assert_frame_equal(result['staged'], result['insert_drop'])
+
+    print(f'rows: {args.rows}, groups: {args.groups}, columns per group: {args.width}')
+    keys = ['reindex', 'copy', 'consolidate', 'concat', 'columns copied', 'PerformanceWarning']
+    for name, elapsed, copies in [('insert/drop', insert_drop_time, insert_drop_copies),
+                                  ('staged', staged_time, staged_copies)]:
+        print(f'{name:12}: {elapsed:.3f}s, ' + ', '.join(f'{key}: {copies[key]}' for key in keys))
+    print(f'speedup: {insert_drop_time / staged_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark Preprocessing.decode_checkbox on a synthetic export with many checkbox fields, against the previous
+row-wise decoder (one DataFrame.apply per field and one drop/insert per field).
+
+Run from the repository root:
+    python -m benchmarks.bench_decode_checkbox --rows 20000 --fields 60 --choices 6
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from pandas import DataFrame
+
+from pyredcap import Preprocessing
+
+
+def make_project(rows: int, fields: int, choices: int, seed: int = 0) -> SimpleNamespace:
+    """Flat export with ``fields`` checkbox fields of ``choices`` options, each followed by a text field."""
+    rng = np.random.default_rng(seed)
+    columns = {'record_id': np.arange(1, rows + 1)}
+    codebook = [{'field_name': 'record_id', 'field_type': 'text', 'select_choices_or_calculations': ''}]
+    for field in range(fields):
+        field_name = f'checkbox_{field}'
+        codebook.append({
+            'field_name': field_name,
+            'field_type': 'checkbox',
+            'select_choices_or_calculations': ' | '.join(f'{c}, Choice {c}' for c in range(1, choices + 1)),
+        })
+        for choice in range(1, choices + 1):
+            columns[f'{field_name}___{choice}'] = (rng.random(rows) < 0.3).astype(int)
+        columns[f'text_{field}'] = 'value'
+    return SimpleNamespace(df=DataFrame(columns), codebook=DataFrame(codebook), missing_datacodes={})
+
+
+def rowwise_decode(df: DataFrame, codebook: DataFrame) -> DataFrame:
+    """Previous implementation: row-wise apply, one drop and insert per field."""
+    for _, field in codebook[codebook['field_type'] == 'checkbox'].iterrows():
+        choices = [pair.split(',')[0].strip() for pair in field['select_choices_or_calculations'].split('|')]
+        cols = sorted(f"{field['field_name']}___{choice}" for choice in choices)
+        insert_index = df.columns.get_loc(cols[0])
+        aux_df = df[cols].copy()
+        aux_df.columns = aux_df.columns.str.replace(field['field_name'] + '___', '')
+        decoded = aux_df.apply(lambda x: x.index[x == True].values, axis=1)  # noqa: E712
+        decoded = decoded.apply(lambda x: np.nan if len(x) == 0 else x)
+        df = df.drop(columns=cols)
+        df.insert(insert_index, field['field_name'], decoded)
+    return df
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--fields', type=int, default=60)
+    parser.add_argument('--choices', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    project = make_project(args.rows, args.fields, args.choices)
+
+    def vectorized():
+        Preprocessing(project).decode_checkbox()
+
+    vectorized_time = best_of(vectorized, args.repeat)
+    rowwise_time = best_of(lambda: rowwise_decode(project.df, project.codebook), 1)
+
+    print(f'rows: {args.rows}, checkbox fields: {args.fields}, choices: {args.choices}')
+    print(f'row-wise   : {rowwise_time:.3f}s')
+    print(f'vectorized : {vectorized_time:.3f}s')
+    print(f'speedup: {rowwise_time / vectorized_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
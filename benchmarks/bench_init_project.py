@@ -0,0 +1,41 @@
+"""
+Benchmark serial vs concurrent metadata bootstrap in REDCapProject.init_project.
+
+Run from the repository root:
+    python -m benchmarks.bench_init_project --latency 0.3
+"""
+import argparse
+import time
+
+from pyredcap import REDCapProject
+from tests.unit.mock_server import MockREDCapServer
+
+
+def time_init(url: str, max_workers: int, repeat: int) -> float:
+    """Return the best wall-clock time of ``repeat`` project instantiations."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        REDCapProject(url, 'token', max_workers=max_workers)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.3, help='Mock server latency per request (seconds)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with MockREDCapServer(latency=args.latency) as server:
+        serial = time_init(server.url, 1, args.repeat)
+        concurrent = time_init(server.url, 5, args.repeat)
+
+    print(f'latency per call: {args.latency:.3f}s')
+    print(f'serial     (max_workers=1): {serial:.3f}s')
+    print(f'concurrent (max_workers=5): {concurrent:.3f}s')
+    print(f'speedup: {serial / concurrent:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark Outliers.generate_outliers on a synthetic project with many validated fields (numbers with a range, dates
+with a minimum), checking every variant finds the same outliers:
+
+- concat: fields checked one by one (check_dtype and check_range), the whole outliers data frame being concatenated
+  with each fragment;
+- fragments: fields checked one by one, fragments concatenated once;
+- plan: compiled validation plan, the columns of each form coerced and checked at once.
+
+Time spent concatenating outliers is reported separately.
+
+Run from the repository root:
+    python -m benchmarks.bench_outliers --rows 2000 --fields 1500 --forms 5
+"""
+import argparse
+import logging
+import time
+import warnings
+from collections import Counter
+from functools import partial
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from pyredcap import Outliers
+
+
+def make_project(rows: int, fields: int, forms: int, seed: int = 0) -> SimpleNamespace:
+    """Forms with alternating number and date fields, about 5% invalid values, 5% out of range and 10% missing."""
+    rng = np.random.default_rng(seed)
+    codebook = []
+    project_forms = {}
+    for form_number in range(forms):
+        form_name = f'form{form_number}'
+        columns = {'record_id': [f'{form_number}-{i}' for i in range(rows)],
+                   'redcap_data_access_group': rng.choice(['dag_a', 'dag_b'], rows)}
+        for field in range(fields // forms):
+            field_name = f'{form_name}_field{field}'
+            if field % 2:
+                values = rng.normal(50, 20, rows).round(1).astype(str).astype(object)
+                codebook.append((field_name, form_name, 'number', '0', '100'))
+            else:
+                days = pd.to_timedelta(rng.integers(-100, 2000, rows), unit='D')
+                values = (pd.Timestamp('2018-06-01') + days).strftime('%Y-%m-%d').to_numpy(dtype=object)
+                codebook.append((field_name, form_name, 'date_dmy', '2018-01-01', ''))
+            values[rng.random(rows) < 0.05] = 'invalid'
+            values[rng.random(rows) < 0.1] = np.nan
+            columns[field_name] = values
+        columns[f'{form_name}_complete'] = rng.choice([0, 1, 2], rows)
+        project_forms[form_name] = DataFrame(columns)
+
+    codebook = DataFrame(codebook, columns=['field_name', 'form_name', 'text_validation_type_or_show_slider_number',
+                                           'text_validation_min', 'text_validation_max'])
+    codebook['field_type'] = 'text'
+    codebook['field_annotation'] = ''
+    codebook['required_field'] = ''
+    codebook['branching_logic'] = ''
+    return SimpleNamespace(forms=project_forms, codebook=codebook)
+
+
+class PerFieldOutliers(Outliers):
+    """Previous validation: validation_df filtered for each field, checked by check_dtype and check_range."""
+
+    def validate_form(self, form: DataFrame, form_name: str, fields: list[dict]) -> None:
+        form_name_mask = self.validation_df['form_name'] == form_name
+        for column in self.validation_df[form_name_mask]['field_name']:
+            field_name_mask = self.validation_df['field_name'] == column
+            field_info = self.validation_df[field_name_mask].to_dict(orient='records')[0]
+            if column in self.cols_to_validate['numeric_cols']:
+                self.check_dtype(form, column, form_name, 'numeric')
+                self.check_range(form, column, form_name, 'numeric', field_info['min'], field_info['max'])
+            elif column in self.cols_to_validate['date_cols']:
+                self.check_dtype(form, column, form_name, 'date')
+                self.check_range(form, column, form_name, 'date', field_info['min'], field_info['max'])
+
+
+class ConcatOutliers(PerFieldOutliers):
+    """Previous accumulation: the outliers data frame is concatenated with each fragment."""
+
+    def update_outliers_df(self, df, column, form_name, invalid_records, reason_desc) -> None:
+        outliers = self.th.process_invalid_records(df, column, form_name, invalid_records, reason_desc)
+        if not self.outliers_df.empty and not outliers.empty:
+            self.outliers_df = pd.concat([self.outliers_df, outliers], ignore_index=True)
+        elif not outliers.empty:
+            self.outliers_df = outliers
+
+
+def timed_concat(concat, counter: Counter, *args, **kwargs):
+    """Call concat, counting the calls and the time spent in counter."""
+    start = time.perf_counter()
+    result = concat(*args, **kwargs)
+    counter['calls'] += 1
+    counter['seconds'] += time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--fields', type=int, default=1500)
+    parser.add_argument('--forms', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    # Date parsing falls back to dateutil on invalid values
+    warnings.simplefilter('ignore')
+
+    results = {}
+    timings = {}
+    concats = {}
+    variants = [('concat', ConcatOutliers), ('fragments', PerFieldOutliers), ('plan', Outliers)]
+    for name, outliers_class in variants:
+        out = outliers_class(make_project(args.rows, args.fields, args.forms))
+        counter = Counter()
+        with mock.patch.object(pd, 'concat', partial(timed_concat, pd.concat, counter)):
+            start = time.perf_counter()
+            out.generate_outliers(filter_incomplete=False)
+            timings[name] = time.perf_counter() - start
+        results[name] = out.outliers_df
+        concats[name] = counter
+
+    pd.testing.assert_frame_equal(results['fragments'], results['concat'])
+    pd.testing.assert_frame_equal(results['plan'], results['concat'])
+    print(f'rows: {args.rows}, fields: {args.fields}, forms: {args.forms}, outliers: {len(results["concat"])}')
+    for name, _ in variants:
+        print(f"{name:9}: {timings[name]:.3f}s ({timings['concat'] / timings[name]:.1f}x), "
+              f"{concats[name]['calls']} concat calls taking {concats[name]['seconds']:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark parse time and peak memory of a records export with each parse engine.
+
+A synthetic CSV export (integers, decimals, coded values, free text and blanks) is written to a temporary file, then
+each engine runs in a fresh process that loads the raw bytes (as ``response.content``) and parses them:
+    text     - legacy path, pd.read_csv(StringIO(response.text))
+    pandas   - ParseHandler('pandas'), pandas C parser reading the bytes
+    pyarrow  - ParseHandler('pyarrow'), multithreaded pyarrow reader with Arrow-backed dtypes
+
+Run from the repository root (the default size needs several GB of RAM):
+    python -m benchmarks.bench_parse_engine --rows 200000 --cols 1500
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from pyredcap.handlers.parse_handler import ParseHandler
+
+
+def make_export(path: str, rows: int, cols: int, seed: int = 0) -> None:
+    """Write a synthetic flat CSV export, generated in row blocks to bound memory."""
+    rng = np.random.default_rng(seed)
+    header = ['record_id'] + [f'field_{i}' for i in range(cols - 1)]
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(','.join(header) + '\n')
+        for start in range(0, rows, 10_000):
+            n_rows = min(10_000, rows - start)
+            block = {'record_id': np.arange(start, start + n_rows)}
+            for i in range(cols - 1):
+                kind = i % 4
+                if kind == 0:
+                    values = rng.integers(0, 1000, n_rows).astype(float)
+                elif kind == 1:
+                    values = rng.random(n_rows).round(2)
+                elif kind == 2:
+                    values = rng.choice(['1', '2', '3', '99'], n_rows).astype(object)
+                else:
+                    values = rng.choice(['texto livre', 'outro valor', 'NI'], n_rows).astype(object)
+                values[rng.random(n_rows) < 0.3] = np.nan
+                block[f'field_{i}'] = values
+            pd.DataFrame(block).to_csv(file, header=False, index=False)
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of the current process, in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_engine(path: str, engine: str, queue) -> None:
+    """Parse the export with one engine and report (seconds, peak RSS increase in MB, DataFrame MB)."""
+    with open(path, 'rb') as file:
+        content = file.read()
+    baseline = max_rss_mb()
+
+    start = time.perf_counter()
+    if engine == 'text':
+        df = pd.read_csv(StringIO(content.decode('utf-8')), low_memory=False)
+    else:
+        df = ParseHandler(engine).read_records(content)
+    elapsed = time.perf_counter() - start
+
+    queue.put((elapsed, max_rss_mb() - baseline, df.memory_usage(deep=True).sum() / 1024 ** 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--cols', type=int, default=1_500)
+    parser.add_argument('--engines', nargs='+', default=['text', 'pandas', 'pyarrow'])
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'export.csv')
+        make_export(path, args.rows, args.cols)
+        print(f'export: {args.rows} rows x {args.cols} columns, {os.path.getsize(path) / 1024 ** 2:.1f} MB')
+        print(f'{"engine":<10}{"parse (s)":>12}{"peak RSS (MB)":>16}{"DataFrame (MB)":>16}')
+        for engine in args.engines:
+            queue = context.Queue()
+            process = context.Process(target=run_engine, args=(path, engine, queue))
+            process.start()
+            elapsed, peak, size = queue.get()
+            process.join()
+            print(f'{engine:<10}{elapsed:>12.2f}{peak:>16.1f}{size:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
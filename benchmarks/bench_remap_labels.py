@@ -0,0 +1,90 @@
+"""
+Benchmark DataCleaning.remap_categorical_labels on a synthetic form with many coded fields, against the previous
+implementation (``Series.apply`` of ``TransformerHandler.replace_label`` on each column), and with categorical output.
+
+Coded fields are radio fields (numeric codes, some missing or out of the codebook) and decoded checkbox fields
+(lists of codes).
+
+Run from the repository root:
+    python -m benchmarks.bench_remap_labels --rows 100000 --fields 200 --checkbox-fields 20
+"""
+import argparse
+import logging
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from pyredcap import DataCleaning
+from pyredcap.handlers.transformer_handler import TransformerHandler
+
+
+def make_form(rows: int, fields: int, checkbox_fields: int, seed: int = 0) -> tuple[DataFrame, dict]:
+    """Form with ``fields`` radio fields of 5 choices and ``checkbox_fields`` decoded checkbox fields."""
+    rng = np.random.default_rng(seed)
+    mapping = {str(code): f'label {code}' for code in range(1, 6)}
+    columns = {'record_id': np.arange(1, rows + 1).astype(str)}
+    for field in range(fields):
+        # Codes 1-5 from the codebook, 9 out of it, 10% missing
+        codes = rng.choice([1.0, 2.0, 3.0, 4.0, 5.0, 9.0], rows)
+        codes[rng.random(rows) < 0.1] = np.nan
+        columns[f'radio_{field}'] = codes
+    choices = np.array(list(mapping), dtype=object)
+    for field in range(checkbox_fields):
+        sizes = rng.integers(0, 3, rows)
+        columns[f'checkbox_{field}'] = [list(rng.choice(choices, size, replace=False)) if size else np.nan
+                                        for size in sizes]
+    df = DataFrame(columns)
+    label_map = {col: mapping for col in df.columns if col != 'record_id'}
+    return df, {'codebook': [], 'outliers': {}, 'raw_label_map': label_map}
+
+
+def apply_remap(df: DataFrame, label_map: dict[str, dict]) -> DataFrame:
+    """Previous implementation: one Series.apply per column."""
+    df = df.copy()
+    for col, mapping in label_map.items():
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            values = values.dropna().astype(int).astype(str).reindex(values.index)
+        df[col] = values.apply(partial(TransformerHandler.replace_label, mapping=mapping))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--fields', type=int, default=200)
+    parser.add_argument('--checkbox-fields', type=int, default=20)
+    args = parser.parse_args()
+    # Unmapped codes are logged for each field
+    logging.disable(logging.WARNING)
+
+    df, metadata = make_form(args.rows, args.fields, args.checkbox_fields)
+
+    start = time.perf_counter()
+    expected = apply_remap(df, metadata['raw_label_map'])
+    apply_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = DataCleaning('form', df.copy(), metadata, {'remap_categorical_labels': None}).df
+    vectorized_time = time.perf_counter() - start
+    pd.testing.assert_frame_equal(result, expected)
+
+    start = time.perf_counter()
+    result = DataCleaning('form', df.copy(), metadata, {'remap_categorical_labels': {'categorical': True}}).df
+    categorical_time = time.perf_counter() - start
+    pd.testing.assert_frame_equal(result.astype(object), expected.astype(object))
+
+    memory = {name: frame.memory_usage(deep=True).sum() / 1024 ** 2
+              for name, frame in [('object', expected), ('categorical', result)]}
+    print(f'rows: {args.rows}, radio fields: {args.fields}, checkbox fields: {args.checkbox_fields}')
+    print(f'apply      : {apply_time:.3f}s')
+    print(f'vectorized : {vectorized_time:.3f}s ({apply_time / vectorized_time:.1f}x)')
+    print(f'categorical: {categorical_time:.3f}s ({apply_time / categorical_time:.1f}x)')
+    print(f"memory: {memory['object']:.1f} MB object, {memory['categorical']:.1f} MB categorical")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark the substitution of "other" values in decoded checkbox fields (DataCleaning.replace_other_columns), against
+the previous implementation (``TransformerHandler.replace_array_item`` on each row, one ``.loc`` lookup per item),
+at growing form sizes.
+
+Run from the repository root:
+    python -m benchmarks.bench_replace_other --rows 10000 20000 40000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from pyredcap.handlers.transformer_handler import TransformerHandler
+
+
+def make_form(rows: int, seed: int = 0) -> DataFrame:
+    """Checkbox field of 5 choices, '9' being "other", with its free text field."""
+    rng = np.random.default_rng(seed)
+    choices = np.array(['1', '2', '3', '4', '9'], dtype=object)
+    sizes = rng.integers(0, 4, rows)
+    return DataFrame({
+        'sintomas': [list(rng.choice(choices, size, replace=False)) if size else np.nan for size in sizes],
+        'sintomas_outro': [f'Sintoma {i % 100}' for i in range(rows)],
+    }, index=rng.permutation(rows))
+
+
+def per_row(df: DataFrame) -> list:
+    """Previous implementation."""
+    df = df.copy()
+    df['sintomas_outro'] = df['sintomas_outro'].apply(lambda x: x.lower() if isinstance(x, str) else x)
+    return [TransformerHandler.replace_array_item(index, value, df, 'sintomas_outro', '9')
+            for index, value in df['sintomas'].items()]
+
+
+def vectorized(df: DataFrame) -> list:
+    other_values = TransformerHandler.lower_strings(df['sintomas_outro'])
+    return TransformerHandler.replace_list_items(df['sintomas'], other_values, '9').tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 20_000, 40_000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        df = make_form(rows)
+        timings = {}
+        results = {}
+        for name, func in [('per row', per_row), ('vectorized', vectorized)]:
+            start = time.perf_counter()
+            results[name] = func(df)
+            timings[name] = time.perf_counter() - start
+        pd.testing.assert_series_equal(pd.Series(results['vectorized']), pd.Series(results['per row']))
+        print(f"rows: {rows:>7}, per row: {timings['per row']:.3f}s, vectorized: {timings['vectorized']:.3f}s "
+              f"({timings['per row'] / timings['vectorized']:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
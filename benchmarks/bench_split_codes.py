@@ -0,0 +1,90 @@
+"""
+Benchmark DataCleaning.split_code_descrpition on synthetic diagnosis columns (CID-10, OMIM and ORPHA codes with their
+descriptions, drawn from a catalog of diagnoses), against the previous implementation
+(``TransformerHandler.extract_ids_and_descriptions`` on each row, then one pass per output column).
+
+Run from the repository root:
+    python -m benchmarks.bench_split_codes --rows 200000 --catalog 5000
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from pyredcap import DataCleaning
+from pyredcap.handlers.transformer_handler import TransformerHandler
+
+COLUMNS = [
+    {'column': 'doenca_cid10', 'code_name': 'codigo_cid10', 'desc_name': 'descricao_cid10',
+     'filter_pattern': r'(?:CID-10|CID10)?\s*-\s*([A-Z]\d{2}(?:\.\d{1}|\.\d\+|\.\d\*|\d{3}[+*][^\s]+)?)(?=\s*-\s*|$)'},
+    {'column': 'doenca_omim', 'code_name': 'codigo_omim', 'desc_name': 'descricao_omim',
+     'filter_pattern': r'(?<=- )\d{6}(?= -|$)'},
+    {'column': 'doenca_orpha', 'code_name': 'codigo_orpha', 'desc_name': 'descricao_orpha',
+     'filter_pattern': r'ORPHA\s*-\s*((?:\d{1,6}(?:\.\d)?(?:\s*-\s*\d{3,6}(?:\.\d)?)*)?)'},
+]
+
+
+def make_form(rows: int, catalog: int, seed: int = 0) -> DataFrame:
+    """Diagnoses drawn from a catalog of ``catalog`` entries per column, 20% missing."""
+    rng = np.random.default_rng(seed)
+    letters = rng.choice(list('ABCDEGQ'), catalog)
+    cid10 = [f'CID10 - {letter}{number}.{digit} - Doença  de teste {i}' for i, (letter, number, digit) in
+             enumerate(zip(letters, rng.integers(10, 100, catalog), rng.integers(0, 10, catalog)))]
+    omim = [f'OMIM - {code} - Síndrome de teste {i}' for i, code in enumerate(rng.integers(100000, 999999, catalog))]
+    orpha = [f'ORPHA - {code} - Doença rara de teste {i}' for i, code in enumerate(rng.integers(1, 99999, catalog))]
+    df = DataFrame({'record_id': np.arange(rows).astype(str)})
+    for column, values in [('doenca_cid10', cid10), ('doenca_omim', omim), ('doenca_orpha', orpha)]:
+        df[column] = rng.choice(np.array(values, dtype=object), rows)
+        df.loc[rng.random(rows) < 0.2, column] = np.nan
+    return df
+
+
+def per_row_split(df: DataFrame) -> DataFrame:
+    """Previous implementation."""
+    df = df.copy()
+    for params in COLUMNS:
+        column, code_name, desc_name = params['column'], params['code_name'], params['desc_name']
+        pattern = params['filter_pattern']
+        extracted = df[column].dropna().apply(lambda x, p=pattern: TransformerHandler.extract_ids_and_descriptions(
+            x, p)).dropna()
+        code = extracted.apply(lambda x: x[0].strip())
+        description = extracted.apply(lambda x: x[1].strip())
+        try:
+            code = code.astype(float).astype('Int64')
+        except ValueError:
+            pass
+        column_index = df.columns.get_loc(column)
+        df.insert(column_index + 1, code_name, code)
+        df.insert(column_index + 2, desc_name, description)
+        df = df.drop(columns=column)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--catalog', type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    df = make_form(args.rows, args.catalog)
+    metadata = {'codebook': [], 'raw_label_map': {}, 'outliers': {}}
+
+    start = time.perf_counter()
+    expected = per_row_split(df)
+    per_row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = DataCleaning('diagnostico', df.copy(), metadata, {'split_code_descrpition': COLUMNS}).df
+    batch_time = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(result, expected)
+    print(f'rows: {args.rows}, columns: {len(COLUMNS)}, distinct values per column: {args.catalog}')
+    print(f'per row: {per_row_time:.3f}s, vectorized: {batch_time:.3f}s ({per_row_time / batch_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark the batch CPF and CNS validators (TransformerHandler.validate_cpf_batch/validate_cns_batch) against
+``Series.apply`` of the scalar functions, in identifiers per second, checking both agree.
+
+Identifiers are a mix of valid numbers, formatted ones (CPF) and mistyped ones.
+
+Run from the repository root:
+    python -m benchmarks.bench_validate_ids --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from pandas import Series
+
+from pyredcap.handlers.transformer_handler import TransformerHandler
+
+
+def make_cpf(rows: int, rng: np.random.Generator) -> Series:
+    digits = rng.integers(0, 10, (rows, 11))
+    digits[:, 9] = (digits[:, :9] @ np.arange(10, 1, -1) * 10 % 11) % 10
+    digits[:, 10] = (digits[:, :10] @ np.arange(11, 1, -1) * 10 % 11) % 10
+    # 10% mistyped
+    mistyped = rng.random(rows) < 0.1
+    digits[mistyped, 4] = (digits[mistyped, 4] + 1) % 10
+    values = Series(digits.astype(str).tolist()).str.join('')
+    # 30% formatted as 000.000.000-00
+    formatted = rng.random(rows) < 0.3
+    values[formatted] = values[formatted].str.replace(r'(\d{3})(\d{3})(\d{3})(\d{2})', r'\1.\2.\3-\4', regex=True)
+    return values
+
+
+def make_cns(rows: int, rng: np.random.Generator) -> Series:
+    digits = rng.integers(0, 10, (rows, 15))
+    digits[:, 0] = rng.choice([1, 2, 7, 8, 9], rows)
+    pis = digits[:, 0] <= 2
+    remainder = digits[pis, :11] @ np.arange(15, 4, -1) % 11
+    digits[pis, 11:14] = 0
+    digits[pis, 14] = (11 - remainder) % 11 % 10
+    return Series(digits.astype(str).tolist()).str.join('')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f'rows: {args.rows}')
+    for name, values, scalar, batch in [
+        ('CPF', make_cpf(args.rows, rng), TransformerHandler.validate_cpf, TransformerHandler.validate_cpf_batch),
+        ('CNS', make_cns(args.rows, rng), TransformerHandler.validate_cns, TransformerHandler.validate_cns_batch),
+    ]:
+        start = time.perf_counter()
+        expected = values.apply(scalar)
+        apply_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        valid, normalized = batch(values)
+        batch_time = time.perf_counter() - start
+
+        pd.testing.assert_series_equal(valid, expected.notna())
+        pd.testing.assert_series_equal(normalized, expected.astype(object))
+        print(f'{name}: apply {args.rows / apply_time:,.0f}/s, batch {args.rows / batch_time:,.0f}/s '
+              f'({apply_time / batch_time:.1f}x), {valid.mean():.0%} valid')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,16 @@
 import logging
 import re
 from functools import partial
-from typing import Literal
+from typing import Callable, Literal
 
 import numpy as np
 import pandas as pd
-from pandas import DataFrame, Index
+from pandas import DataFrame, Index, Series
 
+from pyredcap.handlers.checkbox_handler import CheckboxHandler
+from pyredcap.handlers.column_handler import ColumnHandler
+from pyredcap.handlers.metadata_handler import MetadataSnapshot
+from pyredcap.handlers.plan_handler import PlanHandler
 from pyredcap.handlers.transformer_handler import TransformerHandler
 
 
@@ -20,10 +24,15 @@ class DataCleaning:
         The name of the form to be processed.
     df : DataFrame
         The DataFrame containing the form data.
-    metadata : dict
-        A dictionary containing the form metadata.
+    metadata : MetadataSnapshot | dict
+        The project metadata snapshot (``REDCapProject.get_metadata_snapshot``), or the dictionary returned by
+        ``REDCapProject.get_metadata``.
     instructions : dict[str, any], optional
         A dictionary containing the instructions to be executed.
+    plan : bool, optional
+        Whether to run the instructions through the instruction planner (see ``PlanHandler``), which skips
+        column-wise steps on columns dropped later and fuses consecutive column-wise steps in a single pass.
+        Defaults to False.
 
     Attributes
     ----------
@@ -34,35 +43,106 @@ class DataCleaning:
     codebook : DataFrame
         The DataFrame containing the form codebook.
     outliers : dict
-        A dictionary containing the outliers for each form.
+        The outliers found in the form, with the same keys as the project outliers.
     raw_label_map : dict
         A dictionary containing the raw label mapping for each form.
+    checkbox_choices : dict[str, list[str] | None]
+        The choice table of checkbox bitmask columns, fields expanded back to lists are mapped to None.
     instructions : dict
         A dictionary containing the instructions to be executed.
     other_columns_map : dict
         A dictionary containing the mapping of "other" columns with the parent columns.
     """
 
+    # Default mapping of remap_boolean_labels
+    BOOL_MAP = {
+        '0': 0,
+        'não': 0,
+        'nao': 0,
+        '1': 1,
+        'sim': 1,
+        'nao_se_aplica': np.nan,
+        'não se aplica': np.nan,
+    }
+
     def __init__(
             self,
             form_name: str,
             df: DataFrame,
-            metadata: dict,
-            instructions: dict[str, any] = None
+            metadata: MetadataSnapshot | dict,
+            instructions: dict[str, any] = None,
+            plan: bool = False
     ):
         self.form_name = form_name
         self.df = df
-        self.codebook = pd.DataFrame(metadata['codebook'])
+        # The snapshot codebook is shared with the project, it is only read here
+        self.codebook = (metadata.codebook if isinstance(metadata, MetadataSnapshot)
+                         else pd.DataFrame(metadata['codebook']))
         self.raw_label_map = metadata['raw_label_map']
+        self.checkbox_choices: dict[str, list[str] | None] = dict(metadata.get('checkbox_choices') or {})
         self.instructions = instructions
 
-        self.outliers = metadata['outliers']
+        # Outliers found in this form only, merged into the project outliers with REDCapProject.update_outliers
+        self.outliers = {key: type(value)() for key, value in metadata['outliers'].items()}
         self.other_columns_map = {}
 
         self.th = TransformerHandler()
-        if instructions:
+        if instructions and plan:
+            PlanHandler.run_instructions(self, self.instructions)
+        elif instructions:
             self.th.run_instructions(self, self.instructions)
 
+    def column_operations(
+            self,
+            method_name: str,
+            params: dict[str, any]
+    ) -> list[tuple[str, Callable[[Series], Series], bool]] | None:
+        """
+        Per-column operations of a column-wise instruction, used by the instruction planner.
+
+        Column-wise instructions (normalize_string, remap_boolean_labels, remap_categorical_labels and
+        enforce_dtype) transform the values of each column on their own, from the column values only.
+
+        Parameters
+        ----------
+        method_name : str
+            The name of the instruction method.
+        params : dict[str, any]
+            The instruction parameters, bound to the method signature (defaults included).
+
+        Returns
+        -------
+        list[tuple[str, Callable[[Series], Series], bool]] | None
+            The (column, function, prunable) operations of the instruction, in order, or None if the instruction
+            is not column-wise. Prunable operations have no effect besides the column values, so they can be skipped
+            on columns dropped later.
+        """
+        if method_name == 'normalize_string':
+            columns = [params['columns']] if isinstance(params['columns'], str) else params['columns']
+            return [(col, partial(self._normalize_string_values, method=params['method']), True)
+                    for col in columns]
+
+        if method_name == 'remap_boolean_labels':
+            columns = [params['columns']] if isinstance(params['columns'], str) else params['columns']
+            return [(col, partial(self._remap_boolean_values, col, bool_map=params['bool_map']), True)
+                    for col in columns]
+
+        if method_name == 'remap_categorical_labels':
+            columns = params['columns'] or self.raw_label_map.keys()
+            # Bitmask columns map their choice table, which outlives the column
+            return [(col, partial(self._remap_categorical_values, col, categorical=params['categorical']),
+                     self.checkbox_choices.get(col) is None)
+                    for col in columns if col in self.df.columns]
+
+        if method_name == 'enforce_dtype':
+            if not set(params['dtype_map'].keys()).issubset(['Int64', 'Float64', 'datetime']):
+                raise ValueError('Invalid dtype_map keys')
+            # Invalid values are stored as outliers, even for columns dropped later
+            return [(col, partial(self._enforce_dtype_values, col, dtype=dtype), False)
+                    for dtype, columns in params['dtype_map'].items() for col in columns]
+
+        return None
+
     def remove_duplicates(
             self,
             column: str,
@@ -213,7 +293,8 @@ class DataCleaning:
         -----
         This method normalizes the other column values to lowercase and gets the other value from the raw_label_map.
         If the other value does not contain the other_columns_search_str, the column is skipped.
-        If there are arrays in the column values, the replace_array_item method is used to replace the array items.
+        If there are arrays in the column values, the matching array items are replaced by the replace_list_items
+        method.
         In the general case, the values in the column are replaced with the values from the other column if they
         match the other value.
         """
@@ -226,8 +307,13 @@ class DataCleaning:
 
         for column, other_column in mapping.items():
 
+            # Bitmask columns are expanded to lists, the other value is specific to each row
+            if self.checkbox_choices.get(column) is not None:
+                self.df[column] = CheckboxHandler.to_lists(self.df[column], self.checkbox_choices[column])
+                self.checkbox_choices[column] = None
+
             # Normalize other column values
-            self.df[other_column] = self.df[other_column].apply(lambda x: x.lower() if isinstance(x, str) else x)
+            self.df[other_column] = self.th.lower_strings(self.df[other_column])
             # Get other value from raw_label_map
             other_value = list(self.raw_label_map[column].keys())[-1].lower()
 
@@ -236,9 +322,8 @@ class DataCleaning:
                                 other_column, other_value)
 
             # Case when there are arrays in the column values
-            if (self.df[column].dropna().apply(isinstance, args=((list, np.ndarray),))).any():
-                self.df[column] = [self.th.replace_array_item(index, value, self.df, other_column, other_value)
-                                   for index, value in self.df[column].items()]
+            if self.th.list_mask(self.df[column]).any():
+                self.df[column] = self.th.replace_list_items(self.df[column], self.df[other_column], other_value)
             # General case
             else:
                 self.df[column] = np.where(
@@ -273,60 +358,85 @@ class DataCleaning:
             If the dtype of the column is not 'object'.
         """
 
-        if bool_map is None:
-            bool_map = {
-                '0': 0,
-                'não': 0,
-                'nao': 0,
-                '1': 1,
-                'sim': 1,
-                'nao_se_aplica': np.nan,
-                'não se aplica': np.nan,
-            }
-
         if isinstance(columns, str):
             columns = [columns]
 
         for col in columns:
-            if pd.api.types.is_numeric_dtype(self.df[col]):
-                raise ValueError(f'Column {col} is not of object type, it is already a numeric type.')
+            self.df[col] = self._remap_boolean_values(col, self.df[col], bool_map)
 
-            non_empty_values = self.df[col].dropna().count()
+    def _remap_boolean_values(self, col: str, values: Series, bool_map: dict = None) -> Series:
+        if bool_map is None:
+            bool_map = self.BOOL_MAP
+
+        if pd.api.types.is_numeric_dtype(values):
+            raise ValueError(f'Column {col} is not of object type, it is already a numeric type.')
 
-            self.df[col] = (self.df[col]
-                            .dropna()
-                            .str.lower()
-                            .map(bool_map)
-                            .infer_objects(copy=False)
-                            .astype('Int64')
-                            )
+        non_empty_values = values.dropna().count()
 
-            new_non_empty_values = self.df[col].dropna().count()
-            if non_empty_values != new_non_empty_values:
-                logging.warning('Column %s: %s values were lost in the remapping.',
-                                col, non_empty_values - new_non_empty_values)
+        values = (values
+                  .dropna()
+                  .str.lower()
+                  .map(bool_map)
+                  .infer_objects(copy=False)
+                  .astype('Int64')
+                  )
 
-    def remap_categorical_labels(self, columns: list[str] = None) -> None:
+        new_non_empty_values = values.dropna().count()
+        if non_empty_values != new_non_empty_values:
+            logging.warning('Column %s: %s values were lost in the remapping.',
+                            col, non_empty_values - new_non_empty_values)
+        return values
+
+    def remap_categorical_labels(self, columns: list[str] = None, categorical: bool = False) -> None:
         """
         Remaps the categorical labels in the specified columns of the DataFrame.
 
         This method replaces the categorical labels in the DataFrame with their respective integer values.
-        The mapping of labels to integers is defined in the raw_label_map attribute.
+        The mapping of labels to integers is defined in the raw_label_map attribute. Values missing from the
+        mapping are kept. Columns are mapped at once (see ``TransformerHandler.replace_labels``), lists of
+        decoded checkbox fields included.
 
         Parameters
         ----------
         columns : list[str], optional
             The list of column names to remap. If not provided, the method will use the keys from the
             raw_label_map attribute.
+        categorical : bool, optional
+            Whether to return scalar columns as pandas Categorical, with the codebook labels as categories
+            (in codebook order) followed by the unmapped values. Columns holding lists are kept as lists.
+            Defaults to False.
         """
         columns = columns or self.raw_label_map.keys()
         for col in columns:
             if col in self.df.columns:
-                mapping: dict = self.raw_label_map.get(col, {})
-                # Convert categorical column to object if it's a numeric type
-                if pd.api.types.is_numeric_dtype(self.df[col]):
-                    self.df[col] = self.df[col].dropna().astype(int).astype(str)
-                self.df[col] = self.df[col].apply(partial(self.th.replace_label, mapping=mapping))
+                self.df[col] = self._remap_categorical_values(col, self.df[col], categorical)
+
+    def _remap_categorical_values(self, col: str, values: Series, categorical: bool = False) -> Series:
+        mapping: dict = self.raw_label_map.get(col, {})
+        # Bitmask columns only map their choice table
+        if self.checkbox_choices.get(col) is not None:
+            self.checkbox_choices[col] = CheckboxHandler.map_labels(self.checkbox_choices[col], mapping)
+            return values
+        # Convert categorical column to object if it's a numeric type
+        if pd.api.types.is_numeric_dtype(values):
+            # Convert each distinct value once
+            codes, uniques = pd.factorize(values)
+            uniques = np.array(uniques.astype(int).astype(str).tolist() + [np.nan], dtype=object)
+            values = Series(uniques[codes], index=values.index, name=values.name)
+        values = self.th.replace_labels(values, mapping)
+        if not categorical or isinstance(values.dtype, pd.CategoricalDtype):
+            return values
+
+        non_empty = values.dropna()
+        if self.th.list_mask(non_empty).any():
+            logging.warning('Column %s holds lists, keeping it as lists.', col)
+            return values
+        labels = list(dict.fromkeys(mapping.values()))
+        label_set = set(labels)
+        unmapped = [value for value in non_empty.unique() if value not in label_set]
+        if unmapped:
+            logging.warning('Column %s: values missing from the codebook added as categories: %s', col, unmapped)
+        return values.astype(pd.CategoricalDtype(labels + unmapped))
 
     def normalize_string(
             self, columns: list[str],
@@ -355,17 +465,21 @@ class DataCleaning:
             columns = [columns]
 
         for col in columns:
-            method_map = {
-                'lower': self.df[col].str.lower,
-                'upper': self.df[col].str.upper,
-                'title': self.df[col].str.title,
-                'capitalize': self.df[col].str.capitalize
-            }
+            self.df[col] = self._normalize_string_values(self.df[col], method)
+
+    @staticmethod
+    def _normalize_string_values(values: Series, method: str) -> Series:
+        method_map = {
+            'lower': values.str.lower,
+            'upper': values.str.upper,
+            'title': values.str.title,
+            'capitalize': values.str.capitalize
+        }
 
-            if method not in method_map:
-                raise ValueError(f'Invalid method {method}')
+        if method not in method_map:
+            raise ValueError(f'Invalid method {method}')
 
-            self.df[col] = method_map[method]()
+        return method_map[method]()
 
     def enforce_dtype(self, dtype_map: dict[str, list[str]]) -> None:
         """
@@ -391,19 +505,22 @@ class DataCleaning:
 
         for dtype, columns in dtype_map.items():
             for col in columns:
-                if dtype == 'datetime':
-                    self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
-                else:
-                    try:
-                        self.df[col] = self.df[col].astype(dtype, errors='raise')
-                    except ValueError:
-                        logging.error('Error when trying to convert column %s to %s. Attempting to fix.',
-                                      col, dtype)
-                        # Check numeric digits and get ouliters
-                        valid_values, invalid_records = self._check_numeric(col)
-                        self.df[col] = valid_values.astype(dtype, errors='raise')
-                        # Store outliers
-                        self.outliers['invalid_records'][col] = invalid_records
+                self.df[col] = self._enforce_dtype_values(col, self.df[col], dtype)
+
+    def _enforce_dtype_values(self, col: str, values: Series, dtype: str) -> Series:
+        if dtype == 'datetime':
+            return pd.to_datetime(values, errors='coerce')
+        try:
+            return values.astype(dtype, errors='raise')
+        except ValueError:
+            logging.error('Error when trying to convert column %s to %s. Attempting to fix.',
+                          col, dtype)
+            # Check numeric digits and get ouliters
+            valid_values, invalid_records = self._check_numeric(col, values)
+            values = valid_values.astype(dtype, errors='raise')
+            # Store outliers
+            self.outliers['invalid_records'][col] = invalid_records
+            return values
 
     def rename_features(self, mapping: dict[str, str]) -> None:
         """
@@ -487,12 +604,14 @@ class DataCleaning:
 
         self.other_columns_map = mapping
 
-    def _check_numeric(self, column) -> tuple[pd.Series, list]:
-        is_numeric = self.df[column].dropna().str.isnumeric()
+    def _check_numeric(self, column, values: Series = None) -> tuple[pd.Series, list]:
+        if values is None:
+            values = self.df[column]
+        is_numeric = values.dropna().str.isnumeric()
 
         # Use the mask to get the valid and invalid values
-        valid_values = self.df[column].dropna()[is_numeric]
-        invalid_indexes = self.df[column].dropna()[~is_numeric].index
+        valid_values = values.dropna()[is_numeric]
+        invalid_indexes = values.dropna()[~is_numeric].index
         invalid_records = self.df.loc[invalid_indexes, 'record_id'].tolist()
 
         if invalid_records.any():
@@ -574,23 +693,29 @@ class DataCleaning:
                 * self.df[age_unit_column].replace(age_unit_map).infer_objects(copy=False)
         ).astype('Int64')
 
-        # Insert  new values
-        column_index = self.df.columns.get_loc(age_column)
-        self.df.insert(column_index + 1, new_column, recalculated_values)
-
-        self.df = self.df.drop(columns=[age_column, age_unit_column])
+        # Insert new values and drop the source columns at once
+        staged = ColumnHandler(self.df)
+        staged.insert(staged.get_loc(age_column) + 1, new_column, recalculated_values)
+        staged.drop([age_column, age_unit_column])
+        self.df = staged.commit()
 
     def split_code_descrpition(self, *args):
-        """Helper method to apply the split_code_descrpition method to multiple columns."""
+        """
+        Helper method to apply the split_code_descrpition method to multiple columns,
+        columns are edited once for all of them.
+        """
+        staged = ColumnHandler(self.df)
         for kwargs in args:
-            self.apply_split_code_descrpition(**kwargs)
+            self.apply_split_code_descrpition(**kwargs, staged=staged)
+        self.df = staged.commit()
 
     def apply_split_code_descrpition(
             self,
             column: str,
             filter_pattern: str,
             code_name: str,
-            desc_name: str
+            desc_name: str,
+            staged: ColumnHandler = None
     ):
         """
             Applies the split_code_description method to a specified column.
@@ -610,38 +735,48 @@ class DataCleaning:
                 The name of the new column to store the extracted code values.
             desc_name : str
                 The name of the new column to store the extracted description values.
+            staged : ColumnHandler, optional
+                Column edits committed by the caller. If not provided, the edits are committed here.
 
             Raises
             ------
             ValueError
                 If the code column cannot be cast to an integer.
             """
+        commit = staged is None
+        if commit:
+            staged = ColumnHandler(self.df)
+
         # Raise error if column is not object type
-        if not pd.api.types.is_object_dtype(self.df[column]):
-            raise ValueError(f'Column {column}({self.df[column].dtype}) is not of object type.')
+        values = staged[column]
+        if not pd.api.types.is_object_dtype(values):
+            raise ValueError(f'Column {column}({values.dtype}) is not of object type.')
 
         # Extract code and description
-        self.df[column] = self.df[column].dropna().apply(
-            lambda x: self.th.extract_ids_and_descriptions(x, filter_pattern))
-        code = self.df[column].dropna().apply(lambda x: x[0].strip())
-        description = self.df[column].dropna().apply(lambda x: x[1].strip())
+        extracted = self.th.extract_ids_and_descriptions_batch(values.dropna(), filter_pattern)
+        code = extracted['code']
+        description = extracted['description']
 
-        # Insert values
-        column_index = self.df.columns.get_loc(column)
-        self.df.insert(column_index + 1, f'{code_name}', code)
-        self.df.insert(column_index + 2, f'{desc_name}', description)
         # Try to cast code column to int
         try:
-            self.df[f'{code_name}'] = self.df[f'{code_name}'].astype(float).astype('Int64')
+            code = code.astype(float).astype('Int64')
         except ValueError:
             logging.warning('Could not cast %s to int.', code_name)
 
+        # Insert values
+        column_index = staged.get_loc(column)
+        staged.insert(column_index + 1, f'{code_name}', code)
+        staged.insert(column_index + 2, f'{desc_name}', description)
+
         # Drop original column
-        self.df = self.df.drop(columns=column)
+        staged.drop(column)
+        if commit:
+            self.df = staged.commit()
 
     def check_cpf(self):
         """Check for invalid CPF values in the DataFrame."""
-        invalid_cpf_mask = self.df['cpf'].dropna().apply(self.th.validate_cpf).isna()
+        valid_cpf_mask, _ = self.th.validate_cpf_batch(self.df['cpf'].dropna())
+        invalid_cpf_mask = ~valid_cpf_mask
         if invalid_cpf_mask.any():
             logging.warning('Invalid CPF found: %s', invalid_cpf_mask.sum())
             self.df['cpf'] = self.df['cpf'].mask(invalid_cpf_mask, np.nan)
@@ -651,7 +786,8 @@ class DataCleaning:
 
     def check_cns(self):
         """Check for invalid CNS values in the DataFrame."""
-        invalid_cns_mask = self.df['cns'].dropna().apply(self.th.validate_cns).isna()
+        valid_cns_mask, _ = self.th.validate_cns_batch(self.df['cns'].dropna())
+        invalid_cns_mask = ~valid_cns_mask
         if invalid_cns_mask.any():
             logging.warning('Invalid CNS found: %s', invalid_cns_mask.sum())
             self.df['cns'] = self.df['cns'].mask(invalid_cns_mask, np.nan)
@@ -661,11 +797,13 @@ class DataCleaning:
 
     def create_identifier_column(self):
         """Fix for Retrospectivo project."""
-        identificador_idx = self.df.columns.get_loc('identificador')
+        staged = ColumnHandler(self.df)
+        identificador_idx = staged.get_loc('identificador')
         cpf_mask = self.df['identificador'][self.df['tipo_identificador'] == 'cpf']
         cns_mask = self.df['identificador'][self.df['tipo_identificador'] == 'cns']
         # Add CPF/CNS columns
-        self.df.insert(identificador_idx, 'cpf', cpf_mask)
-        self.df.insert(identificador_idx + 1, 'cns', cns_mask)
+        staged.insert(identificador_idx, 'cpf', cpf_mask)
+        staged.insert(identificador_idx + 1, 'cns', cns_mask)
         # Drop unused columns
-        self.df = self.df.drop(columns=['tipo_identificador', 'identificador'])
+        staged.drop(['tipo_identificador', 'identificador'])
+        self.df = staged.commit()
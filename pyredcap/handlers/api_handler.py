@@ -1,11 +1,20 @@
 import logging
+import threading
+import time
+from tempfile import SpooledTemporaryFile
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class APIHandler:
     """
     A class used to interact with the REDCap API.
 
+    All calls go through a persistent ``requests.Session`` so consecutive exports reuse the same pooled, keep-alive
+    connection. Transient failures (HTTP 429/5xx, connection errors and timeouts) are retried with exponential backoff.
+
     ...
 
     Attributes
@@ -14,16 +23,90 @@ class APIHandler:
         The URL of the API to interact with.
     api_token : str
         The token used for authenticating with the API.
+    timeout : float | tuple[float, float]
+        Timeout in seconds for each request, or a (connect, read) tuple.
+    session : requests.Session
+        The connection-pooled session used for every call.
+    stats : dict[str, dict]
+        Per content type counters: number of calls, failed calls, transferred bytes and elapsed seconds.
 
     Methods
     -------
     make_api_call(content: str, **params) -> requests.Response
         Makes a POST request to the API endpoint and returns the response.
+    download(content: str, **params) -> SpooledTemporaryFile
+        Streams the response of a POST request into a spooled temporary file.
+    get_stats() -> dict[str, dict]
+        Returns a copy of the per content type timing counters.
+    close() -> None
+        Closes the session and its pooled connections.
     """
 
-    def __init__(self, api_url: str, api_token: str):
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    # Streamed responses are kept in memory up to this size, then rolled over to disk
+    SPOOL_MAX_SIZE = 64 * 1024 ** 2
+
+    def __init__(
+            self,
+            api_url: str,
+            api_token: str,
+            pool_size: int = 10,
+            max_retries: int = 3,
+            backoff_factor: float = 0.5,
+            timeout: float | tuple[float, float] = 300
+    ):
         self.api_url = api_url
         self.api_token = api_token
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        self.session = self._create_session()
+        self.stats: dict[str, dict] = {}
+        self._stats_lock = threading.Lock()
+
+    def _create_session(self) -> requests.Session:
+        """Create a session with a pooled adapter that retries transient failures."""
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            # Export calls are read-only, POST is safe to retry
+            allowed_methods=None,
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Connection': 'keep-alive'})
+        return session
+
+    def __getstate__(self):
+        # Locks can't be copied, deep copies of a project get a fresh one
+        state = self.__dict__.copy()
+        del state['_stats_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """Close the session and its pooled connections."""
+        self.session.close()
 
     def make_api_call(self, content: str, **params) -> requests.Response:
         """
@@ -42,6 +125,46 @@ class APIHandler:
         requests.Response
             The HTTP response object.
         """
+        start = time.perf_counter()
+        response = self._post(content, False, **params)
+        self._update_stats(content, time.perf_counter() - start, n_bytes=len(response.content))
+        return response
+
+    def download(self, content: str, chunk_size: int = 1024 ** 2, **params) -> SpooledTemporaryFile:
+        """
+        Streams the response of a POST request into a spooled temporary file, so the payload is never held in memory
+        as a whole (it rolls over to disk above SPOOL_MAX_SIZE bytes).
+
+        Parameters
+        ----------
+        content : str
+            The content type for the API call.
+        chunk_size : int, optional
+            Number of bytes read from the connection at a time (default is 1 MB).
+        **params : any
+            Additional parameters to pass in the API call according to the content type.
+
+        Returns
+        -------
+        SpooledTemporaryFile
+            The binary file holding the response body, positioned at its start. The caller must close it.
+        """
+        start = time.perf_counter()
+        file = SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE)  # pylint: disable=consider-using-with
+        try:
+            with self._post(content, True, **params) as response:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    file.write(chunk)
+        except BaseException:
+            # The file may have rolled over to disk, it is only returned complete
+            file.close()
+            raise
+        self._update_stats(content, time.perf_counter() - start, n_bytes=file.tell())
+        file.seek(0)
+        return file
+
+    def _post(self, content: str, stream: bool, **params) -> requests.Response:
+        """Make the POST request, raising for a non 200 status."""
         # Setup payload
         payload = {
             'token': self.api_token,
@@ -50,12 +173,38 @@ class APIHandler:
         payload.update(params)
 
         # Make request
-        response = requests.post(self.api_url, data=payload, timeout=300, verify=True)
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.api_url, data=payload, timeout=self.timeout, verify=True,
+                                         stream=stream)
+        except requests.exceptions.RequestException:
+            self._update_stats(content, time.perf_counter() - start, failed=True)
+            raise
         logging.info('HTTP Status: %s', response.status_code)
+        logging.debug('API call %s took %.3fs', content, time.perf_counter() - start)
 
         if response.status_code != 200:
+            self._update_stats(content, time.perf_counter() - start, failed=True)
             logging.error("API call failed with status %s and response %s",
                           response.status_code, response.text)
             response.raise_for_status()
 
         return response
+
+    def _update_stats(self, content: str, elapsed: float, n_bytes: int = 0, failed: bool = False) -> None:
+        with self._stats_lock:
+            stats = self.stats.setdefault(content, {'calls': 0, 'failed': 0, 'bytes': 0, 'seconds': 0.0})
+            stats['calls'] += 1
+            stats['failed'] += int(failed)
+            stats['bytes'] += n_bytes
+            stats['seconds'] += elapsed
+
+    def get_stats(self) -> dict[str, dict]:
+        """Return a copy of the per content type timing counters."""
+        with self._stats_lock:
+            return {content: stats.copy() for content, stats in self.stats.items()}
+
+    def reset_stats(self) -> None:
+        """Reset the timing counters."""
+        with self._stats_lock:
+            self.stats = {}
@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+
+from pyredcap.handlers.metadata_handler import MetadataHandler
+
+
+class CacheHandler:
+    """
+    A class used to cache project metadata on disk.
+
+    Entries hold the project info and every metadata content (dag, instrument, repeatingFormsEvents, metadata),
+    keyed by API URL and project id. A small index maps a digest of the API URL and token to the entry, so a cached
+    project is loaded without any API call. Entries are gzip compressed JSON, which keeps every metadata value as the
+    same string the JSON export returns.
+
+    ...
+
+    Attributes
+    ----------
+    cache_dir : str
+        Directory holding the cache entries.
+    ttl : float | None
+        Seconds after which an entry expires, None for entries that never expire.
+
+    Methods
+    -------
+    load(api_url: str, api_token: str) -> dict[str, any] | None
+        Loads the cached metadata of a project, None if missing, expired or from another cache version.
+    save(api_url: str, api_token: str, metadata: dict[str, any]) -> None
+        Saves the metadata of a project.
+    invalidate(api_url: str = None, api_token: str = None) -> None
+        Removes the entry of a project, or every entry.
+    """
+
+    # Bump when the entry layout changes, older entries are ignored
+    CACHE_VERSION = 1
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, cache_dir: str, ttl: float | None = 24 * 3600):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _digest(*parts: str) -> str:
+        return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+
+    def _entry_path(self, api_url: str, project_id: str | int) -> str:
+        return os.path.join(self.cache_dir, f'metadata_{self._digest(api_url, str(project_id))}.json.gz')
+
+    def _read_index(self) -> dict[str, str]:
+        try:
+            with open(os.path.join(self.cache_dir, self.INDEX_FILE), encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json(self, path: str, data: dict, compress: bool = False) -> None:
+        """Write to a temporary file then replace, so concurrent readers never see a partial file."""
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with (gzip.open(tmp_path, 'wt', encoding='utf-8') if compress
+              else open(tmp_path, 'w', encoding='utf-8')) as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+
+    def load(self, api_url: str, api_token: str) -> dict[str, any] | None:
+        """
+        Load the cached metadata of a project.
+
+        Returns
+        -------
+        dict[str, any] | None
+            Same layout as ``MetadataHandler.load_all_metadata``, or None if there is no valid entry.
+        """
+        project_id = self._read_index().get(self._digest(api_url, api_token))
+        if project_id is None:
+            return None
+
+        try:
+            with gzip.open(self._entry_path(api_url, project_id), 'rt', encoding='utf-8') as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logging.warning('Metadata cache entry of project %s is unreadable.', project_id)
+            return None
+
+        if entry.get('version') != self.CACHE_VERSION:
+            logging.info('Metadata cache entry of project %s has another version, ignoring it.', project_id)
+            return None
+        if self.ttl is not None and time.time() - entry['created'] > self.ttl:
+            logging.info('Metadata cache entry of project %s expired.', project_id)
+            return None
+
+        metadata = {'project': (entry['project']['project_id'], entry['project']['project_title'])}
+        metadata.update({content: pd.DataFrame(records) if records is not None else None
+                         for content, records in entry['contents'].items()})
+        return metadata
+
+    def save(self, api_url: str, api_token: str, metadata: dict[str, any]) -> None:
+        """
+        Save the metadata of a project, as returned by ``MetadataHandler.load_all_metadata``.
+        Incomplete metadata is refused, a failed fetch would otherwise be served from the cache until it expires.
+        """
+        missing = MetadataHandler.missing_contents(metadata)
+        if missing:
+            raise ValueError(f'Cannot cache incomplete metadata, missing {missing}')
+        project_id, project_title = metadata['project']
+        entry = {
+            'version': self.CACHE_VERSION,
+            'created': time.time(),
+            'api_url': api_url,
+            'project': {'project_id': project_id, 'project_title': project_title},
+            'contents': {content: df.to_dict(orient='records') if df is not None else None
+                         for content, df in metadata.items() if content != 'project'},
+        }
+        self._write_json(self._entry_path(api_url, project_id), entry, compress=True)
+
+        index = self._read_index()
+        index[self._digest(api_url, api_token)] = project_id
+        self._write_json(os.path.join(self.cache_dir, self.INDEX_FILE), index)
+
+    def invalidate(self, api_url: str = None, api_token: str = None) -> None:
+        """Remove the cached entry of a project, or every entry if no project is given."""
+        index = self._read_index()
+        if api_url is None:
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.startswith('metadata_'):
+                    os.remove(os.path.join(self.cache_dir, file_name))
+            index = {}
+        else:
+            project_id = index.pop(self._digest(api_url, api_token), None)
+            if project_id is not None and os.path.exists(self._entry_path(api_url, project_id)):
+                os.remove(self._entry_path(api_url, project_id))
+        self._write_json(os.path.join(self.cache_dir, self.INDEX_FILE), index)
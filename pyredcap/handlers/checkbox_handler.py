@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from pandas import Series
+
+
+class CheckboxHandler:
+    """
+    A class used to handle the compact representation of checkbox fields.
+
+    A decoded checkbox field is stored as a nullable Int64 bitmask column, bit ``i`` being set when the ``i``-th
+    choice of the field is selected (NA when no choice is selected). The choices are kept once per field in a shared
+    choice table (``REDCapProject.checkbox_choices``), so relabeling a field only changes the table.
+
+    ...
+
+    Methods
+    -------
+    encode(selected: np.ndarray) -> Series
+        Encodes a boolean (rows x choices) matrix as a bitmask column.
+    from_lists(values: Series, choices: list[str]) -> Series
+        Encodes a column of choice lists/arrays as a bitmask column.
+    contains(bitmask: Series, choices: list[str], values: str | list[str]) -> Series
+        Tests which rows have any of the given choices selected.
+    map_labels(choices: list[str], mapping: dict) -> list[str]
+        Maps the choice table of a field with a raw to label mapping.
+    to_lists(bitmask: Series, choices: list[str]) -> Series
+        Expands a bitmask column to lists of selected choices, e.g. when exporting.
+    """
+
+    # Bits available in an int64 bitmask
+    MAX_CHOICES = 63
+
+    @staticmethod
+    def _bits(n_choices: int) -> np.ndarray:
+        if n_choices > CheckboxHandler.MAX_CHOICES:
+            raise ValueError(f'A bitmask holds at most {CheckboxHandler.MAX_CHOICES} choices, got {n_choices}.')
+        return np.left_shift(np.int64(1), np.arange(n_choices, dtype=np.int64))
+
+    @staticmethod
+    def _codes(bitmask: Series) -> np.ndarray:
+        """Bitmask values as int64, 0 for rows with no selection."""
+        return bitmask.to_numpy(dtype='int64', na_value=0)
+
+    @staticmethod
+    def encode(selected: np.ndarray, index: pd.Index = None) -> Series:
+        """
+        Encode a boolean (rows x choices) matrix as a bitmask column.
+
+        Parameters
+        ----------
+        selected : np.ndarray
+            Boolean matrix, True where the choice of the column is selected.
+        index : pd.Index, optional
+            Index of the resulting Series.
+
+        Returns
+        -------
+        Series
+            Int64 bitmask, NA for rows with no selection.
+        """
+        codes = selected.astype(np.int64) @ CheckboxHandler._bits(selected.shape[1])
+        return Series(pd.array(codes, dtype='Int64'), index=index).mask(codes == 0)
+
+    @staticmethod
+    def from_lists(values: Series, choices: list[str]) -> Series:
+        """Encode a column of choice lists/arrays (NaN for no selection) as a bitmask column."""
+        bits = dict(zip(choices, CheckboxHandler._bits(len(choices)).tolist()))
+        exploded = values.reset_index(drop=True).explode().dropna()
+        unknown = exploded[~exploded.isin(bits.keys())]
+        if not unknown.empty:
+            raise ValueError(f'Values not in the choice table: {unknown.unique().tolist()}')
+        codes = np.zeros(len(values), dtype=np.int64)
+        np.bitwise_or.at(codes, exploded.index.to_numpy(), exploded.map(bits).to_numpy(dtype=np.int64))
+        return Series(pd.array(codes, dtype='Int64'), index=values.index).mask(codes == 0)
+
+    @staticmethod
+    def contains(bitmask: Series, choices: list[str], values: str | list[str]) -> Series:
+        """
+        Test which rows have any of the given choices selected.
+
+        Returns
+        -------
+        Series
+            Boolean Series aligned with ``bitmask``, False for rows with no selection.
+        """
+        if isinstance(values, str):
+            values = [values]
+        bits = CheckboxHandler._bits(len(choices))
+        mask = np.int64(0)
+        for value in values:
+            mask |= bits[choices.index(value)]
+        return Series((CheckboxHandler._codes(bitmask) & mask) != 0, index=bitmask.index)
+
+    @staticmethod
+    def map_labels(choices: list[str], mapping: dict) -> list[str]:
+        """Map the choice table of a field, choices missing from the mapping are kept."""
+        return [mapping.get(choice, choice) for choice in choices]
+
+    @staticmethod
+    def to_lists(bitmask: Series, choices: list[str]) -> Series:
+        """
+        Expand a bitmask column to lists of selected choices (NaN for no selection), as decode_checkbox returns
+        without the compact representation. Each row gets its own list.
+        """
+        codes = CheckboxHandler._codes(bitmask)
+        bits = CheckboxHandler._bits(len(choices))
+        # Decode each distinct selection once
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        selections = [[choice for choice, bit in zip(choices, bits) if code & bit] for code in unique_codes.tolist()]
+        values = [list(selections[i]) if selections[i] else np.nan for i in inverse.tolist()]
+        return Series(values, index=bitmask.index, dtype=object)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
+
+
+class ColumnHandler:
+    """
+    A class used to stage column edits on a DataFrame and apply them at once.
+
+    ``DataFrame.insert`` adds a block to the frame for every column, and every ``drop`` copies the whole frame, so
+    steps inserting and dropping columns one by one copy the data many times and fragment the frame (pandas
+    PerformanceWarning). Edits are staged instead: positions and names follow the staged column order, as if each edit
+    had been applied, and ``commit`` builds the resulting frame with a single concat and column selection.
+
+    ...
+
+    Attributes
+    ----------
+    df : DataFrame
+        The DataFrame being edited, left untouched until ``commit``.
+    columns : list[str]
+        The staged column order.
+
+    Methods
+    -------
+    get_loc(column: str) -> int
+        Returns the staged position of a column.
+    insert(loc: int, column: str, values) -> None
+        Stages a new column at a staged position.
+    assign(column: str, values) -> None
+        Stages new values for a column, keeping its position.
+    drop(columns: str | list[str]) -> None
+        Stages the removal of columns.
+    reorder(columns: list[str]) -> None
+        Stages a new column order.
+    select(columns: list[str]) -> DataFrame
+        Returns the staged values of columns.
+    commit() -> DataFrame
+        Builds the DataFrame with every staged edit.
+    """
+
+    def __init__(self, df: DataFrame):
+        self.df = df
+        self.columns: list[str] = df.columns.tolist()
+        # New or replaced column values, aligned with the index of df on commit
+        self._staged: dict[str, Series | np.ndarray] = {}
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def __getitem__(self, column: str) -> Series:
+        """Return the staged values of a column."""
+        if column not in self.columns:
+            raise KeyError(column)
+        if column not in self._staged:
+            return self.df[column]
+        values = self._staged[column]
+        if isinstance(values, Series):
+            return values.reindex(self.df.index)
+        return Series(values, index=self.df.index, name=column)
+
+    @property
+    def pending(self) -> bool:
+        """Whether there are edits to commit."""
+        return bool(self._staged) or self.columns != self.df.columns.tolist()
+
+    def get_loc(self, column: str) -> int:
+        """Return the position of a column in the staged column order."""
+        try:
+            return self.columns.index(column)
+        except ValueError:
+            raise KeyError(column) from None
+
+    def insert(self, loc: int, column: str, values) -> None:
+        """
+        Stage a new column, like ``DataFrame.insert``.
+
+        Parameters
+        ----------
+        loc : int
+            Position in the staged column order, ``0 <= loc <= len(columns)``.
+        column : str
+            Name of the new column.
+        values : Series | np.ndarray | scalar
+            Column values, Series are aligned with the DataFrame index (missing rows are NaN).
+        """
+        if column in self.columns:
+            raise ValueError(f'cannot insert {column}, already exists')
+        if not 0 <= loc <= len(self.columns):
+            raise IndexError(f'loc must be an integer between 0 and {len(self.columns)}')
+        self.columns.insert(loc, column)
+        self._staged[column] = values
+
+    def assign(self, column: str, values) -> None:
+        """Stage new values for a column, new columns are appended."""
+        if column not in self.columns:
+            self.columns.append(column)
+        self._staged[column] = values
+
+    def drop(self, columns: str | list[str]) -> None:
+        """Stage the removal of columns, raising KeyError if any of them is not in the staged columns."""
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        missing = [col for col in columns if col not in self.columns]
+        if missing:
+            raise KeyError(f'{missing} not found in columns')
+        dropped = set(columns)
+        self.columns = [col for col in self.columns if col not in dropped]
+        for col in dropped:
+            self._staged.pop(col, None)
+
+    def reorder(self, columns: list[str]) -> None:
+        """Stage a new order of the staged columns, every column must be given once."""
+        if sorted(columns) != sorted(self.columns):
+            raise ValueError('Reordered columns differ from the staged columns.')
+        self.columns = list(columns)
+
+    def select(self, columns: list[str]) -> DataFrame:
+        """Return the staged values of columns, without committing."""
+        if not any(col in self._staged for col in columns):
+            return self.df[columns]
+        return DataFrame({col: self[col] for col in columns}, index=self.df.index)
+
+    def commit(self) -> DataFrame:
+        """
+        Build the DataFrame with every staged edit.
+
+        The columns kept from ``df`` and the staged ones are concatenated once and selected in the staged order.
+        The handler then starts over from the resulting DataFrame.
+
+        Returns
+        -------
+        DataFrame
+            A new DataFrame, or ``df`` itself if nothing was staged.
+        """
+        if not self.pending:
+            return self.df
+
+        if self._staged:
+            staged = DataFrame(self._staged, index=self.df.index)
+            # Staged columns may replace columns of df, select them by position from the concatenated frame
+            staged_positions = {col: len(self.df.columns) + i for i, col in enumerate(staged.columns)}
+            positions = [staged_positions[col] if col in staged_positions else self.df.columns.get_loc(col)
+                         for col in self.columns]
+            df = pd.concat([self.df, staged], axis=1, copy=False).iloc[:, positions]
+        else:
+            df = self.df[self.columns]
+
+        self.df = df
+        self.columns = df.columns.tolist()
+        self._staged = {}
+        return df
@@ -1,11 +1,14 @@
+import copy
 import logging
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import requests
 from pandas import DataFrame
 from pyredcap.handlers.api_handler import APIHandler
+from pyredcap.handlers.parse_handler import ParseHandler
 
 
 class MetadataHandler:
@@ -18,10 +21,17 @@ class MetadataHandler:
     -------
     load_metadata(content: str) -> DataFrame | None
         Loads codebook from API and returns a DataFrame or None.
+    load_all_metadata(max_workers: int = 5) -> dict[str, any]
+        Loads project info and all metadata contents concurrently.
     """
 
-    def __init__(self, api: APIHandler):
+    METADATA_CONTENTS = ('dag', 'instrument', 'repeatingFormsEvents', 'metadata')
+    # Contents a project may lack, repeatingFormsEvents is None for projects without repeating forms
+    OPTIONAL_CONTENTS = ('repeatingFormsEvents',)
+
+    def __init__(self, api: APIHandler, parser: ParseHandler = None):
         self.api = api
+        self.parser = parser or ParseHandler()
 
         self.project_id = None
         self.project_title = None
@@ -30,12 +40,16 @@ class MetadataHandler:
         self.raw_label_map: dict = {}
 
     def load_metadata(self, content: str) -> DataFrame | None:
-        """Load codebook from API."""
+        """Load codebook from API. The pyarrow parse engine reads the CSV export straight from the response bytes."""
         try:
-            response = self.api.make_api_call(content, format='json')
-
-            if response.status_code == 200:
-                return pd.DataFrame(response.json())
+            if self.parser.engine == 'pyarrow':
+                response = self.api.make_api_call(content, format='csv')
+                if response.status_code == 200:
+                    return self.parser.read_metadata(response.content)
+            else:
+                response = self.api.make_api_call(content, format='json')
+                if response.status_code == 200:
+                    return pd.DataFrame(response.json())
 
             logging.warning('Error: Received status code %s while fetching %s.',
                             response.status_code, content)
@@ -51,6 +65,32 @@ class MetadataHandler:
 
         return data['project_id'], data['project_title']
 
+    def load_all_metadata(self, max_workers: int = 5) -> dict[str, any]:
+        """
+        Load project info and every metadata content concurrently.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Number of concurrent API calls (default is 5, one per content). Use 1 for serial calls.
+
+        Returns
+        -------
+        dict[str, any]
+            Project info tuple under the 'project' key and one DataFrame (or None) per content in METADATA_CONTENTS.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {'project': executor.submit(self.load_project_info)}
+            futures.update({content: executor.submit(self.load_metadata, content)
+                            for content in self.METADATA_CONTENTS})
+            return {content: future.result() for content, future in futures.items()}
+
+    @classmethod
+    def missing_contents(cls, metadata: dict[str, any]) -> list[str]:
+        """Required contents of ``load_all_metadata`` output that failed to load."""
+        return [content for content, value in metadata.items()
+                if value is None and content not in cls.OPTIONAL_CONTENTS]
+
     def get_metadata(self) -> dict[str, any]:
         """Generate metadata dictionary to load into NoSQL database."""
         metadata = {
@@ -84,6 +124,64 @@ class MetadataHandler:
         # Cast to dictionary
         return raw_label_map.to_dict()['select_choices_or_calculations']
 
+    @staticmethod
+    def create_export_label_map(
+            codebook: DataFrame,
+            instruments: DataFrame = None,
+            dag: DataFrame = None
+    ) -> dict[str, dict[str, str]]:
+        """
+        Create the raw to label mapping REDCap applies on a label export (rawOrLabel='label').
+
+        Radio, dropdown and checkbox fields map their choices, redcap_repeat_instrument the instrument labels and
+        redcap_data_access_group the DAG names. SQL fields are not included, their labels are only known by the
+        server, nor are yesno and truefalse fields and checkbox columns (Checked/Unchecked), labelled in the project
+        language.
+        """
+        label_map = MetadataHandler.create_raw_label_map(codebook)
+        if instruments is not None and not instruments.empty:
+            label_map['redcap_repeat_instrument'] = (
+                instruments.set_index('instrument_name')['instrument_label'].to_dict())
+        if dag is not None and not dag.empty:
+            label_map['redcap_data_access_group'] = (
+                dag.set_index('unique_group_name')['data_access_group_name'].to_dict())
+        return label_map
+
+    @staticmethod
+    def create_dtype_schema(codebook: DataFrame) -> tuple[dict[str, str], list[str]]:
+        """
+        Create the read_csv dtypes of a records export from the codebook.
+
+        Radio, dropdown, yesno and truefalse fields are read as categoricals, text fields validated as integer or
+        number as nullable Int64/Float64 and date/datetime fields are parsed as dates (REDCap exports them as ISO).
+
+        Parameters
+        ----------
+        codebook : DataFrame
+            The project codebook (field_name, field_type and text_validation_type_or_show_slider_number columns).
+
+        Returns
+        -------
+        tuple[dict[str, str], list[str]]
+            The dtype mapping and the list of date columns.
+        """
+        field_type = codebook['field_type']
+        validation = codebook['text_validation_type_or_show_slider_number'].fillna('')
+        text_mask = field_type == 'text'
+
+        categorical_mask = field_type.isin(['radio', 'dropdown', 'yesno', 'truefalse'])
+        integer_mask = text_mask & (validation == 'integer')
+        float_mask = text_mask & validation.str.fullmatch(r'number(_\ddp)?')
+        date_mask = text_mask & validation.str.fullmatch(r'(date|datetime|datetime_seconds)_(ymd|mdy|dmy)')
+
+        dtype = {}
+        dtype.update(dict.fromkeys(codebook.loc[categorical_mask, 'field_name'], 'category'))
+        dtype.update(dict.fromkeys(codebook.loc[integer_mask, 'field_name'], 'Int64'))
+        dtype.update(dict.fromkeys(codebook.loc[float_mask, 'field_name'], 'Float64'))
+        parse_dates = codebook.loc[date_mask, 'field_name'].tolist()
+
+        return dtype, parse_dates
+
     @staticmethod
     def create_branching_logic_tree(codebook: DataFrame) -> dict:
         """Creates a branching logic tree from the codebook."""
@@ -114,3 +212,122 @@ class MetadataHandler:
         logging.debug(json.dumps(branching_logic_tree, indent=2))
 
         return branching_logic_tree
+
+
+class MetadataSnapshot:
+    """
+    Read-only view of a project metadata, shared by every consumer until the project metadata changes.
+
+    The DataFrames (codebook, dag...) are referenced, not copied, so consumers must not modify them. The
+    dictionary form of ``REDCapProject.get_metadata`` is only serialized on first use of ``to_dict``, which returns
+    a copy of it on every call.
+
+    ...
+
+    Attributes
+    ----------
+    project_id : str
+        The project ID.
+    project_title : str
+        The project title.
+    dag : DataFrame
+        The data access groups.
+    instruments : DataFrame
+        The instruments.
+    repeating_forms_events : DataFrame | None
+        The repeating forms and events.
+    codebook : DataFrame
+        The codebook.
+    identifier_fields : list[str]
+        Field names that are identifiers.
+    raw_label_map : dict
+        A mapping of raw values to labels for each multiple choice field.
+    branching_logic_tree : dict
+        The branching logic tree.
+    feature_map : dict[str, list[str]]
+        A mapping of form names to field names.
+    outliers : dict
+        The project outliers.
+    checkbox_choices : dict[str, list[str]]
+        The choice table of checkbox fields stored as bitmask columns.
+
+    Methods
+    -------
+    get(key: str, default: any = None) -> any
+        Returns an attribute, or default if missing, as dict.get.
+    to_dict() -> dict[str, any]
+        Returns a copy of the metadata as a dictionary of serializable values, serialized once.
+    """
+
+    # Keys of the DataFrames serialized as lists of records, copied row by row
+    RECORDS_KEYS = ('dag', 'instruments', 'repeating_forms_events', 'codebook')
+
+    def __init__(
+            self,
+            project_id: str,
+            project_title: str,
+            dag: DataFrame,
+            instruments: DataFrame,
+            repeating_forms_events: DataFrame | None,
+            codebook: DataFrame,
+            identifier_fields: list[str],
+            raw_label_map: dict,
+            branching_logic_tree: dict,
+            feature_map: dict[str, list[str]],
+            outliers: dict,
+            checkbox_choices: dict[str, list[str]] = None
+    ):
+        self.project_id = project_id
+        self.project_title = project_title
+        self.dag = dag
+        self.instruments = instruments
+        self.repeating_forms_events = repeating_forms_events
+        self.codebook = codebook
+        self.identifier_fields = identifier_fields
+        self.raw_label_map = raw_label_map
+        self.branching_logic_tree = branching_logic_tree
+        self.feature_map = feature_map
+        self.outliers = outliers
+        self.checkbox_choices = checkbox_choices or {}
+        self._dict: dict[str, any] | None = None
+
+    def __getitem__(self, key: str) -> any:
+        # Dictionary style access, as with the get_metadata dictionary
+        return getattr(self, key)
+
+    def get(self, key: str, default: any = None) -> any:
+        """Return an attribute, or default if missing."""
+        return getattr(self, key, default)
+
+    def to_dict(self) -> dict[str, any]:
+        """
+        Return the metadata as a dictionary, DataFrames as lists of records.
+
+        The dictionary is serialized once and copied on each call, so callers may modify the copy (e.g.
+        ``insert_one`` adding ``_id``) without affecting later calls. ``checkbox_choices`` is only present once a
+        checkbox field is stored as a bitmask, so the metadata of other projects keeps its original keys.
+        """
+        if self._dict is None:
+            self._dict = {
+                'project_id': self.project_id,
+                'project_title': self.project_title,
+                'dag': self.dag.to_dict(orient='records'),
+                'instruments': self.instruments.to_dict(orient='records'),
+                'repeating_forms_events':
+                    self.repeating_forms_events.to_dict(orient='records')
+                    if self.repeating_forms_events is not None else None,
+                'codebook': self.codebook.to_dict(orient='records'),
+                'identifier_fields': self.identifier_fields,
+                'raw_label_map': self.raw_label_map,
+                'branching_logic_tree': self.branching_logic_tree,
+                'feature_map': self.feature_map,
+                'outliers': self.outliers,
+            }
+            if self.checkbox_choices:
+                self._dict['checkbox_choices'] = self.checkbox_choices
+        # Records only hold scalars, copying their rows is much cheaper than a deep copy
+        metadata = copy.deepcopy({key: value for key, value in self._dict.items() if key not in self.RECORDS_KEYS})
+        for key in self.RECORDS_KEYS:
+            records = self._dict[key]
+            metadata[key] = [dict(row) for row in records] if records is not None else None
+        return {key: metadata[key] for key in self._dict}
@@ -0,0 +1,107 @@
+import logging
+import pickle
+from multiprocessing.shared_memory import SharedMemory
+
+from pandas import DataFrame
+
+# State of the worker process: the metadata snapshot of the project, set once by the pool initializer
+_WORKER_STATE: dict[str, any] = {}
+
+
+class ParallelHandler:
+    """
+    A class used to clean forms on a process pool.
+
+    Forms are shipped to the workers through shared memory: a form is pickled with protocol 5, its array data going
+    out-of-band into a shared memory block instead of through the pool pipe, and only the small in-band payload
+    (column names, dtypes, object values) is sent with the task. The read-only metadata snapshot is sent once per
+    worker, through the pool initializer.
+
+    ...
+
+    Methods
+    -------
+    share_frame(df: DataFrame) -> tuple[SharedMemory, dict]
+        Writes a DataFrame to a shared memory block.
+    load_frame(frame_ref: dict) -> DataFrame
+        Reads a DataFrame written by share_frame.
+    init_worker(metadata) -> None
+        Stores the metadata snapshot in the worker process.
+    clean_form(form_name: str, frame_ref: dict, instructions: dict, plan: bool) -> tuple[DataFrame, dict, dict]
+        Cleans a form in a worker process.
+    """
+
+    @staticmethod
+    def share_frame(df: DataFrame) -> tuple[SharedMemory, dict]:
+        """
+        Write a DataFrame to a shared memory block.
+
+        Returns
+        -------
+        tuple[SharedMemory, dict]
+            The shared memory block, to close and unlink once the workers are done, and the reference to send to
+            the workers.
+        """
+        buffers = []
+        payload = pickle.dumps(df, protocol=5, buffer_callback=buffers.append)
+        raw_buffers = [buffer.raw() for buffer in buffers]
+        sizes = [raw.nbytes for raw in raw_buffers]
+
+        shm = SharedMemory(create=True, size=max(sum(sizes), 1))
+        offset = 0
+        for raw, size in zip(raw_buffers, sizes):
+            shm.buf[offset:offset + size] = raw
+            offset += size
+        return shm, {'name': shm.name, 'payload': payload, 'sizes': sizes}
+
+    @staticmethod
+    def load_frame(frame_ref: dict) -> DataFrame:
+        """Read a DataFrame written by share_frame. The arrays are copied out of the block, which stays unchanged."""
+        shm = SharedMemory(name=frame_ref['name'])
+        try:
+            buffers = []
+            offset = 0
+            for size in frame_ref['sizes']:
+                buffers.append(bytearray(shm.buf[offset:offset + size]))
+                offset += size
+        finally:
+            shm.close()
+        return pickle.loads(frame_ref['payload'], buffers=buffers)
+
+    @staticmethod
+    def init_worker(metadata) -> None:
+        """Store the metadata snapshot in the worker process."""
+        _WORKER_STATE['metadata'] = metadata
+
+    @staticmethod
+    def clean_form(
+            form_name: str,
+            frame_ref: dict,
+            instructions: dict,
+            plan: bool = False
+    ) -> tuple[DataFrame, dict, dict]:
+        """
+        Clean a form in a worker process.
+
+        Returns
+        -------
+        tuple[DataFrame, dict, dict]
+            The cleaned form, its outliers and the checkbox choices it changed.
+        """
+        # pylint: disable=import-outside-toplevel
+        from pyredcap.data_cleaning import DataCleaning
+
+        logging.info('Data cleaning on form: %s', form_name)
+        metadata = _WORKER_STATE['metadata']
+        data_cleaning = DataCleaning(
+            form_name=form_name,
+            df=ParallelHandler.load_frame(frame_ref),
+            metadata=metadata,
+            instructions=instructions,
+            plan=plan
+        )
+        # Other forms are cleaned meanwhile, only return the choice tables changed by this one
+        checkbox_choices = {field_name: choices for field_name, choices in data_cleaning.checkbox_choices.items()
+                            if field_name not in metadata['checkbox_choices']
+                            or metadata['checkbox_choices'][field_name] != choices}
+        return data_cleaning.df, data_cleaning.outliers, checkbox_choices
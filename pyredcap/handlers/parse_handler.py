@@ -0,0 +1,226 @@
+import logging
+import shutil
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Literal
+
+import pandas as pd
+from pandas import DataFrame
+
+
+def _import_pyarrow():
+    """Import the optional pyarrow dependency."""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        from pyarrow import csv
+    except ImportError as e:
+        raise ImportError("The 'pyarrow' parse engine requires pyarrow: pip install pyarrow") from e
+    return pyarrow, csv
+
+
+class ParseHandler:
+    """
+    A class used to parse REDCap CSV exports into DataFrames.
+
+    Exports are parsed straight from the response bytes (or a file), with either the pandas C parser or the
+    multithreaded pyarrow CSV reader. The pyarrow engine returns Arrow-backed dtypes.
+
+    ...
+
+    Attributes
+    ----------
+    engine : Literal['pandas', 'pyarrow']
+        The parse engine.
+
+    Methods
+    -------
+    read_records(source, dtype: dict = None, parse_dates: list = None) -> DataFrame
+        Parses a records export, optionally with explicit dtypes and date columns.
+    read_metadata(source) -> DataFrame
+        Parses a metadata export keeping every value as string.
+    join_csv(files: list) -> SpooledTemporaryFile | None
+        Joins CSV exports under a single header.
+    """
+
+    ENGINES = ('pandas', 'pyarrow')
+
+    def __init__(self, engine: Literal['pandas', 'pyarrow'] = 'pandas'):
+        if engine not in self.ENGINES:
+            raise ValueError(f'Invalid parse engine {engine}, must be one of {self.ENGINES}')
+        if engine == 'pyarrow':
+            _import_pyarrow()
+        self.engine = engine
+
+    @staticmethod
+    def join_csv(files: list, max_size: int = 64 * 1024 ** 2) -> SpooledTemporaryFile | None:
+        """
+        Join CSV exports under the header of the first one.
+
+        Parameters
+        ----------
+        files : list
+            Binary file objects positioned at their start.
+        max_size : int, optional
+            Size in bytes above which the joined file rolls over from memory to disk (default is 64 MB).
+
+        Returns
+        -------
+        SpooledTemporaryFile | None
+            The joined file positioned at its start, or None if the headers differ (files are rewound).
+        """
+        headers = [file.readline() for file in files]
+        if len(set(headers)) > 1:
+            for file in files:
+                file.seek(0)
+            return None
+
+        joined = SpooledTemporaryFile(max_size=max_size)  # pylint: disable=consider-using-with
+        joined.write(headers[0] if headers[0].endswith(b'\n') else headers[0] + b'\n')
+        for file in files:
+            shutil.copyfileobj(file, joined)
+            # Make sure the next body starts on a new line
+            joined.seek(-1, 2)
+            if joined.read(1) != b'\n':
+                joined.write(b'\n')
+        joined.seek(0)
+        return joined
+
+    @staticmethod
+    def _as_file(source: bytes | str | BinaryIO) -> str | BinaryIO:
+        """Wrap bytes in a file object, paths and file objects are returned as is."""
+        if isinstance(source, bytes):
+            return BytesIO(source)
+        return source
+
+    @staticmethod
+    def _read_header(source: bytes | str | BinaryIO) -> pd.Index:
+        """Read only the column names of a CSV source."""
+        file = ParseHandler._as_file(source)
+        position = file.tell() if hasattr(file, 'tell') else None
+        columns = pd.read_csv(file, nrows=0).columns
+        if position is not None:
+            file.seek(position)
+        return columns
+
+    def read_records(
+            self,
+            source: bytes | str | BinaryIO,
+            dtype: dict[str, str] = None,
+            parse_dates: list[str] = None
+    ) -> DataFrame:
+        """
+        Parse a CSV records export.
+
+        Parameters
+        ----------
+        source : bytes | str | BinaryIO
+            The raw export, a path or a binary file object.
+        dtype : dict[str, str], optional
+            Column dtypes ('category', 'Int64' or 'Float64'), columns missing from the export are ignored.
+        parse_dates : list[str], optional
+            Columns to parse as dates, columns missing from the export are ignored.
+
+        Returns
+        -------
+        DataFrame
+            The parsed records. Numeric columns holding values that don't fit their dtype (e.g. missing data codes)
+            keep the inferred dtype.
+        """
+        if dtype or parse_dates:
+            columns = self._read_header(source)
+            dtype = {col: col_dtype for col, col_dtype in (dtype or {}).items() if col in columns}
+            parse_dates = [col for col in parse_dates or [] if col in columns]
+
+        if self.engine == 'pyarrow':
+            return self._read_records_pyarrow(source, dtype, parse_dates)
+        return self._read_records_pandas(source, dtype, parse_dates)
+
+    def _read_records_pandas(self, source, dtype: dict | None, parse_dates: list | None) -> DataFrame:
+        if not dtype and not parse_dates:
+            return pd.read_csv(self._as_file(source), low_memory=False)
+
+        position = source.tell() if hasattr(source, 'tell') else None
+        try:
+            return pd.read_csv(self._as_file(source), low_memory=False, dtype=dtype, parse_dates=parse_dates)
+        except (ValueError, TypeError) as e:
+            # Expected when numeric fields hold missing data codes, the columns that don't fit are logged by the cast
+            logging.info('Codebook dtypes do not fit every column (%s), casting columns one by one.', e)
+        if position is not None:
+            source.seek(position)
+
+        # Numeric fields may hold missing data codes or invalid values, cast them one by one
+        categorical_dtype = {col: col_dtype for col, col_dtype in dtype.items() if col_dtype == 'category'}
+        df = pd.read_csv(self._as_file(source), low_memory=False, dtype=categorical_dtype, parse_dates=parse_dates)
+        return self._cast_columns(df, dtype)
+
+    def _read_records_pyarrow(self, source, dtype: dict | None, parse_dates: list | None) -> DataFrame:
+        pyarrow, csv = _import_pyarrow()
+        arrow_types = {
+            'category': pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+            'Int64': pyarrow.int64(),
+            'Float64': pyarrow.float64(),
+        }
+        column_types = {col: arrow_types[col_dtype] for col, col_dtype in (dtype or {}).items()}
+        column_types.update({col: pyarrow.timestamp('s') for col in parse_dates or []})
+
+        def read(types: dict):
+            file = pyarrow.BufferReader(source) if isinstance(source, bytes) else source
+            return csv.read_csv(file,
+                                read_options=csv.ReadOptions(use_threads=True),
+                                convert_options=csv.ConvertOptions(column_types=types, strings_can_be_null=True))
+
+        position = source.tell() if hasattr(source, 'tell') else None
+        fallback = False
+        try:
+            table = read(column_types)
+        except pyarrow.ArrowInvalid as e:
+            logging.info('Codebook dtypes do not fit every column (%s), casting columns one by one.', e)
+            if position is not None:
+                source.seek(position)
+            table = read({col: arrow_type for col, arrow_type in column_types.items()
+                          if pyarrow.types.is_dictionary(arrow_type)})
+            fallback = True
+
+        # Dictionary columns become pandas categoricals, everything else is Arrow-backed
+        df = table.to_pandas(
+            types_mapper=lambda arrow_type: None if pyarrow.types.is_dictionary(arrow_type)
+            else pd.ArrowDtype(arrow_type))
+        if fallback:
+            df = self._cast_columns(df, {**dtype, **dict.fromkeys(parse_dates, 'datetime64[s]')})
+        return df
+
+    @staticmethod
+    def _cast_columns(df: DataFrame, dtype: dict[str, str]) -> DataFrame:
+        """Cast columns one by one, keeping the current dtype of columns that don't fit."""
+        for col, col_dtype in dtype.items():
+            if col_dtype == 'category':
+                continue
+            try:
+                df[col] = df[col].astype(col_dtype)
+            except (ValueError, TypeError):
+                logging.warning('Column %s has values that are not %s, keeping %s dtype.',
+                                col, col_dtype, df[col].dtype)
+        return df
+
+    def read_metadata(self, source: bytes | str | BinaryIO) -> DataFrame:
+        """
+        Parse a CSV metadata export (codebook, instruments, DAGs...) keeping every value as string,
+        with empty values as empty strings like the JSON export.
+        """
+        if isinstance(source, bytes) and not source.strip():
+            return pd.DataFrame()
+
+        if self.engine == 'pandas':
+            return pd.read_csv(self._as_file(source), dtype=str, keep_default_na=False)
+
+        pyarrow, csv = _import_pyarrow()
+        file = pyarrow.BufferReader(source) if isinstance(source, bytes) else source
+        # Reading the header as the first row makes every column a string column
+        table = csv.read_csv(file,
+                             read_options=csv.ReadOptions(use_threads=True, autogenerate_column_names=True),
+                             convert_options=csv.ConvertOptions(strings_can_be_null=False,
+                                                                quoted_strings_can_be_null=False))
+        df = table.to_pandas()
+        df.columns = df.iloc[0].tolist()
+        return df.iloc[1:].reset_index(drop=True)
@@ -0,0 +1,195 @@
+import inspect
+import logging
+
+from pyredcap.handlers.column_handler import ColumnHandler
+from pyredcap.handlers.profile_handler import ProfileHandler
+from pyredcap.handlers.transformer_handler import TransformerHandler
+
+
+class PlanHandler:
+    """
+    A class used to plan the execution of transformer instructions.
+
+    Instructions are run one by one by ``TransformerHandler.run_instructions``, each over the whole DataFrame. A plan
+    groups them into steps:
+
+    - column passes: consecutive column-wise instructions (see ``DataCleaning.column_operations``) fused in a single
+      pass, each column going once through its operations, in instruction order, and the DataFrame being rebuilt once;
+    - calls: every other instruction, run as is.
+
+    Column-wise operations on columns dropped later (drop_features, following rename_features) are pruned, unless the
+    operation has other effects (e.g. storing outliers) or an instruction that may read the column runs in between.
+
+    ...
+
+    Methods
+    -------
+    run_instructions(transformer: any, instructions: dict[str, any]) -> None
+        Builds the plan of the instructions, logs it and executes it.
+    build_plan(transformer: any, instructions: dict[str, any]) -> list[dict[str, any]]
+        Builds the plan of the instructions.
+    explain(plan: list[dict[str, any]]) -> str
+        Describes the plan, one line per step.
+    execute(transformer: any, plan: list[dict[str, any]]) -> None
+        Executes the plan.
+    """
+
+    # Instructions the planner follows the columns through, with the parameter holding the columns
+    DROP_INSTRUCTIONS = {'drop_features': 'columns'}
+    RENAME_INSTRUCTIONS = {'rename_features': 'mapping'}
+
+    @staticmethod
+    def run_instructions(transformer: any, instructions: dict[str, any]) -> None:
+        """Build the plan of the instructions, log it and execute it, as ``TransformerHandler.run_instructions``."""
+        plan = PlanHandler.build_plan(transformer, instructions)
+        logging.info('Instruction plan of %s:\n%s', transformer.__class__.__name__, PlanHandler.explain(plan))
+        PlanHandler.execute(transformer, plan)
+
+    @staticmethod
+    def _bind(method, params: any) -> dict[str, any]:
+        """Bind instruction params to the method signature, defaults included."""
+        if params is None:
+            bound = inspect.signature(method).bind()
+        elif isinstance(params, list):
+            bound = inspect.signature(method).bind(*params)
+        elif isinstance(params, dict):
+            bound = inspect.signature(method).bind(**params)
+        else:
+            raise ValueError(f"Invalid parameters for method {method.__name__}")
+        bound.apply_defaults()
+        return dict(bound.arguments)
+
+    @staticmethod
+    def build_plan(transformer: any, instructions: dict[str, any]) -> list[dict[str, any]]:
+        """
+        Build the plan of the instructions.
+
+        Parameters
+        ----------
+        transformer : any
+            The transformer object to be used, column passes require a ``column_operations`` method.
+        instructions : dict[str, any]
+            A dictionary containing the instructions to be executed, as in ``TransformerHandler.run_instructions``.
+
+        Returns
+        -------
+        list[dict[str, any]]
+            The plan steps, in order. Call steps hold the 'method' and 'params' of the instruction, column passes
+            hold their 'instructions', each with its 'method', bound 'params', planned 'columns' and 'pruned'
+            columns.
+
+        Raises
+        ------
+        ValueError
+            If an instruction is not a method of the transformer or has invalid parameters.
+        """
+        column_operations = getattr(transformer, 'column_operations', None)
+
+        entries = []
+        for method_name, params in instructions.items():
+            method = TransformerHandler.get_method(transformer, method_name)
+            kwargs = PlanHandler._bind(method, params)
+            operations = column_operations(method_name, kwargs) if column_operations else None
+            entries.append({
+                'method': method_name,
+                'params': params,
+                'kwargs': kwargs,
+                'operations': operations,
+            })
+
+        # Walk backwards tracking the columns dropped later and not read meanwhile
+        dead: set[str] = set()
+        for entry in reversed(entries):
+            method_name, kwargs = entry['method'], entry['kwargs']
+            if method_name in PlanHandler.DROP_INSTRUCTIONS:
+                columns = kwargs[PlanHandler.DROP_INSTRUCTIONS[method_name]]
+                dead |= {columns} if isinstance(columns, str) else set(columns)
+            elif method_name in PlanHandler.RENAME_INSTRUCTIONS:
+                mapping: dict = kwargs[PlanHandler.RENAME_INSTRUCTIONS[method_name]]
+                renamed_from = {new: old for old, new in mapping.items()}
+                # Columns renamed away don't exist after the rename under their old name
+                dead = {renamed_from.get(col, col) for col in dead
+                        if col in renamed_from or col not in mapping}
+            elif entry['operations'] is not None:
+                entry['pruned'] = {col for col, _, prunable in entry['operations'] if prunable and col in dead}
+            else:
+                # Any column may be read
+                dead = set()
+
+        plan = []
+        for entry in entries:
+            if entry['operations'] is None:
+                plan.append({'kind': 'call', 'method': entry['method'], 'params': entry['params']})
+                continue
+            instruction = {
+                'method': entry['method'],
+                'params': entry['kwargs'],
+                'columns': list(dict.fromkeys(col for col, _, _ in entry['operations'])),
+                'pruned': entry['pruned'],
+            }
+            if plan and plan[-1]['kind'] == 'columns':
+                plan[-1]['instructions'].append(instruction)
+            else:
+                plan.append({'kind': 'columns', 'instructions': [instruction]})
+        return plan
+
+    @staticmethod
+    def explain(plan: list[dict[str, any]]) -> str:
+        """Describe the plan, one line per step followed by the pruned operations of column passes."""
+        n_instructions = sum(len(step['instructions']) if step['kind'] == 'columns' else 1 for step in plan)
+        n_pruned = sum(len(instruction['pruned']) for step in plan if step['kind'] == 'columns'
+                       for instruction in step['instructions'])
+        lines = [f'{n_instructions} instructions in {len(plan)} steps, {n_pruned} column operations pruned']
+
+        for number, step in enumerate(plan, start=1):
+            if step['kind'] == 'call':
+                lines.append(f'{number:>3}. call {step["method"]}')
+                continue
+            instructions = step['instructions']
+            columns = {col for instruction in instructions
+                       for col in instruction['columns'] if col not in instruction['pruned']}
+            kind = 'fused column pass' if len(instructions) > 1 else 'column pass'
+            lines.append(f'{number:>3}. {kind} {" + ".join(instruction["method"] for instruction in instructions)} '
+                         f'over {len(columns)} columns')
+            for instruction in instructions:
+                if instruction['pruned']:
+                    lines.append(f'       pruned {instruction["method"]} on columns dropped later: '
+                                 f'{sorted(instruction["pruned"])}')
+        return '\n'.join(lines)
+
+    @staticmethod
+    def execute(transformer: any, plan: list[dict[str, any]]) -> None:
+        """Execute the plan, column passes rebuilding the transformer DataFrame once."""
+        for step in plan:
+            if step['kind'] == 'call':
+                TransformerHandler.run_instruction(transformer, step['method'], step['params'])
+                continue
+
+            if ProfileHandler.hooks:
+                method_name = ' + '.join(instruction['method'] for instruction in step['instructions'])
+                with ProfileHandler.profile(transformer, method_name):
+                    PlanHandler._run_column_pass(transformer, step)
+            else:
+                PlanHandler._run_column_pass(transformer, step)
+
+    @staticmethod
+    def _run_column_pass(transformer: any, step: dict[str, any]) -> None:
+        # Chain the operations of each column, in instruction order
+        chains: dict[str, list] = {}
+        for instruction in step['instructions']:
+            # Columns are resolved again, previous steps may have changed them
+            operations = transformer.column_operations(instruction['method'], instruction['params'])
+            for col, function, prunable in operations:
+                if prunable and col in instruction['pruned']:
+                    continue
+                chains.setdefault(col, []).append(function)
+
+        staged = ColumnHandler(transformer.df)
+        for col, functions in chains.items():
+            logging.debug('Column pass on %s: %s operations.', col, len(functions))
+            values = staged[col]
+            for function in functions:
+                # Align like a column assignment, the next operation reads the whole column
+                values = function(values).reindex(transformer.df.index)
+            staged.assign(col, values)
+        transformer.df = staged.commit()
@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from pandas import DataFrame
+
+
+def _current_rss() -> int | None:
+    """Resident set size of the process in bytes, the peak RSS where the current one is not available."""
+    try:
+        with open('/proc/self/statm', 'rb') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        # pylint: disable=import-outside-toplevel
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _shape(transformer: any) -> tuple[int | None, int | None]:
+    df = getattr(transformer, 'df', None)
+    if isinstance(df, DataFrame):
+        return df.shape
+    return None, None
+
+
+class LoggingHook:
+    """
+    Profile hook logging one line per event.
+
+    Parameters
+    ----------
+    level : int, optional
+        The logging level (default is logging.INFO).
+    logger : logging.Logger, optional
+        The logger to use (default is the root logger).
+    """
+
+    def __init__(self, level: int = logging.INFO, logger: logging.Logger = None):
+        self.level = level
+        self.logger = logger or logging.getLogger()
+
+    def __call__(self, event: dict[str, any]) -> None:
+        rss_delta = event['rss_delta'] / 1024 ** 2 if event['rss_delta'] is not None else float('nan')
+        self.logger.log(
+            self.level,
+            '%s.%s (form %s): %.3fs wall, %.3fs CPU, %+.1f MB RSS, %sx%s -> %sx%s%s',
+            event['transformer'], event['method'], event['form_name'], event['wall_time'], event['cpu_time'],
+            rss_delta, event['rows_in'], event['columns_in'], event['rows_out'], event['columns_out'],
+            f", failed: {event['error']}" if event['error'] else ''
+        )
+
+
+class JSONLinesHook:
+    """
+    Profile hook appending each event as a JSON line to a file.
+
+    The file is opened for each event, so several processes can append to the same file.
+
+    Parameters
+    ----------
+    path : str
+        The path of the JSON lines file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, event: dict[str, any]) -> None:
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(event) + '\n')
+
+
+class ProfileHandler:
+    """
+    A class used to profile the instructions run by ``TransformerHandler.run_instructions``.
+
+    Hooks are callables receiving one event (a dict) per instruction, see ``LoggingHook`` and ``JSONLinesHook``.
+    While no hook is registered, instructions run without any profiling.
+
+    Events hold:
+
+    - transformer, method, form_name: the transformer class, the instruction (or the fused instructions of a column
+      pass) and the form of the transformer (None if it has no form_name);
+    - started: the epoch time the instruction started;
+    - wall_time, cpu_time: the elapsed and process CPU time in seconds;
+    - rss_delta: the change of resident memory in bytes (None if not available);
+    - rows_in, columns_in, rows_out, columns_out: the shape of the transformer DataFrame before and after;
+    - error: the exception raised by the instruction, None on success.
+
+    ...
+
+    Attributes
+    ----------
+    hooks : list[Callable[[dict], None]]
+        The registered hooks, shared by every transformer.
+
+    Methods
+    -------
+    add_hook(hook: Callable[[dict], None]) -> None
+        Registers a hook.
+    remove_hook(hook: Callable[[dict], None]) -> None
+        Unregisters a hook.
+    hooked(*hooks: Callable[[dict], None]) -> Iterator[None]
+        Context manager registering hooks for the duration of the block.
+    profile(transformer: any, method_name: str) -> Iterator[None]
+        Context manager emitting the event of the instruction run in the block.
+    """
+
+    hooks: list[Callable[[dict], None]] = []
+
+    @staticmethod
+    def add_hook(hook: Callable[[dict], None]) -> None:
+        """Register a hook, called with every event."""
+        ProfileHandler.hooks.append(hook)
+
+    @staticmethod
+    def remove_hook(hook: Callable[[dict], None]) -> None:
+        """Unregister a hook, ignoring hooks not registered."""
+        if hook in ProfileHandler.hooks:
+            ProfileHandler.hooks.remove(hook)
+
+    @staticmethod
+    @contextmanager
+    def hooked(*hooks: Callable[[dict], None]) -> Iterator[None]:
+        """Register hooks for the duration of the block."""
+        for hook in hooks:
+            ProfileHandler.add_hook(hook)
+        try:
+            yield
+        finally:
+            for hook in hooks:
+                ProfileHandler.remove_hook(hook)
+
+    @staticmethod
+    def emit(event: dict[str, any]) -> None:
+        """Send an event to every hook, a failing hook doesn't stop the instructions."""
+        for hook in list(ProfileHandler.hooks):
+            try:
+                hook(event)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logging.exception('Profile hook %r failed.', hook)
+
+    @staticmethod
+    @contextmanager
+    def profile(transformer: any, method_name: str) -> Iterator[None]:
+        """
+        Emit the event of the instruction run in the block.
+
+        Parameters
+        ----------
+        transformer : any
+            The transformer object running the instruction.
+        method_name : str
+            The name of the instruction.
+        """
+        rows_in, columns_in = _shape(transformer)
+        rss_in = _current_rss()
+        started = time.time()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            rss_out = _current_rss()
+            rows_out, columns_out = _shape(transformer)
+            ProfileHandler.emit({
+                'transformer': transformer.__class__.__name__,
+                'method': method_name,
+                'form_name': getattr(transformer, 'form_name', None),
+                'started': started,
+                'wall_time': wall_time,
+                'cpu_time': cpu_time,
+                'rss_delta': rss_out - rss_in if rss_in is not None and rss_out is not None else None,
+                'rows_in': rows_in,
+                'columns_in': columns_in,
+                'rows_out': rows_out,
+                'columns_out': columns_out,
+                'error': error,
+            })
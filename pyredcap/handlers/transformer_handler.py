@@ -1,9 +1,14 @@
 import re
 import logging
-from typing import Union
+from functools import partial
+from itertools import chain, repeat
+from typing import Callable, Union
 
 import numpy as np
-from pandas import DataFrame
+import pandas as pd
+from pandas import CategoricalDtype, DataFrame, Series
+
+from pyredcap.handlers.profile_handler import ProfileHandler
 
 
 class TransformerHandler:
@@ -16,18 +21,42 @@ class TransformerHandler:
     -------
     run_instructions(transformer: any, instructions: dict[str, any]) -> None
         Run instructions for a transformer object.
+    get_method(transformer: any, method_name: str) -> Callable
+        Get the method of an instruction, raising ValueError if it is not a method of the transformer.
+    run_instruction(transformer: any, method_name: str, params: any) -> None
+        Run a single instruction.
     replace_label(x, mapping: dict) -> any
         Replace values in a Series according to a mapping dictionary.
+    list_mask(values) -> np.ndarray
+        Boolean mask of the lists/arrays in a Series.
+    replace_labels(values: Series, mapping: dict) -> Series
+        Vectorized replace_label over a Series.
     replace_array_item(index: int, value: any, df: DataFrame, other_column: str, other_value: str) -> any
         Replace an item in an array if it contains the other_value.
+    lower_strings(values: Series) -> Series
+        Lowercase the strings of a Series.
+    replace_list_items(values: Series, other_values: Series, other_value: str) -> Series
+        Vectorized replace_array_item over a Series.
     extract_ids_and_descriptions(x: str, pattern: str) -> Union[list[str], float]
         Extract IDs and descriptions from a string based on a pattern.
+    extract_ids_and_descriptions_batch(values: Series, pattern: str) -> DataFrame
+        Vectorized extract_ids_and_descriptions over a Series.
     validate_cpf(cpf: str, return_value: bool = True)
         Algorithm to validate CPF numbers.
     validate_cns(cns: str, return_value: bool = True)
         Algorithm to validate CNS numbers.
+    validate_cpf_batch(values: Series) -> tuple[Series, Series]
+        Vectorized validate_cpf over a Series.
+    validate_cns_batch(values: Series) -> tuple[Series, Series]
+        Vectorized validate_cns over a Series.
     """
 
+    # Whitespaces collapsed before extracting codes, single spaces are left as is (same as re.sub(r'\s+', ' ', x))
+    WHITESPACE_PATTERN = re.compile(r'\s{2,}|[^\S ]')
+
+    # Longest value checked by validate_cpf_batch in its code point matrix, longer ones are checked one by one
+    ID_MAX_WIDTH = 32
+
     @staticmethod
     def run_instructions(transformer: any, instructions: dict[str, any]) -> None:
         """
@@ -46,20 +75,42 @@ class TransformerHandler:
         None
         """
         for method_name, params in instructions.items():
-            method = getattr(transformer, method_name, None)
-
-            if method is None or not callable(method):
-                class_name = transformer.__class__.__name__
-                raise ValueError(f"{method_name} is not a valid method of the {class_name} class")
-
-            if params is None:
-                method()
-            elif isinstance(params, list):
-                method(*params)
-            elif isinstance(params, dict):
-                method(**params)
-            else:
-                raise ValueError(f"Invalid parameters for method {method_name}")
+            TransformerHandler.run_instruction(transformer, method_name, params)
+
+    @staticmethod
+    def get_method(transformer: any, method_name: str) -> Callable:
+        """Get the method of an instruction, raising ValueError if it is not a method of the transformer."""
+        method = getattr(transformer, method_name, None)
+
+        if method is None or not callable(method):
+            class_name = transformer.__class__.__name__
+            raise ValueError(f"{method_name} is not a valid method of the {class_name} class")
+        return method
+
+    @staticmethod
+    def run_instruction(transformer: any, method_name: str, params: any) -> None:
+        """
+        Run a single instruction, params being None, a list of positional or a dict of keyword arguments.
+        The instruction is profiled while hooks are registered in ``ProfileHandler``.
+        """
+        method = TransformerHandler.get_method(transformer, method_name)
+
+        if ProfileHandler.hooks:
+            with ProfileHandler.profile(transformer, method_name):
+                TransformerHandler._call(method, method_name, params)
+        else:
+            TransformerHandler._call(method, method_name, params)
+
+    @staticmethod
+    def _call(method: Callable, method_name: str, params: any) -> None:
+        if params is None:
+            method()
+        elif isinstance(params, list):
+            method(*params)
+        elif isinstance(params, dict):
+            method(**params)
+        else:
+            raise ValueError(f"Invalid parameters for method {method_name}")
 
     @staticmethod
     def replace_label(x, mapping: dict) -> any:
@@ -73,6 +124,69 @@ class TransformerHandler:
         except KeyError:
             return x
 
+    @staticmethod
+    def list_mask(values) -> np.ndarray:
+        """Boolean mask of the lists/arrays (decoded checkbox fields) in a Series or object array."""
+        array = np.asarray(values, dtype=object)
+        # Most columns hold no list, checking the distinct types is enough
+        if not any(issubclass(kind, (np.ndarray, list)) for kind in set(map(type, array))):
+            return np.zeros(len(array), dtype=bool)
+        return np.fromiter(map(isinstance, array, repeat((np.ndarray, list))), dtype=bool, count=len(array))
+
+    @staticmethod
+    def _flatten(lists: np.ndarray) -> tuple[list, np.ndarray]:
+        """Flatten lists/arrays, returning the items and the offsets of each row (row i is items[o[i]:o[i + 1]])."""
+        lengths = np.fromiter((len(x) for x in lists), dtype=np.int64, count=len(lists))
+        return list(chain.from_iterable(lists)), np.r_[0, np.cumsum(lengths)]
+
+    @staticmethod
+    def replace_labels(values: Series, mapping: dict) -> Series:
+        """
+        Vectorized ``replace_label`` over a Series: values missing from the mapping are kept (fill-through).
+
+        Scalar values are factorized, each distinct value being looked up once. Lists/arrays (decoded checkbox fields)
+        are flattened and mapped at once, then cut back into one list per row; like ``replace_label``, a list holding
+        any value missing from the mapping is kept as is.
+        """
+        if isinstance(values.dtype, CategoricalDtype):
+            # Categoricals map each category once
+            return values.apply(partial(TransformerHandler.replace_label, mapping=mapping))
+        if not pd.api.types.is_object_dtype(values):
+            values = values.astype(object)
+
+        array = values.to_numpy(dtype=object)
+        result = array.copy()
+        is_list = TransformerHandler.list_mask(array)
+
+        # Scalar values, each distinct value is looked up once
+        scalars = array[~is_list] if is_list.any() else array
+        codes, uniques = pd.factorize(scalars)
+        found = np.fromiter((value in mapping for value in uniques), dtype=bool, count=len(uniques))
+        mapped = np.array([mapping.get(value, value) for value in uniques] + [None], dtype=object)
+        # Missing values (code -1) are kept
+        codes = np.where(np.append(found, False)[codes], codes, -1)
+        result[~is_list] = np.where(codes >= 0, mapped[codes], scalars)
+
+        if is_list.any():
+            result[is_list] = TransformerHandler._replace_list_labels(array[is_list], mapping)
+
+        # Infer the dtype like Series.apply
+        return Series(result, index=values.index, name=values.name).infer_objects()
+
+    @staticmethod
+    def _replace_list_labels(lists: np.ndarray, mapping: dict) -> np.ndarray:
+        """Map the items of lists/arrays at once, lists holding an item missing from the mapping are kept."""
+        # Flattened, then cut back at each row boundary
+        flat, offsets = TransformerHandler._flatten(lists)
+        found = np.fromiter((value in mapping for value in flat), dtype=bool, count=len(flat))
+        mapped = [mapping.get(value) for value in flat]
+        missing = np.r_[0, np.cumsum(~found)]
+        row_missing = (missing[offsets[1:]] - missing[offsets[:-1]]).tolist()
+        rows = np.empty(len(lists), dtype=object)
+        for i, (start, end, n_missing) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist(), row_missing)):
+            rows[i] = lists[i] if n_missing else mapped[start:end]
+        return rows
+
     @staticmethod
     def replace_array_item(
             index: int,
@@ -88,6 +202,47 @@ class TransformerHandler:
 
         return value
 
+    @staticmethod
+    def lower_strings(values: Series) -> Series:
+        """Lowercase the strings of a Series, other values are kept."""
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+            return values
+        try:
+            lowered = values.str.lower()
+        except AttributeError:
+            # No string values
+            return values
+        return lowered.where(lowered.notna(), values)
+
+    @staticmethod
+    def replace_list_items(values: Series, other_values: Series, other_value: str) -> Series:
+        """
+        Vectorized ``replace_array_item`` over a Series: in each list/array, items matching other_value
+        (case-insensitive) are replaced by the value of other_values on the same row.
+
+        Lists are flattened, the matching items replaced at once and the items cut back into one list per row.
+        Values other than lists/arrays are kept.
+        """
+        array = values.to_numpy(dtype=object)
+        is_list = TransformerHandler.list_mask(array)
+        if not is_list.any():
+            return values
+
+        lists = array[is_list]
+        flat, offsets = TransformerHandler._flatten(lists)
+        items = Series(flat, dtype=object)
+        match = (TransformerHandler.lower_strings(items) == other_value).to_numpy()
+        # Other value of the row of each item
+        rows = np.repeat(np.flatnonzero(is_list), np.diff(offsets))
+        items = np.where(match, other_values.to_numpy(dtype=object)[rows], items.to_numpy()).tolist()
+
+        replaced = np.empty(len(lists), dtype=object)
+        for i, (start, end) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist())):
+            replaced[i] = items[start:end]
+        result = array.copy()
+        result[is_list] = replaced
+        return Series(result, index=values.index, name=values.name)
+
     @staticmethod
     def extract_ids_and_descriptions(x: str, pattern: str) -> Union[list[str], float]:
         """ Extract IDs and descriptions from a string based on a pattern."""
@@ -110,6 +265,69 @@ class TransformerHandler:
 
         return [extracted_id, extracted_description]
 
+    @staticmethod
+    def extract_ids_and_descriptions_batch(values: Series, pattern: str) -> DataFrame:
+        """
+        Vectorized ``extract_ids_and_descriptions`` over a Series, both outputs being extracted in one pass.
+
+        Values are factorized first, each distinct value being split once. Whitespaces are collapsed with
+        ``Series.str.replace`` and the matches of the pattern found with ``Series.str.findall``; the matches of each
+        value are joined into its code and the description taken after the last match, as in
+        ``extract_ids_and_descriptions``.
+
+        Parameters
+        ----------
+        values : Series
+            The values to split, values other than strings have no matches.
+        pattern : str
+            The pattern of the codes, with at most one group (the code, the whole match if there is no group).
+
+        Returns
+        -------
+        DataFrame
+            The stripped 'code' and 'description' of the values with matches, with their index.
+
+        Raises
+        ------
+        ValueError
+            If the pattern has more than one group.
+        """
+        regex = re.compile(pattern)
+        if regex.groups > 1:
+            raise ValueError(f'Pattern {pattern} has more than one group.')
+
+        # Each distinct string is split once, diagnosis columns repeat the values of a catalog
+        array = values.to_numpy(dtype=object)
+        is_str = np.fromiter(map(isinstance, array, repeat(str)), dtype=bool, count=len(array))
+        positions = np.flatnonzero(is_str)
+        value_codes, uniques = pd.factorize(array[positions])
+        split, matched = TransformerHandler._split_uniques(uniques, regex)
+        has_matches = matched[value_codes]
+        rows = positions[has_matches]
+        codes, descriptions = split[value_codes[has_matches]].T
+
+        unmatched = values.iloc[np.setdiff1d(np.arange(len(values)), rows)].dropna()
+        if len(unmatched):
+            logging.warning('No matches found for %s values: %s', len(unmatched), unmatched.unique()[:5].tolist())
+        return DataFrame({'code': codes, 'description': descriptions}, index=values.index[rows], dtype=object)
+
+    @staticmethod
+    def _split_uniques(uniques: np.ndarray, regex: re.Pattern) -> tuple[np.ndarray, np.ndarray]:
+        """Code and description of distinct strings, and whether each string has matches."""
+        text = Series(uniques, dtype=object).str.replace(TransformerHandler.WHITESPACE_PATTERN, ' ', regex=True)
+        found = text.str.findall(regex)
+
+        # Code and description of each string in one pass, the description follows the last match
+        split = np.empty((len(uniques), 2), dtype=object)
+        matched = np.zeros(len(uniques), dtype=bool)
+        for i, (subject, matches) in enumerate(zip(text.tolist(), found.tolist())):
+            if matches:
+                last_match = matches[-1]
+                split[i] = (' - '.join(matches).strip(),
+                            subject[subject.rfind(last_match) + len(last_match) + 3:].strip())
+                matched[i] = True
+        return split, matched
+
     @staticmethod
     def validate_cpf(cpf: str, return_value: bool = True):
         """Algorithm to validate CPF numbers."""
@@ -181,6 +399,125 @@ class TransformerHandler:
             return false
         return false
 
+    @staticmethod
+    def _code_points(text: np.ndarray) -> np.ndarray:
+        """Matrix of the code points of strings, one row per string padded with zeros."""
+        width = max(max(map(len, text), default=0), 1)
+        return text.astype(f'U{width}').view(np.uint32).reshape(len(text), width)
+
+    @staticmethod
+    def validate_cpf_batch(values: Series) -> tuple[Series, Series]:
+        """
+        Vectorized ``validate_cpf`` over a Series.
+
+        Values are converted to a matrix of code points, non-digit characters being masked out, and the digits of
+        values with 11 digits gathered in a digit matrix, both verification digits being computed with
+        matrix-vector products. Values longer than ``ID_MAX_WIDTH`` characters or holding non-ASCII characters
+        (other Unicode digits) go through ``validate_cpf``.
+
+        Returns
+        -------
+        tuple[Series, Series]
+            The boolean mask of valid CPF numbers (``validate_cpf(x, return_value=False)``) and the normalized
+            values, digits only, NaN if invalid (``validate_cpf(x)``), with the index of values.
+        """
+        text = values.astype(str).to_numpy(dtype=object)
+        lengths = np.fromiter(map(len, text), dtype=np.int64, count=len(text))
+        scalar = lengths > TransformerHandler.ID_MAX_WIDTH
+        valid = np.zeros(len(text), dtype=bool)
+        normalized = np.full(len(text), np.nan, dtype=object)
+
+        positions = np.flatnonzero(~scalar)
+        codes = TransformerHandler._code_points(text[positions])
+        is_digit = (codes >= ord('0')) & (codes <= ord('9'))
+        is_ascii = (codes < 128).all(axis=1)
+        scalar[positions[~is_ascii]] = True
+        candidates = is_ascii & (is_digit.sum(axis=1) == 11)
+        if candidates.any():
+            # Digits of each candidate, in order
+            matrix = (codes[candidates][is_digit[candidates]] - ord('0')).astype(np.int64).reshape(-1, 11)
+            first_digit = (matrix[:, :9] @ np.arange(10, 1, -1) * 10 % 11) % 10
+            second_digit = (matrix[:, :10] @ np.arange(11, 1, -1) * 10 % 11) % 10
+            checked = (matrix[:, 9] == first_digit) & (matrix[:, 10] == second_digit)
+            rows = positions[candidates][checked]
+            valid[rows] = True
+            normalized[rows] = (matrix[checked] + ord('0')).astype(np.uint32).view('U11').ravel().astype(object)
+
+        if scalar.any():
+            rows = np.flatnonzero(scalar)
+            others = values.iloc[rows].apply(TransformerHandler.validate_cpf)
+            normalized[rows] = others.to_numpy(dtype=object)
+            valid[rows] = others.notna().to_numpy()
+        return (Series(valid, index=values.index, name=values.name),
+                Series(normalized, index=values.index, name=values.name))
+
+    @staticmethod
+    def validate_cns_batch(values: Series) -> tuple[Series, Series]:
+        """
+        Vectorized ``validate_cns`` over a Series.
+
+        Strings of 15 ASCII digits are converted to a digit matrix, the check of numbers starting in 1 or 2
+        (verification digit of the first 11 digits) and in 7, 8 or 9 (weighted sum of all digits) being computed with
+        matrix-vector products. Other strings of another length once stripped are invalid, any other value goes
+        through ``validate_cns``.
+
+        Returns
+        -------
+        tuple[Series, Series]
+            The boolean mask of valid CNS numbers (``validate_cns(x, return_value=False)``) and the values, NaN if
+            invalid (``validate_cns(x)``), with the index of values.
+        """
+        array = values.to_numpy(dtype=object)
+        valid = np.zeros(len(array), dtype=bool)
+        scalar = ~np.fromiter(map(isinstance, array, repeat(str)), dtype=bool, count=len(array))
+
+        positions = np.flatnonzero(~scalar)
+        strings = array[positions]
+        lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+        candidates = lengths == 15
+        codes = TransformerHandler._code_points(strings[candidates])
+        all_digits = ((codes >= ord('0')) & (codes <= ord('9'))).all(axis=1)
+        candidates[candidates] = all_digits
+
+        if candidates.any():
+            matrix = (codes[all_digits] - ord('0')).astype(np.int64)
+            first = matrix[:, 0]
+            valid[positions[candidates]] = np.select(
+                [np.isin(first, [1, 2]), np.isin(first, [7, 8, 9])],
+                [TransformerHandler._valid_pis_cns(matrix), TransformerHandler._valid_provisional_cns(matrix)], False)
+
+        # Digits mixed with other characters, whitespace or not
+        others = positions[~candidates]
+        scalar[others] = np.fromiter((len(value.strip()) == 15 for value in array[others]), dtype=bool,
+                                     count=len(others))
+
+        normalized = np.where(valid, array, np.nan)
+        if scalar.any():
+            rows = np.flatnonzero(scalar)
+            results = values.iloc[rows].apply(TransformerHandler.validate_cns)
+            normalized[rows] = results.to_numpy(dtype=object)
+            valid[rows] = results.notna().to_numpy()
+        return (Series(valid, index=values.index, name=values.name),
+                Series(normalized, index=values.index, name=values.name, dtype=object))
+
+    @staticmethod
+    def _valid_pis_cns(matrix: np.ndarray) -> np.ndarray:
+        """Check of the CNS numbers starting in 1 or 2, one per row: PIS followed by 000 and the verification digit."""
+        product_sum = matrix[:, :11] @ np.arange(15, 4, -1)
+        remainder = product_sum % 11
+        check_digit = np.where(remainder != 0, 11 - remainder, 0)
+        # A verification digit of 10 becomes 001 followed by the verification digit of the sum plus 2
+        is_ten = check_digit == 10
+        remainder = (product_sum + 2) % 11
+        check_digit = np.where(is_ten, np.where(remainder != 0, 11 - remainder, 0), check_digit)
+        middle = matrix[:, 11:14] @ np.array([100, 10, 1])
+        return (middle == is_ten) & (matrix[:, 14] == check_digit)
+
+    @staticmethod
+    def _valid_provisional_cns(matrix: np.ndarray) -> np.ndarray:
+        """Check of the CNS numbers starting in 7, 8 or 9, one per row: weighted sum multiple of 11."""
+        return (matrix @ np.arange(15, 0, -1)) % 11 == 0
+
     @staticmethod
     def process_invalid_records(
             df: DataFrame,
@@ -0,0 +1,80 @@
+"""
+This module contains the LazyForms class, a mapping of form names to DataFrames built on first access.
+"""
+
+import logging
+from collections.abc import MutableMapping
+from typing import Callable, Iterator
+
+from pandas import DataFrame
+
+
+class LazyForms(MutableMapping):
+    """
+    A mapping of form names to forms, each form being built on first access and cached.
+
+    Iterating over the names, ``len`` and ``in`` never build a form; accessing values (``[]``, ``values()``,
+    ``items()``) does. Forms assigned with ``[] =`` replace the built ones.
+
+    Parameters
+    ----------
+    builder : Callable[[str], DataFrame]
+        Function building a form from its name.
+    form_names : list[str]
+        The names of the forms, in order.
+
+    Attributes
+    ----------
+    touched : set[str]
+        Names of the forms accessed or assigned.
+    """
+
+    def __init__(self, builder: Callable[[str], DataFrame], form_names: list[str]):
+        self._builder = builder
+        self._names: dict[str, None] = dict.fromkeys(form_names)
+        self._forms: dict[str, DataFrame] = {}
+        self.touched: set[str] = set()
+
+    def __getitem__(self, form_name: str) -> DataFrame:
+        if form_name not in self._names:
+            raise KeyError(form_name)
+        if form_name not in self._forms:
+            logging.debug('Building form %s.', form_name)
+            self._forms[form_name] = self._builder(form_name)
+        self.touched.add(form_name)
+        return self._forms[form_name]
+
+    def __setitem__(self, form_name: str, form: DataFrame) -> None:
+        self._names[form_name] = None
+        self._forms[form_name] = form
+        self.touched.add(form_name)
+
+    def __delitem__(self, form_name: str) -> None:
+        del self._names[form_name]
+        self._forms.pop(form_name, None)
+        self.touched.discard(form_name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._names))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, form_name: object) -> bool:
+        return form_name in self._names
+
+    def __repr__(self) -> str:
+        return f'LazyForms({list(self._names)}, built={sorted(self._forms)})'
+
+    @property
+    def built(self) -> set[str]:
+        """Names of the forms built or assigned, held in memory."""
+        return set(self._forms)
+
+    def peek(self, form_name: str) -> DataFrame:
+        """Return a form without caching it nor marking it as touched, e.g. to save it once."""
+        if form_name in self._forms:
+            return self._forms[form_name]
+        if form_name not in self._names:
+            raise KeyError(form_name)
+        return self._builder(form_name)
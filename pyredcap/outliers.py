@@ -1,11 +1,14 @@
 import logging
-from typing import Literal
+import warnings
+from typing import Callable, Literal
 
 import numpy as np
 import pandas as pd
-from pandas import DataFrame
+from pandas import DataFrame, Series
+from pandas.tseries.api import guess_datetime_format
 
 from pyredcap.handlers.transformer_handler import TransformerHandler
+from pyredcap.lazy_forms import LazyForms
 from pyredcap.redcap_project import REDCapProject
 
 
@@ -27,30 +30,91 @@ class CustomRulesBase:
     #     return func
 
 
+class CSVSink:
+    """
+    Outliers sink appending each fragment to a CSV file, the header being written with the first fragment.
+
+    Parameters
+    ----------
+    path : str
+        The path of the CSV file, truncated by the first fragment if it exists. The file is left as is while no
+        fragment is written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._started = False
+
+    def __call__(self, fragment: DataFrame) -> None:
+        fragment.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+
+
 class Outliers:
     """
     This class is responsible for detecting and handling outliers in the REDCap project data.
     It initializes the forms, codebook, validation dataframe, and TransformerHandler.
     It also provides methods to check for required fields, validate data types and ranges,
     and apply custom outlier detection rules.
+
+    The outliers of each field and custom rule are collected as fragments, concatenated once when outliers_df is
+    read. A sink, if given, receives each fragment as it is produced, formatted as in generate_outliers (see
+    ``CSVSink``). The sink mirrors outliers_df unless ``keep`` is False: fragments are then only sent to the sink
+    and outliers_df stays empty, so memory doesn't grow with the number of outliers.
     """
 
     def __init__(
             self,
             redcap_project: REDCapProject,
-            custom_rules=None
+            custom_rules=None,
+            sink: Callable[[DataFrame], None] = None,
+            keep: bool = True
     ):
-        self.forms: dict[str, DataFrame] = redcap_project.forms
+        if not keep and sink is None:
+            raise ValueError('Outliers must be kept when no sink is given.')
+        self.forms: dict[str, DataFrame] | LazyForms = redcap_project.forms
         self.codebook: DataFrame = redcap_project.codebook
         self.validation_df = None
         self.custom_rules = custom_rules
         self.cols_to_validate: dict = {}
-        self.outliers_df = pd.DataFrame(
+        self.sink = sink
+        self.keep = keep
+        self.filter_incomplete = True
+        self._outliers_df = pd.DataFrame(
             columns=['record_id', 'redcap_data_access_group', 'form_name',
                      'redcap_repeat_instance', 'field_name', 'current_value',
                      'form_status', 'reason'])
+        self._fragments: list[DataFrame] = []
         self.th = TransformerHandler()
 
+    @property
+    def outliers_df(self) -> DataFrame:
+        """The outliers data frame, pending fragments being concatenated once."""
+        if self._fragments:
+            frames = self._fragments if self._outliers_df.empty else [self._outliers_df] + self._fragments
+            self._outliers_df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            self._fragments = []
+        return self._outliers_df
+
+    @outliers_df.setter
+    def outliers_df(self, df: DataFrame) -> None:
+        self._outliers_df = df
+        self._fragments = []
+
+    @staticmethod
+    def _format_outliers(df: DataFrame, filter_incomplete: bool) -> DataFrame:
+        """Map the form status codes to labels, rename the instance column and filter incomplete records."""
+        df = df.rename(columns={'redcap_repeat_instance': 'instance'})
+        df['form_status'] = df['form_status'].replace({
+            0: 'incomplete',
+            1: 'unverified',
+            2: 'complete'
+        })
+        df['instance'] = df['instance'].astype('Int64')
+        if filter_incomplete:
+            df = df[df['form_status'] == 'complete']
+        return df
+
     @staticmethod
     def _fix_min_max_dtype(
             df,
@@ -132,14 +196,197 @@ class Outliers:
             invalid_records: list[str] | list[tuple[str, int]],
             reason_desc: str
     ) -> None:
-        # Process invalid records into the outliers data frame
+        # Process invalid records into a fragment of the outliers data frame
         outliers = self.th.process_invalid_records(df, column, form_name, invalid_records, reason_desc)
-        # Check if both data frames are not empty
-        if not self.outliers_df.empty and not outliers.empty:
-            self.outliers_df = pd.concat([self.outliers_df, outliers], ignore_index=True)
-        # First update, assign data instead of concat to avoid error
-        elif not outliers.empty:
-            self.outliers_df = outliers
+        if outliers.empty:
+            return
+        if self.keep:
+            self._fragments.append(outliers)
+        if self.sink is not None:
+            fragment = self._format_outliers(outliers, self.filter_incomplete)
+            if not fragment.empty:
+                self.sink(fragment)
+
+    def compile_validation_plan(self) -> dict[str, list[dict]]:
+        """
+        Compile the validation plan from the validation data frame, once for all forms.
+
+        Returns
+        -------
+        dict[str, list[dict]]
+            The fields to validate of each form, in validation order, with their 'column', 'data_type' ('numeric' or
+            'date') and 'min'/'max' values (of the first row of the field).
+        """
+        numeric_cols = set(self.cols_to_validate['numeric_cols'])
+        date_cols = set(self.cols_to_validate['date_cols'])
+        rows = list(self.validation_df[['field_name', 'form_name', 'min', 'max']].itertuples(index=False))
+
+        ranges = {}
+        for row in rows:
+            ranges.setdefault(row.field_name, (row.min, row.max))
+
+        plan = {}
+        for row in rows:
+            if row.field_name in numeric_cols:
+                data_type = 'numeric'
+            elif row.field_name in date_cols:
+                data_type = 'date'
+            else:
+                continue
+            min_value, max_value = ranges[row.field_name]
+            plan.setdefault(row.form_name, []).append(
+                {'column': row.field_name, 'data_type': data_type, 'min': min_value, 'max': max_value})
+        return plan
+
+    @staticmethod
+    def _range_reason(min_value, max_value) -> str | None:
+        """Description of the range of a field, None if it has no range."""
+        if pd.notna(min_value) and pd.notna(max_value):
+            return f'min: {min_value}, max: {max_value}'
+        if pd.notna(min_value):
+            return f'min: {min_value}'
+        if pd.notna(max_value):
+            return f'max: {max_value}'
+        return None
+
+    @staticmethod
+    def _check_values(
+            values: np.ndarray,
+            fields: list[dict],
+            data_type: Literal['numeric', 'date']
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Check the type and range of the columns of a form at once, each value being coerced once.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values of the columns, one column per field.
+        fields : list[dict]
+            The fields of the columns, as in the validation plan.
+        data_type : Literal['numeric', 'date']
+            The data type of the fields.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            The boolean matrices of values of a valid type and of values in range (or not converted), as in
+            ``check_dtype`` and ``check_range``.
+        """
+        is_null = pd.isna(values)
+        if data_type == 'numeric':
+            coerced = np.asarray(pd.to_numeric(values.ravel(), errors='coerce'), dtype=float).reshape(values.shape)
+            not_converted = np.isnan(coerced)
+            is_valid_type = is_null | ~not_converted
+            min_values = np.array([field['min'] if pd.notna(field['min']) else np.nan for field in fields], dtype=float)
+            max_values = np.array([field['max'] if pd.notna(field['max']) else np.nan for field in fields], dtype=float)
+            no_min, no_max = np.isnan(min_values), np.isnan(max_values)
+        elif data_type == 'date':
+            coerced, is_valid_type = Outliers._check_dates(values, is_null)
+            not_converted = np.isnat(coerced)
+            min_values = pd.to_datetime(Series([field['min'] for field in fields], dtype=object)).to_numpy(
+                dtype='datetime64[ns]')
+            max_values = pd.to_datetime(Series([field['max'] for field in fields], dtype=object)).to_numpy(
+                dtype='datetime64[ns]')
+            no_min, no_max = np.isnat(min_values), np.isnat(max_values)
+        else:
+            raise ValueError("data_type must be either 'numeric' or 'date'")
+
+        in_range = not_converted | ((coerced >= min_values) | no_min) & ((coerced <= max_values) | no_max)
+        return is_valid_type, in_range
+
+    @staticmethod
+    def _check_dates(values: np.ndarray, is_null: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Coerce date columns as ``check_range`` (ISO dates) and check their type as ``check_dtype`` (dates in the
+        format inferred from the first value of the column, as to_datetime does).
+
+        The format of each column is decided before parsing: columns of ISO dates, or whose format can't be inferred,
+        are coerced together as ISO dates, the others in their own format. Each value is parsed once, only values
+        failing the format of their column being parsed again, in the format of the other check.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            The coerced ISO dates (NaT if not converted) and the boolean matrix of values of a valid type.
+        """
+        iso_format = '%Y-%m-%d'
+        formats = []
+        for j in range(values.shape[1]):
+            non_null = np.flatnonzero(~is_null[:, j])
+            first = values[non_null[0], j] if non_null.size else None
+            if isinstance(first, str):
+                with warnings.catch_warnings():
+                    # Day first formats are warned about, the guessed format is passed explicitly
+                    warnings.simplefilter('ignore', UserWarning)
+                    formats.append(guess_datetime_format(first))
+            else:
+                formats.append(None)
+
+        coerced = np.full(values.shape, np.datetime64('NaT'), dtype='datetime64[ns]')
+        iso_columns = [j for j, date_format in enumerate(formats) if date_format in (iso_format, None)]
+        if iso_columns:
+            coerced[:, iso_columns] = (
+                pd.to_datetime(values[:, iso_columns].ravel(), format=iso_format, errors='coerce')
+                .to_numpy(dtype='datetime64[ns]').reshape(values.shape[0], len(iso_columns)))
+
+        is_valid_type = is_null.copy()
+        for j, date_format in enumerate(formats):
+            rows = np.flatnonzero(~is_null[:, j])
+            if not rows.size:
+                continue
+            if date_format == iso_format:
+                is_valid_type[rows, j] = ~np.isnat(coerced[rows, j])
+            elif date_format is None:
+                # ISO dates are valid, the other values are parsed one by one, as to_datetime does without a format
+                failed = rows[np.isnat(coerced[rows, j])]
+                is_valid_type[rows, j] = True
+                is_valid_type[failed, j] = pd.to_datetime(values[failed, j], format='mixed', errors='coerce').notna()
+            else:
+                is_valid_type[rows, j] = pd.to_datetime(values[rows, j], format=date_format, errors='coerce').notna()
+                # Values in the format of the column are not ISO dates, only the others may be in range
+                failed = rows[~is_valid_type[rows, j]]
+                coerced[failed, j] = (pd.to_datetime(values[failed, j], format=iso_format, errors='coerce')
+                                      .to_numpy(dtype='datetime64[ns]'))
+        return coerced, is_valid_type
+
+    def validate_form(self, form: DataFrame, form_name: str, fields: list[dict]) -> None:
+        """
+        Validate the type and range of the fields of a form, as ``check_dtype`` and ``check_range`` on each field.
+
+        Columns of the same data type are coerced and checked at once, the outliers being then added field by field.
+
+        Parameters
+        ----------
+        form : DataFrame
+            The form data.
+        form_name : str
+            The name of the form.
+        fields : list[dict]
+            The fields to validate, from the validation plan (see ``compile_validation_plan``).
+        """
+        results = [None] * len(fields)
+        for data_type in ['numeric', 'date']:
+            positions = [i for i, field in enumerate(fields) if field['data_type'] == data_type]
+            if not positions:
+                continue
+            values = form[[fields[i]['column'] for i in positions]].to_numpy(dtype=object)
+            is_valid_type, in_range = self._check_values(values, [fields[i] for i in positions], data_type)
+            for j, i in enumerate(positions):
+                results[i] = (is_valid_type[:, j], in_range[:, j])
+
+        record_ids = form['record_id'].to_numpy(dtype=object)
+        for field, (is_valid_type, in_range) in zip(fields, results):
+            column, data_type = field['column'], field['data_type']
+            invalid_records = record_ids[~is_valid_type].tolist()
+            if invalid_records:
+                self.update_outliers_df(form, column, form_name, invalid_records, f'Dado inválido ({data_type})')
+
+            reason_desc = self._range_reason(field['min'], field['max'])
+            invalid_records = record_ids[~in_range].tolist()
+            if reason_desc is not None and invalid_records:
+                self.update_outliers_df(form, column, form_name, invalid_records,
+                                        f'Valor fora do intervalo permitido ({reason_desc})')
 
     def check_required_fields(self, column: str) -> list:
         if 'redcap_repeat_instance' in self.validation_df.columns:
@@ -221,42 +468,26 @@ class Outliers:
                 self.update_outliers_df(**method_result)
 
     def generate_outliers(self, filter_incomplete: bool = True) -> None:
+        self.filter_incomplete = filter_incomplete
 
         # Create validation data frame
         self._instance_validation_df(self.codebook)
 
-        # General outlier detection
-        for form_name, form in self.forms.items():
-            form_name_mask: bool = self.validation_df['form_name'] == form_name
-            # Iterate through all fields to be validated in this form
-            for column in self.validation_df[form_name_mask]['field_name']:
-                field_name_mask: bool = self.validation_df['field_name'] == column
-                field_info: dict = self.validation_df[field_name_mask].to_dict(orient='records')[0]
-
-                # Check by field type
-                if column in self.cols_to_validate['numeric_cols']:
-                    self.check_dtype(form, column, form_name, 'numeric')
-                    self.check_range(form, column, form_name, 'numeric', field_info['min'], field_info['max'])
-                elif column in self.cols_to_validate['date_cols']:
-                    self.check_dtype(form, column, form_name, 'date')
-                    self.check_range(form, column, form_name, 'date', field_info['min'], field_info['max'])
+        # General outlier detection, only forms with fields to validate are accessed (and built, if lazy)
+        validation_plan = self.compile_validation_plan()
+        for form_name in self.forms:
+            if form_name in validation_plan:
+                self.validate_form(self.forms[form_name], form_name, validation_plan[form_name])
 
         # Check for custom user defined rules
         if self.custom_rules:
             self.custom_outliers()
 
-        # Format data frame and filter incomplete records
-        self.outliers_df['form_status'] = self.outliers_df['form_status'].replace({
-            0: 'incomplete',
-            1: 'unverified',
-            2: 'complete'
-        })
-        self.outliers_df.rename(columns={
-            'redcap_repeat_instance': 'instance',
-        }, inplace=True)
-        self.outliers_df['instance'] = self.outliers_df['instance'].astype('Int64')
-        if filter_incomplete:
-            self.outliers_df = self.outliers_df[self.outliers_df['form_status'] == 'complete']
+        # Concatenate the fragments once, format data frame and filter incomplete records
+        self.outliers_df = self._format_outliers(self.outliers_df, filter_incomplete)
+        if not self.keep:
+            logging.info('Outliers sent to the sink only, outliers_df is empty.')
+            return
 
         logging.info('Outliers generated: %s', len(self.outliers_df))
         logging.info('Top 10 fields:\n%s',
@@ -5,9 +5,13 @@ from itertools import chain
 from collections import Counter, defaultdict
 
 import numpy as np
-from pandas import DataFrame, Series
+from pandas import CategoricalDtype, DataFrame, Series
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
 
+from pyredcap.lazy_forms import LazyForms
 from pyredcap.redcap_project import REDCapProject
+from pyredcap.handlers.checkbox_handler import CheckboxHandler
+from pyredcap.handlers.column_handler import ColumnHandler
 from pyredcap.handlers.transformer_handler import TransformerHandler
 
 
@@ -28,6 +32,8 @@ class Preprocessing:
         A dictionary of instructions to be run on the data.
     feature_map : Series
         A Series containing the feature map for the REDCap project.
+    checkbox_choices : dict[str, list[str]]
+        The choice table of checkbox fields decoded into bitmask columns.
     forms : dict[str, DataFrame]
         A dictionary containing the forms for the REDCap project.
     outliers : dict
@@ -56,8 +62,12 @@ class Preprocessing:
         self.instructions: dict = instructions
 
         self.feature_map: dict[str, list[str]] = {}
-        self.forms: dict[str, DataFrame] = {}
+        self.checkbox_choices: dict[str, list[str]] = {}
+        self.forms: dict[str, DataFrame] | LazyForms = {}
         self.outliers = {}
+        # Row positions of each form, set by subset_forms
+        self._form_rows: dict[str, np.ndarray] = {}
+        self._single_rows: np.ndarray | None = None
 
         self.th = TransformerHandler()
         if instructions:
@@ -94,9 +104,9 @@ class Preprocessing:
 
     def remove_missing_datacodes(self) -> None:
         """
-        Removes missing data codes from the DataFrame. It first creates a
-        dictionary to replace missing data codes with np.nan. Then, it finds missing
-        data codes in the DataFrame and replaces them with np.nan.
+        Removes missing data codes from the DataFrame. It first finds missing data
+        codes with a membership mask over the columns able to hold them, counts them
+        per column, then replaces them with np.nan.
 
         After that, it filters remaining missing data codes represented as features.
         The method then drops these columns from the DataFrame.
@@ -107,15 +117,15 @@ class Preprocessing:
         _pattern = '|'.join(['__' + i.lower() for i in self.missing_datacodes_map.keys()])
         missing_datacodes_features = self.df.filter(regex=_pattern).columns
 
-        # Extract missing datacodes values
-        missing_values = (self.df
-                          .map(lambda x: x if x in self.missing_datacodes_map.keys() else np.nan)
-                          .dropna(how='all')
-                          .dropna(axis=1, how='all')
-                          )
+        # Find missing datacodes values, only columns able to hold them (object, string, categorical) are tested
+        codes = list(self.missing_datacodes_map.keys())
+        candidate_columns = [column for column, dtype in self.df.dtypes.items()
+                             if not (is_numeric_dtype(dtype) or is_datetime64_any_dtype(dtype))]
+        mask: DataFrame = self.df[candidate_columns].isin(codes)
+        code_columns = mask.columns[mask.any()]
         missing_values = {
-            column: missing_values[column].value_counts().to_dict()
-            for column in missing_values.columns
+            column: self.df.loc[mask[column], column].astype(object).value_counts().to_dict()
+            for column in code_columns
         }
         # Extract missing datacodes values in checkboxes
         missing_checkboxes = (self.df[missing_datacodes_features]
@@ -134,22 +144,30 @@ class Preprocessing:
         missing_values.update(missing_checkboxes_dict)
         self.outliers['missing_datacodes'] = missing_values
 
-        # Create a dictionary to replace missing datacodes with np.nan
-        replace_dict = {code: np.nan for code in self.missing_datacodes_map.keys()}
-
-        # Find missing datacodes in df and replace with np.nan
-        self.df = self.df.replace(replace_dict).infer_objects(copy=False)
+        # Replace missing datacodes with np.nan in one pass over the columns holding them
+        replaced = {}
+        for column in code_columns:
+            series = self.df[column]
+            if isinstance(series.dtype, CategoricalDtype):
+                replaced[column] = series.cat.remove_categories(series[mask[column]].unique().tolist())
+            else:
+                replaced[column] = series.mask(mask[column]).infer_objects(copy=False)
+        if replaced:
+            self.df = self.df.assign(**replaced)
 
         # Drop columns
-        self.df.drop(columns=missing_datacodes_features, inplace=True)
+        self.df = self.df.drop(columns=missing_datacodes_features)
 
     def aggregate_columns(self, agg_map: list[dict[str, str]]):
-        """Helper function to apply aggregate_columns method."""
+        """Helper function to apply aggregate_columns method, columns are edited once for the whole agg_map."""
+        staged = ColumnHandler(self.df)
         for params in agg_map:
-            self._apply_aggregate_columns(**params)
+            self._apply_aggregate_columns(staged, **params)
+        self.df = staged.commit()
 
     def _apply_aggregate_columns(
             self,
+            staged: ColumnHandler,
             search_str: str,
             col_name: str = None,
             join_str: str = None
@@ -164,11 +182,13 @@ class Preprocessing:
         The method subsets columns that start/end with [search_str] and groups them.
         If there are duplicate indexes, it groups them by a list/array.
 
-        The method then drops the original columns, updates the column in position
-        [insert_index], and updates the codebook(metadata).
+        The method then stages the drop of the original columns and the new column in
+        position [insert_index], and updates the codebook(metadata).
 
         Parameters
         ----------
+        staged : ColumnHandler
+            The column edits of the DataFrame, committed by the caller.
         search_str : str
             The string to search for in the column names.
         col_name : str, optional
@@ -181,7 +201,7 @@ class Preprocessing:
             col_name = re.sub(r'\b[_\W]+|[_\W]+\b', '', search_str)
 
         # Map column names containing the search string
-        col_map = {index: col for index, col in enumerate(self.df.columns) if re.search(search_str, col)}
+        col_map = {index: col for index, col in enumerate(staged.columns) if re.search(search_str, col)}
         assert len(col_map) > 0, f'No column contains {search_str}'
         logging.info('%s: columns matched in the search: %s', col_name, list(col_map.values()))
 
@@ -189,7 +209,7 @@ class Preprocessing:
         insert_index = next(iter(col_map.keys()))
 
         # Subset columns that start/end with [search_str]
-        sub_df = self.df[col_map.values()].copy()
+        sub_df = staged.select(list(col_map.values()))
 
         # Group columns
         sub_df = sub_df.stack().reset_index(level=1, drop=True)
@@ -202,11 +222,10 @@ class Preprocessing:
                 sub_df = sub_df.apply(join_str.join)
 
         # Drop original columns
-        self.df = self.df.drop(columns=col_map.values())
+        staged.drop(list(col_map.values()))
 
         # Update column in position [insert_index]
-        # TODO: find why sometimes PerformanceWarning is raised
-        self.df.insert(insert_index, col_name, sub_df)
+        staged.insert(insert_index, col_name, sub_df)
 
         # Update codebook
         mapping = {key: col_name for key in col_map.values()}
@@ -214,42 +233,44 @@ class Preprocessing:
         self.codebook = self.codebook.drop_duplicates(subset='field_name')
 
     # TODO: add arguments to specify the columns to be decoded
-    def decode_checkbox(self):
+    def decode_checkbox(self, compact: bool = False):
         """
-        Decodes checkbox fields in the DataFrame. It first sets up masks
-        to identify checkbox fields in the codebook. It then iterates over each
-        checkbox field, setting choices and selecting columns to decode based on the
-        field name.
+        Decodes checkbox fields in the DataFrame. It first reads the choices of
+        every checkbox field from the codebook. It then iterates over each
+        checkbox field, selecting columns to decode based on the field name.
+
+        The 0/1 columns of each field are read as a NumPy matrix and checked for
+        values other than 0, 1 or NaN. If the data has different values, it raises
+        an AssertionError. Each row is decoded into the array of selected choices
+        (NaN if none is selected).
+
+        All decoded columns are spliced into the DataFrame at once, each one in the
+        position of its first encoded column, and the encoded columns are dropped.
 
-        The method creates a copy of the columns to decode, removes the field name
-        prefix from column names, and checks if the data has different values than
-        boolean ones (0 or 1). If the data has different values, it raises an
-        AssertionError.
+        With ``compact=True`` each field is decoded into an Int64 bitmask column instead
+        of per-row arrays, its choices being stored once in checkbox_choices (see
+        ``CheckboxHandler``). Fields with more choices than a bitmask holds are decoded
+        into arrays.
 
-        The method then replaces each value with the respective column name, sets
-        empty list/values to NaN, drops the original encoded columns, and adds the
-        decoded column to the DataFrame.
+        Args:
+            compact (bool, optional): Whether to decode into bitmask columns. Defaults to False.
 
         Raises:
-            ValueError: If a field is not found in the codebook.
+            KeyError: If the first choice column of a field is not in the DataFrame.
             AssertionError: If the data has values different from 0, 1, or NaN.
         """
-        # Setup masks
+        # Choices of each checkbox field, first codebook entry of each field
         checkbox_mask: Series = self.codebook['field_type'] == 'checkbox'
-        fields: list[str] = self.codebook.loc[checkbox_mask, 'field_name'].tolist()
+        field_choices: Series = (self.codebook.loc[checkbox_mask]
+                                 .drop_duplicates(subset='field_name')
+                                 .set_index('field_name')['select_choices_or_calculations'])
 
-        for field_name in fields:
+        # Columns are spliced at the end
+        staged = ColumnHandler(self.df)
 
-            assert field_name not in self.df.columns, f'Field {field_name} already exists in dataframe'
+        for field_name, choices in field_choices.items():
 
-            field_mask: Series = self.codebook['field_name'] == field_name
-            if sum(field_mask) == 0:
-                raise ValueError(f'Field {field_name} not found in codebook.')
-
-            # Set choices
-            choices = self.codebook.loc[
-                checkbox_mask & field_mask,
-                'select_choices_or_calculations'].tolist()[0]
+            assert field_name not in staged, f'Field {field_name} already exists in dataframe'
 
             # Subset raw values
             choices = [pair.split(',')[0].strip().lower().replace('-', '_')
@@ -259,39 +280,54 @@ class Preprocessing:
             decoded_columns = [field_name + '___' + choice for choice in choices]
 
             # Find index for the first occurence
-            insert_index: int = self.df.columns.get_loc(decoded_columns[0])
+            insert_index: int = staged.get_loc(decoded_columns[0])
 
             # Avoid selecting columns not loaded by REDCap
-            cols_to_decode = list(set(decoded_columns).intersection(self.df.columns))
-            cols_to_decode.sort()
-            missing_cols = list(set(decoded_columns).difference(self.df.columns))
+            cols_to_decode = sorted(set(decoded_columns).intersection(staged.columns))
+            missing_cols = list(set(decoded_columns).difference(staged.columns))
             logging.info('Decoding %s', cols_to_decode)
             if missing_cols:
                 logging.warning('Missing columns in dataframe: %s', missing_cols)
 
-            # Create a copy of the columns to decode
-            aux_df: DataFrame = self.df[cols_to_decode].copy()
-
-            # Remove field_name prefix from column names
-            aux_df.columns = aux_df.columns.str.replace(field_name + '___', '')
-
             # Check if data has different values than boolean ones (0 or 1)
-            assert aux_df.isin([0, 1, np.nan]).all().all(), 'Data has values different than 0, 1 or NaN'
-
-            # Replace each value with the respective column name
-            decoded_col: Series = aux_df.apply(lambda x: x.index[x == True].values, axis=1)  # Ignore PEP8 E712 (C0121)
+            block: DataFrame = self.df[cols_to_decode]
+            assert block.isin([0, 1, np.nan]).all().all(), 'Data has values different than 0, 1 or NaN'
+
+            # Choice of each column, without the field_name prefix
+            labels = np.array([col.replace(field_name + '___', '') for col in cols_to_decode], dtype=object)
+            selected = block.to_numpy(dtype='float64', na_value=np.nan) == 1
+            if compact and len(labels) <= CheckboxHandler.MAX_CHOICES:
+                decoded = CheckboxHandler.encode(selected, index=self.df.index)
+                self.checkbox_choices[field_name] = labels.tolist()
+            else:
+                if compact:
+                    logging.warning('Field %s has more than %s choices, decoding into arrays.',
+                                    field_name, CheckboxHandler.MAX_CHOICES)
+                decoded = self._decode_checkbox_matrix(selected, labels)
 
-            # Set empty list/values to NaN
-            decoded_col = decoded_col.apply(lambda x: np.nan if len(x) == 0 else x)
+            # Drop original encoded columns and add decoded column
+            staged.drop(cols_to_decode)
+            staged.insert(insert_index, field_name, decoded)
 
-            # Drop original encoded columns
-            self.df = self.df.drop(columns=cols_to_decode)
+        self.df = staged.commit()
 
-            assert insert_index <= self.df.shape[1], \
-                f'Index {insert_index} is greater than the number of columns in the dataframe'
-            # Add decoded column to dataframe
-            # TODO: find why sometimes PerformanceWarning is raised
-            self.df.insert(insert_index, field_name, decoded_col)
+    @staticmethod
+    def _decode_checkbox_matrix(selected: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """
+        Decode a boolean (rows x choices) matrix into an object array holding, for each row, the array of selected
+        labels, or NaN if none is selected. A matrix with no selection at all is decoded as a float NaN array.
+        """
+        rows, cols = np.nonzero(selected)
+        if rows.size == 0:
+            return np.full(selected.shape[0], np.nan)
+        decoded = np.full(selected.shape[0], np.nan, dtype=object)
+        # np.nonzero walks the matrix row by row, slice the selected labels at each row boundary
+        selected_labels = labels[cols]
+        starts = np.r_[0, np.flatnonzero(np.diff(rows)) + 1]
+        ends = np.r_[starts[1:], rows.size]
+        for row, start, end in zip(rows[starts].tolist(), starts.tolist(), ends.tolist()):
+            decoded[row] = selected_labels[start:end]
+        return decoded
 
     def _create_feature_map(self) -> None:
         """
@@ -341,28 +377,39 @@ class Preprocessing:
 
         self.feature_map = feature_map
 
-    def _cast_array_to_list(self):
+    def _cast_array_to_list(self, form: DataFrame) -> DataFrame:
         field_type_mask = self.codebook['field_type'] == 'checkbox'
-        array_fields = self.codebook.loc[field_type_mask, 'field_name'].tolist()
+        # Bitmask columns hold no arrays
+        array_fields = [field for field in self.codebook.loc[field_type_mask, 'field_name']
+                        if field in form.columns and field not in self.checkbox_choices]
 
         def convert_array_to_list(element):
             if isinstance(element, np.ndarray):
                 return element.tolist()
             return element
 
-        self.df[array_fields] = self.df[array_fields].apply(
-            lambda x: x.apply(convert_array_to_list)
-        )
+        if array_fields:
+            form[array_fields] = form[array_fields].apply(
+                lambda x: x.apply(convert_array_to_list)
+            )
+        return form
 
-    def subset_forms(self) -> None:
+    def subset_forms(self, lazy: bool = False) -> None:
         """
         Subsets forms in the DataFrame. It first creates a feature map for
-        each form_name in the codebook. Then, it iterates over each form_name in the
-        feature map, subsetting data for repeating and single instruments.
+        each form_name in the codebook. The rows of each repeating instrument and of
+        single instruments are located once (groupby indices). Then, it iterates over
+        each form_name in the feature map, slicing its rows and columns by position.
 
         The method then checks if all forms in the feature map have a field_name and if
         any dataframes are empty.
 
+        With ``lazy=True`` forms are a ``LazyForms`` mapping instead: each form is
+        built on first access and cached, and the checks run when it is built.
+
+        Args:
+            lazy (bool, optional): Whether to build forms on first access. Defaults to False.
+
         Raises:
             KeyError: If a feature map for a form_name is missing a field_name.
             Error: If there are empty forms.
@@ -372,33 +419,18 @@ class Preprocessing:
         # Create feature map
         self._create_feature_map()
 
-        # Convert numpy arrays to lists to avoid errors
-        # when loading to MongoDB
-        self._cast_array_to_list()
-
-        forms = {}
-        for form_name, form_features in self.feature_map.items():
-            # Case when there is only singles instruments
-            if 'redcap_repeat_instrument' not in self.df.columns:
-                form_rows = self.df[form_features].copy()
-            # Subset data for repeating instruments
-            elif form_name in self.df['redcap_repeat_instrument'].unique():
-                form_mask = self.df['redcap_repeat_instrument'] == form_name
-                form_rows = self.df.loc[form_mask, form_features].copy()
-            # Subset data for single instruments
-            else:
-                form_mask = self.df['redcap_repeat_instrument'].isna()
-                form_rows = self.df.loc[form_mask, form_features].copy()
-                # Remove empty data from other single instruments
-                id_cols = ['record_id', 'redcap_data_access_group', form_features[-1]]  # "_complete" column
-                subset_columns = form_rows.drop(columns=id_cols).columns
-                form_rows = form_rows.dropna(how='all', subset=subset_columns)
-            forms[form_name] = form_rows
-
-        # Check if all forms in feature_map have a field_name
-        for form_name in forms:  # Ignore lynt C0206, will lead to data frame reference errors.
-            if not forms[form_name].columns.isin(self.feature_map[form_name]).all():
-                raise KeyError(f"Feature map for form_name '{form_name}' is missing a field_name.")
+        # Partition rows once: positions of each repeating instrument and of single instrument rows
+        self._form_rows = {}
+        if 'redcap_repeat_instrument' in self.df.columns:
+            repeat_instrument: Series = self.df['redcap_repeat_instrument']
+            self._form_rows = repeat_instrument.groupby(repeat_instrument, sort=False).indices
+            self._single_rows = np.flatnonzero(repeat_instrument.isna().to_numpy())
+
+        if lazy:
+            self.forms = LazyForms(self._build_form, list(self.feature_map))
+            return
+
+        forms = {form_name: self._build_form(form_name, check_empty=False) for form_name in self.feature_map}
 
         # Check if any dataframes are empty
         empty_forms = [form_name for form_name, data_frame in forms.items() if data_frame.empty]
@@ -407,6 +439,40 @@ class Preprocessing:
 
         self.forms = forms
 
+    def _build_form(self, form_name: str, check_empty: bool = True) -> DataFrame:
+        """Subset the rows and columns of a form, from the rows partitioned by subset_forms."""
+        form_features = self.feature_map[form_name]
+        # Case when there is only singles instruments
+        if 'redcap_repeat_instrument' not in self.df.columns:
+            form_rows = self.df[form_features].copy()
+        # Subset data for repeating instruments
+        elif form_name in self._form_rows:
+            form_rows = self.df.iloc[self._form_rows[form_name], self._column_positions(form_features)]
+        # Subset data for single instruments
+        else:
+            form_rows = self.df.iloc[self._single_rows, self._column_positions(form_features)]
+            # Remove empty data from other single instruments
+            id_cols = ['record_id', 'redcap_data_access_group', form_features[-1]]  # "_complete" column
+            subset_columns = form_rows.drop(columns=id_cols).columns
+            form_rows = form_rows.dropna(how='all', subset=subset_columns)
+
+        # Check if the form has all fields of the feature map
+        if not form_rows.columns.isin(form_features).all():
+            raise KeyError(f"Feature map for form_name '{form_name}' is missing a field_name.")
+        if check_empty and form_rows.empty:
+            logging.error('Empty forms: %s', [form_name])
+
+        # Convert numpy arrays to lists to avoid errors
+        # when loading to MongoDB
+        return self._cast_array_to_list(form_rows)
+
+    def _column_positions(self, columns: list[str]) -> np.ndarray:
+        """Positions of columns in the DataFrame, raising a KeyError for missing ones (as DataFrame.loc does)."""
+        positions = self.df.columns.get_indexer(columns)
+        if (positions == -1).any():
+            raise KeyError(f'{[col for col, pos in zip(columns, positions) if pos == -1]} not in index')
+        return positions
+
     def create_new_form(
             self,
             new_form: str,
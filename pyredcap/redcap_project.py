@@ -5,8 +5,10 @@ It includes methods for initializing the project, processing codebook, loading r
 
 import logging
 import os
-from io import StringIO
-from typing import Optional, Literal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
+from typing import BinaryIO, Optional, Literal
 
 import json
 import yaml
@@ -14,7 +16,12 @@ import numpy as np
 import pandas as pd
 from pandas import DataFrame
 from pyredcap.handlers.api_handler import APIHandler
-from pyredcap.handlers.metadata_handler import MetadataHandler
+from pyredcap.handlers.cache_handler import CacheHandler
+from pyredcap.handlers.checkbox_handler import CheckboxHandler
+from pyredcap.handlers.metadata_handler import MetadataHandler, MetadataSnapshot
+from pyredcap.handlers.parallel_handler import ParallelHandler
+from pyredcap.handlers.parse_handler import ParseHandler
+from pyredcap.lazy_forms import LazyForms
 
 
 class REDCapProject:
@@ -29,6 +36,19 @@ class REDCapProject:
         The API token for the REDCap project.
     missing_datacodes : dict, optional
         A dictionary of missing data codes (default is None).
+    api_options : dict, optional
+        Connection settings passed to ``APIHandler``: pool_size, max_retries, backoff_factor and timeout
+        (default is None, using the handler defaults).
+    max_workers : int, optional
+        Maximum number of concurrent API calls (default is 5). Use 1 to make calls serially.
+    parse_engine : Literal['pandas', 'pyarrow'], optional
+        Engine used to parse exports (default is 'pandas'). 'pyarrow' reads CSV exports with the multithreaded
+        pyarrow reader and returns Arrow-backed dtypes, it requires the optional pyarrow dependency.
+    cache_dir : str, optional
+        Directory of the on-disk metadata cache (default is None, no cache). When provided, project info, codebook,
+        instruments, DAGs and repeating forms are loaded from the cache if a valid entry exists, and cached otherwise.
+    cache_ttl : float, optional
+        Seconds after which cached metadata expires (default is one day). None keeps entries until invalidated.
 
     Attributes
     ----------
@@ -40,6 +60,8 @@ class REDCapProject:
         The records from the REDCap project.
     codebook : DataFrame
         The codebook from the REDCap project.
+    record_id_field : str
+        The name of the record identifier field (first field of the codebook).
     identifier_fields : list
         A list of field names that are identifiers.
         The repeating forms from the REDCap project.
@@ -49,23 +71,39 @@ class REDCapProject:
         A dictionary of outlier records.
     feature_map : dict[str, list[str]]
         A mapping of field names to field labels.
-    forms : dict
-        A dictionary of forms.
+    checkbox_choices : dict[str, list[str]]
+        The choice table of checkbox fields decoded into bitmask columns (``decode_checkbox(compact=True)``),
+        bit i of a value being set when choice i is selected.
+    forms : dict | LazyForms
+        A dictionary of forms, or a LazyForms mapping building each form on first access
+        (``subset_forms(lazy=True)``).
     missing_datacodes : dict
         A dictionary of missing data codes.
     branching_logic_tree : dict
         A dictionary of branching logic.
     """
 
+    # Incremental syncs export records modified since the previous sync started, minus this overlap. It must cover
+    # the difference between the local and the REDCap server clocks, time zones included.
+    SYNC_OVERLAP = timedelta(days=1)
+
     def __init__(
             self,
             api_url: str,
             api_token: str,
-            missing_datacodes: dict[str, str] = None
+            missing_datacodes: dict[str, str] = None,
+            api_options: dict[str, any] = None,
+            max_workers: int = 5,
+            parse_engine: Literal['pandas', 'pyarrow'] = 'pandas',
+            cache_dir: str = None,
+            cache_ttl: float | None = 24 * 3600
     ) -> None:
         # Instance handlers
-        self.api = APIHandler(api_url, api_token)
-        self.mh = MetadataHandler(self.api)
+        self.api = APIHandler(api_url, api_token, **(api_options or {}))
+        self.parser = ParseHandler(parse_engine)
+        self.mh = MetadataHandler(self.api, self.parser)
+        self.cache = CacheHandler(cache_dir, cache_ttl) if cache_dir else None
+        self.max_workers = max_workers
 
         # Initialize attributes
         self.project_id: Optional[str] = None
@@ -75,11 +113,14 @@ class REDCapProject:
         self.instruments: DataFrame() = None
         self.repeating_forms_events: DataFrame() = None
         self.codebook: DataFrame() = None
+        self.record_id_field: Optional[str] = None
         self.identifier_fields: list = []
         self.raw_label_map: dict = {}
         self.branching_logic_tree: dict = {}
         self.feature_map: dict[str, list[str]] = {}
-        self.forms: dict[str, DataFrame] = {}
+        self.checkbox_choices: dict[str, list[str]] = {}
+        self.forms: dict[str, DataFrame] | LazyForms = {}
+        self._metadata_snapshot: Optional[MetadataSnapshot] = None
         self.outliers: dict = {
             'incomplete_records': [],
             'unverified_records': [],
@@ -108,25 +149,50 @@ class REDCapProject:
                 'OTH': 'Other'
             }
 
-    def init_project(self) -> None:
+    def init_project(self, refresh: bool = False) -> None:
         """
         Sets the project information and codebook for the API connection.
+        Project info and metadata contents are fetched concurrently, derived attributes are built once all arrive.
+
+        Parameters
+        ----------
+        refresh : bool, optional
+            Whether to ignore and replace the cached metadata (default is False).
         """
-        # Get project information
-        self.project_id, self.project_title = self.mh.load_project_info()
-        # Load codebook
-        self._instance_dag()
-        self._instance_instruments()
-        self._instance_repeating_forms_events()
-        self._instance_codebook()
+        # Get project information and codebook, from the cache when possible
+        metadata = None
+        if self.cache and not refresh:
+            metadata = self.cache.load(self.api.api_url, self.api.api_token)
+            if metadata is not None:
+                logging.info('Metadata loaded from cache.')
+        if metadata is None:
+            metadata = self.mh.load_all_metadata(self.max_workers)
+            missing = self.mh.missing_contents(metadata)
+            if missing:
+                raise ValueError(f'Could not load project metadata contents: {missing}')
+            if self.cache:
+                self.cache.save(self.api.api_url, self.api.api_token, metadata)
+        self.project_id, self.project_title = metadata['project']
+        self.dag = metadata['dag']
+        self.instruments = metadata['instrument']
+        self.repeating_forms_events = metadata['repeatingFormsEvents']
+        self.codebook = metadata['metadata']
+        # Derived attributes
+        self.record_id_field = self.codebook['field_name'].iloc[0]
         self._instance_identifier_fields()
         self._instance_raw_label_map()
         self._instance_branching_logic_tree()
+        self.invalidate_metadata()
 
         logging.info('Project ID: %s', self.project_id)
         logging.info('Project Title: %s', self.project_title)
         logging.info('Data Access Groups (n): %s\n', self.dag.shape[0])
 
+    def invalidate_cache(self) -> None:
+        """Remove the cached metadata of this project, the next instance fetches it from the API."""
+        if self.cache:
+            self.cache.invalidate(self.api.api_url, self.api.api_token)
+
     def preprocess_forms(self, instructions: dict = None) -> None:
         """
         Preprocess forms according to the provided instructions.
@@ -148,9 +214,12 @@ class REDCapProject:
 
         self.update_forms(preprocessing.forms)
         self.update_feature_map(preprocessing.feature_map)
+        self.update_checkbox_choices(preprocessing.checkbox_choices)
         self.update_outliers(preprocessing.outliers)
+        # Preprocessing steps may modify the codebook in place
+        self.invalidate_metadata()
 
-    def clean_data(self, instructions: dict) -> None:
+    def clean_data(self, instructions: dict, plan: bool = False, workers: int = None) -> None:
         """
         Clean data according to the provided instructions.
 
@@ -158,7 +227,19 @@ class REDCapProject:
         ----------
         instructions : dict
             A dictionary of data cleaning instructions.
+        plan : bool, optional
+            Whether to run the instructions of each form through the instruction planner (default is False).
+        workers : int, optional
+            Number of processes cleaning forms in parallel (default is None, cleaning forms one by one). Forms are
+            shipped through shared memory (see ``ParallelHandler``) and their results merged in instruction order.
+            Every form starts from the checkbox choices and outliers as they were before the call: unlike the
+            sequential run, the choice tables changed by a form are not seen by the forms cleaned alongside it, they
+            are merged back with the results of the form.
         """
+        if workers is not None and workers > 1 and len(instructions) > 1:
+            self._clean_data_parallel(instructions, plan, workers)
+            return
+
         from pyredcap import DataCleaning
 
         for form_name, form_instructions in instructions.items():
@@ -166,23 +247,41 @@ class REDCapProject:
             data_cleaning = DataCleaning(
                 form_name=form_name,
                 df=self.forms[form_name],
-                metadata=self.get_metadata(),
-                instructions=form_instructions
+                metadata=self.get_metadata_snapshot(),
+                instructions=form_instructions,
+                plan=plan
             )
             self.update_single_form(form_name, data_cleaning.df)
+            self.update_checkbox_choices(data_cleaning.checkbox_choices)
             self.update_outliers(data_cleaning.outliers)
 
-    def _instance_dag(self):
-        self.dag = self.mh.load_metadata('dag')
-
-    def _instance_instruments(self):
-        self.instruments = self.mh.load_metadata('instrument')
-
-    def _instance_repeating_forms_events(self):
-        self.repeating_forms_events = self.mh.load_metadata('repeatingFormsEvents')
-
-    def _instance_codebook(self):
-        self.codebook = self.mh.load_metadata('metadata')
+    def _clean_data_parallel(self, instructions: dict, plan: bool, workers: int) -> None:
+        """Clean forms on a process pool, merging the results in instruction order."""
+        metadata = self.get_metadata_snapshot()
+        shared = {}
+        try:
+            for form_name in instructions:
+                shared[form_name] = ParallelHandler.share_frame(self.forms[form_name])
+
+            with ProcessPoolExecutor(max_workers=min(workers, len(instructions)),
+                                     initializer=ParallelHandler.init_worker,
+                                     initargs=(metadata,)) as executor:
+                futures = {form_name: executor.submit(ParallelHandler.clean_form, form_name,
+                                                      shared[form_name][1], form_instructions, plan)
+                           for form_name, form_instructions in instructions.items()}
+                for form_name, future in futures.items():
+                    try:
+                        df, outliers, checkbox_choices = future.result()
+                    except Exception:
+                        executor.shutdown(cancel_futures=True)
+                        raise
+                    self.update_single_form(form_name, df)
+                    self.update_checkbox_choices(checkbox_choices)
+                    self.update_outliers(outliers)
+        finally:
+            for shm, _ in shared.values():
+                shm.close()
+                shm.unlink()
 
     def _instance_identifier_fields(self):
         _identifier_mask = self.codebook['identifier'] == 'y'
@@ -194,7 +293,7 @@ class REDCapProject:
     def _instance_branching_logic_tree(self):
         self.branching_logic_tree = self.mh.create_branching_logic_tree(self.codebook)
 
-    def update_forms(self, forms: dict[str, DataFrame]):
+    def update_forms(self, forms: dict[str, DataFrame] | LazyForms):
         """Update forms attribute with new forms."""
         self.forms = forms
 
@@ -205,17 +304,39 @@ class REDCapProject:
     def update_feature_map(self, feature_map: dict[str, list[str]]):
         """Update feature_map attribute with new feature_map."""
         self.feature_map = feature_map
+        self.invalidate_metadata()
+
+    def update_checkbox_choices(self, checkbox_choices: dict[str, list[str]]):
+        """Update checkbox_choices attribute, fields mapped to None are no longer bitmask columns."""
+        for field_name, choices in checkbox_choices.items():
+            if choices is None:
+                self.checkbox_choices.pop(field_name, None)
+            else:
+                self.checkbox_choices[field_name] = choices
+        self.invalidate_metadata()
 
     def update_outliers(self, outliers: dict):
-        """Update outliers attribute with new outliers."""
+        """
+        Update outliers attribute with new outliers, lists are extended and dicts updated.
+        Values of another type than the current one replace it, unless empty: forms cleaned in parallel start from
+        the initial outliers, e.g. an empty duplicated_values list, which must not replace the dict of another form.
+        """
         for key, value in outliers.items():
-            try:
-                if isinstance(value, list):
-                    self.outliers[key].extend(value)
-                elif isinstance(value, dict):
-                    self.outliers[key].update(value)
-            except KeyError:
+            current = self.outliers.get(key)
+            if isinstance(value, list) and isinstance(current, list):
+                current.extend(value)
+            elif isinstance(value, dict) and isinstance(current, dict):
+                current.update(value)
+            elif not self._is_empty(value) or self._is_empty(current):
                 self.outliers[key] = value
+        self.invalidate_metadata()
+
+    @staticmethod
+    def _is_empty(value) -> bool:
+        """Whether an outliers value is None or holds nothing, without the ambiguous truth value of pandas objects."""
+        if isinstance(value, (DataFrame, pd.Series)):
+            return value.empty
+        return value is None or (hasattr(value, '__len__') and len(value) == 0)
 
     def load_records(
             self,
@@ -229,7 +350,13 @@ class REDCapProject:
             export_checkbox_label: bool = False,
             export_data_access_groups: bool = True,
             label_columns: list[str] = None,
-            map_dags: bool = False
+            map_dags: bool = False,
+            *,
+            chunk_size: int = None,
+            snapshot_dir: str = None,
+            prune_deleted: bool = False,
+            dtype_schema: bool = False,
+            stream: bool = False
     ) -> None:
         """
         Exports records from Project as a Pandas dataframe.
@@ -263,9 +390,29 @@ class REDCapProject:
             groups are utilized in the project.
         label_columns : list of str, optional
             A list of column names to load as labels for the data, common used when raw data have random values
-            generated by a SQL query. Defaults to None.
+            generated by a SQL query. Labels are resolved from the project metadata, only SQL, yesno, truefalse and
+            checkbox columns are exported again (raw and label, restricted to those fields). Defaults to None.
         map_dags: bool, optional
             Whether to map redcap_data_access_group with data_access_group_id from redcap.dags. Defaults to False.
+        chunk_size: int, optional
+            Number of records per API call. When provided, the record ids are exported first and the records are
+            fetched in batches on up to ``max_workers`` concurrent calls, then parsed once. Defaults to None
+            (single export).
+        snapshot_dir: str, optional
+            Directory of the local records snapshot. When provided, records are synced incrementally: only records
+            modified since the last sync are exported (dateRangeBegin) and upserted into the snapshot.
+            The first run, or a run with different export parameters, exports all records. Defaults to None.
+        prune_deleted: bool, optional
+            When syncing incrementally, also export the record id list and drop records deleted on the server from
+            the snapshot. Defaults to False.
+        dtype_schema: bool, optional
+            Whether to parse the export with dtypes built from the codebook (categoricals for radio/dropdown fields,
+            nullable numerics for integer/number validations and dates for date validations), see
+            ``MetadataHandler.create_dtype_schema``. Defaults to False (pandas inference).
+        stream: bool, optional
+            Whether to stream the export to a spooled temporary file (rolled over to disk for large exports) and
+            parse it from there, so peak memory tracks the DataFrame size rather than copies of the payload.
+            Defaults to False.
 
         Returns
         -------
@@ -278,55 +425,292 @@ class REDCapProject:
             fields = ','.join(fields)
 
         # Load data
-        response = self.api.make_api_call(
-            'record', type=file_type, format=file_format, records=records,
-            fields=fields, forms=forms, rawOrLabel=raw_or_label, rawOrLabelHeaders=raw_or_label_headers,
-            exportCheckboxLabel=export_checkbox_label, exportDataAccessGroups=export_data_access_groups)
-        self.df = pd.read_csv(StringIO(response.text), low_memory=False)
+        params = {'type': file_type, 'format': file_format, 'fields': fields, 'forms': forms,
+                  'rawOrLabel': raw_or_label, 'rawOrLabelHeaders': raw_or_label_headers,
+                  'exportCheckboxLabel': export_checkbox_label, 'exportDataAccessGroups': export_data_access_groups}
+        if snapshot_dir:
+            self.df = self._sync_records(snapshot_dir, records, chunk_size=chunk_size, prune_deleted=prune_deleted,
+                                         dtype_schema=dtype_schema, stream=stream, **params)
+        else:
+            self.df = self._export_records(records, chunk_size, dtype_schema, stream, **params)
 
         # Add custom labels to loaded data
         if label_columns:
-            response = self.api.make_api_call(
-                'record', type=file_type, format=file_format, records=records, forms=forms,
-                fields=fields, rawOrLabel='label')
-
-            label_df = pd.read_csv(StringIO(response.text), low_memory=False)
-
-            assert label_df.shape[0] == self.df.shape[0], \
-                (f'Label data frame has different number of rows({label_df.shape[0]}) '
-                 f'than raw data frame({self.df.shape[0]}).')
-
-            # Check for unmapped values
-            self.outliers['unmapped_labels'] = self.check_unmapped_labels(label_df, label_columns)
-            # Replace raw values with labels
-            self.df[label_columns] = label_df[label_columns]
+            self._apply_label_columns(label_columns, raw_or_label, records, chunk_size, stream)
 
         # Map redcap_data_access_group with data_access_group_id from redcap.dags
         if map_dags:
             logging.info('Mapping redcap_data_access_group with DAG name')
-            replace_map: dict = self.dag.set_index('unique_group_name').to_dict()['data_access_group_name']
-            self.df['redcap_data_access_group'] = self.df['redcap_data_access_group'].replace(replace_map)
+            self.df['redcap_data_access_group'] = self.df['redcap_data_access_group'].replace(
+                self.dag.set_index('unique_group_name').to_dict()['data_access_group_name'])
+
+    def _apply_label_columns(
+            self,
+            label_columns: list[str],
+            raw_or_label: str,
+            records: list[str] | None,
+            chunk_size: int | None,
+            stream: bool
+    ) -> None:
+        """Replace the raw values of ``label_columns`` with their labels, storing the unmapped labels as outliers."""
+        if raw_or_label == 'label':
+            label_df = self.df[label_columns].copy()
+        else:
+            label_df = self._resolve_labels(label_columns, records, chunk_size, stream)
+
+        # Check for unmapped values
+        self.outliers['unmapped_labels'] = self.check_unmapped_labels(label_df, label_columns)
+        # Replace raw values with labels
+        self.df[label_columns] = label_df[label_columns]
+
+    def _export_records(
+            self,
+            records: list[str] | None,
+            chunk_size: int | None,
+            dtype_schema: bool = False,
+            stream: bool = False,
+            **params
+    ) -> DataFrame:
+        """
+        Export records as a DataFrame, in a single call or in concurrent batches of ``chunk_size`` records.
+
+        Batches are fetched in record order and their CSV bodies are joined before parsing, so row order, columns and
+        dtypes match the single export. When streaming, responses are written to spooled temporary files and parsed
+        from there instead of being held in memory.
+        """
+        if chunk_size is None:
+            return self._read_records(self._fetch_records(stream, records, **params), dtype_schema)
+
+        if records is None:
+            records = self.export_record_ids(**{key: value for key, value in params.items()
+                                                 if key.startswith('dateRange')})
+        batches = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+        logging.info('Exporting %s records in %s batches.', len(records), len(batches))
+        if not batches:
+            return self._read_records(self._fetch_records(stream, records, **params), dtype_schema)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            exports = list(executor.map(lambda batch: self._fetch_records(stream, batch, **params), batches))
+        exports = [BytesIO(export) if isinstance(export, bytes) else export for export in exports]
+
+        # Join batches under a single header, fall back to concat if headers differ
+        joined = self.parser.join_csv(exports)
+        if joined is None:
+            logging.warning('Batches returned different headers, concatenating parsed batches.')
+            return pd.concat([self._read_records(export, dtype_schema) for export in exports], ignore_index=True)
+        for export in exports:
+            export.close()
+        return self._read_records(joined, dtype_schema)
+
+    def _fetch_records(self, stream: bool, records: list[str] | None, **params) -> bytes | BinaryIO:
+        """Fetch a records export, as bytes or as a spooled temporary file when streaming."""
+        if stream:
+            return self.api.download('record', **params, **self._encode_records(records))
+        return self.api.make_api_call('record', **params, **self._encode_records(records)).content
+
+    def _sync_records(
+            self,
+            snapshot_dir: str,
+            records: list[str] | None,
+            *,
+            chunk_size: int | None,
+            prune_deleted: bool,
+            dtype_schema: bool,
+            stream: bool,
+            **params
+    ) -> DataFrame:
+        """
+        Incrementally sync the local records snapshot and return the updated records.
+
+        The snapshot (pickled DataFrame) and the sync state (last sync timestamp and export parameters) are stored in
+        ``snapshot_dir``, one pair of files per project.
+
+        REDCap reads dateRangeBegin in server time, while the sync timestamp is taken from the local clock before the
+        export. The next sync exports records modified since ``SYNC_OVERLAP`` before that timestamp, so a local clock
+        ahead of the server re-exports records instead of missing them, the upsert making repeated records harmless.
+        No dateRangeEnd is sent.
+        """
+        snapshot_path = os.path.join(snapshot_dir, f'records_{self.project_id}.pkl')
+        state_path = os.path.join(snapshot_dir, f'records_{self.project_id}.json')
+        export_key = json.dumps({'records': records, 'dtype_schema': dtype_schema, **params},
+                                sort_keys=True, default=str)
+        sync_start = datetime.now()
+
+        state = None
+        if os.path.exists(state_path) and os.path.exists(snapshot_path):
+            with open(state_path, encoding='utf-8') as file:
+                state = json.load(file)
+
+        if state is None or state['export_key'] != export_key:
+            logging.info('No snapshot found for the export parameters, exporting all records.')
+            df = self._export_records(records, chunk_size, dtype_schema, stream, **params)
+        else:
+            df = pd.read_pickle(snapshot_path)
+            date_range_begin = (datetime.fromisoformat(state['last_sync']) - self.SYNC_OVERLAP).strftime(
+                '%Y-%m-%d %H:%M:%S')
+            delta = self._export_records(records, chunk_size, dtype_schema, stream, dateRangeBegin=date_range_begin,
+                                         **params)
+            logging.info('Incremental sync: %s rows modified since %s.', delta.shape[0], date_range_begin)
+            df = self.upsert_records(df, delta)
+            if prune_deleted:
+                df = self._prune_deleted_records(df)
+
+        # Persist snapshot and sync state
+        os.makedirs(snapshot_dir, exist_ok=True)
+        df.to_pickle(snapshot_path)
+        with open(state_path, 'w', encoding='utf-8') as file:
+            json.dump({'last_sync': sync_start.strftime('%Y-%m-%d %H:%M:%S'), 'export_key': export_key}, file)
+
+        return df
+
+    def _prune_deleted_records(self, df: DataFrame) -> DataFrame:
+        """Drop the records of a snapshot deleted on the server."""
+        deleted_mask = ~df[self.record_id_field].astype(str).isin(self.export_record_ids())
+        logging.info('Removing %s deleted records from snapshot.', df.loc[deleted_mask, self.record_id_field].nunique())
+        return df[~deleted_mask].reset_index(drop=True)
+
+    def upsert_records(self, snapshot: DataFrame, delta: DataFrame) -> DataFrame:
+        """
+        Upsert modified records into a records snapshot.
+
+        Rows are matched by (record_id, redcap_repeat_instrument, redcap_repeat_instance). REDCap exports every row of
+        a modified record, so all snapshot rows of the modified records are replaced, which also drops repeating
+        instances deleted on the server. Existing records keep their position, new records are appended.
+        """
+        if delta.empty:
+            return snapshot
+
+        record_id = self.record_id_field
+        kept = snapshot[~snapshot[record_id].isin(delta[record_id])]
+        df = pd.concat([kept, delta], ignore_index=True)
+
+        # Restore export order: snapshot records first, then new records
+        record_order = pd.Index(pd.concat([snapshot[record_id], delta[record_id]]).unique())
+        row_order = np.argsort(record_order.get_indexer(df[record_id]), kind='stable')
+        return df.iloc[row_order].reset_index(drop=True)
+
+    def _resolve_labels(
+            self,
+            label_columns: list[str],
+            records: list[str] | None,
+            chunk_size: int | None,
+            stream: bool
+    ) -> DataFrame:
+        """
+        Resolve the labels of ``label_columns`` of the loaded records, as a label export would.
+
+        Multiple choice fields, repeating instruments and DAGs are mapped with the metadata in memory. Labels only known
+        by the server (SQL fields, and the yesno, truefalse and checkbox column labels of the project language) are
+        learned from a raw and a label export of just those fields. Other columns keep their raw values. Unknown raw
+        values are left as NaN, like blank labels of a label export.
+        """
+        label_map = self.mh.create_export_label_map(self.codebook, self.instruments, self.dag)
+        field_type = self.codebook.set_index('field_name')['field_type']
+        server_columns = [col for col in label_columns
+                          if field_type.get(col) in ('sql', 'yesno', 'truefalse')
+                          or '___' in col and field_type.get(col.rsplit('___', 1)[0]) == 'checkbox']
+        if server_columns:
+            logging.info('Exporting labels of columns: %s', server_columns)
+            label_map.update(self._export_label_map(server_columns, records, chunk_size, stream))
+
+        label_df = pd.DataFrame(index=self.df.index)
+        for col in label_columns:
+            if col in label_map:
+                label_df[col] = self._raw_values(self.df[col]).map(label_map[col])
+            else:
+                label_df[col] = self.df[col]
+        return label_df
+
+    def _export_label_map(
+            self,
+            columns: list[str],
+            records: list[str] | None,
+            chunk_size: int | None,
+            stream: bool
+    ) -> dict[str, dict[str, str]]:
+        """Build the raw to label mapping of columns from a raw and a label export of only their fields."""
+        # Checkbox columns (field___code) are exported with their field
+        fields = dict.fromkeys(col.rsplit('___', 1)[0] if '___' in col else col for col in columns)
+        params = {'type': 'flat', 'format': 'csv', 'fields': ','.join(fields)}
+        raw_df = self._export_records(records, chunk_size, stream=stream, rawOrLabel='raw', **params)
+        label_df = self._export_records(records, chunk_size, stream=stream, rawOrLabel='label', **params)
+
+        assert label_df.shape[0] == raw_df.shape[0], \
+            (f'Label data frame has different number of rows({label_df.shape[0]}) '
+             f'than raw data frame({raw_df.shape[0]}).')
+
+        label_map = {}
+        for col in columns:
+            pairs = pd.DataFrame({'raw': self._raw_values(raw_df[col]), 'label': label_df[col]})
+            pairs = pairs.dropna(subset=['raw']).drop_duplicates(subset='raw')
+            label_map[col] = pairs.set_index('raw')['label'].to_dict()
+        return label_map
+
+    @staticmethod
+    def _raw_values(series: pd.Series) -> pd.Series:
+        """Raw values as the strings REDCap exports, e.g. 1.0 -> '1' for codes parsed as float due to NaN."""
+        if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+            series = series.astype('Int64')
+        return series.astype(str).where(series.notna())
+
+    def export_record_ids(self, **params) -> list[str]:
+        """
+        Export the list of record ids, in the same order as the records export.
+        Additional parameters (e.g. dateRangeBegin) filter the exported records.
+        """
+        response = self.api.make_api_call('record', type='flat', format='csv', fields=self.record_id_field, **params)
+        record_ids = pd.read_csv(StringIO(response.text), dtype=str)[self.record_id_field]
+        return record_ids.drop_duplicates().tolist()
+
+    @staticmethod
+    def _encode_records(records: list[str] | None) -> dict[str, str]:
+        """Encode a list of records as REDCap array parameters (records[0], records[1], ...)."""
+        if records is None:
+            return {}
+        return {f'records[{i}]': record for i, record in enumerate(records)}
+
+    def _read_records(self, source: bytes | BinaryIO, dtype_schema: bool = False) -> DataFrame:
+        """Parse a CSV records export, optionally with the dtypes built from the codebook. Files are closed."""
+        dtype, parse_dates = self.mh.create_dtype_schema(self.codebook) if dtype_schema else (None, None)
+        try:
+            return self.parser.read_records(source, dtype, parse_dates)
+        finally:
+            if not isinstance(source, bytes):
+                source.close()
 
     def get_metadata(self) -> dict[str, any]:
         """
         Generate metadata dictionary to load into NoSQL database.
-        If data is dataframe, convert to dictionary.
+        If data is dataframe, convert to dictionary. The dictionary is built once per metadata snapshot, each call
+        returns a copy the caller may modify.
         """
-        return {
-            'project_id': self.project_id,
-            'project_title': self.project_title,
-            'dag': self.dag.to_dict(orient='records'),
-            'instruments': self.instruments.to_dict(orient='records'),
-            'repeating_forms_events':
-                self.repeating_forms_events.to_dict(orient='records')
-                if self.repeating_forms_events is not None else None,
-            'codebook': self.codebook.to_dict(orient='records'),
-            'identifier_fields': self.identifier_fields,
-            'raw_label_map': self.raw_label_map,
-            'branching_logic_tree': self.branching_logic_tree,
-            'feature_map': self.feature_map,
-            'outliers': self.outliers,
-        }
+        return self.get_metadata_snapshot().to_dict()
+
+    def get_metadata_snapshot(self) -> MetadataSnapshot:
+        """
+        Return the metadata snapshot of the project, built once and reused until the metadata changes
+        (see ``invalidate_metadata``).
+        """
+        if self._metadata_snapshot is None:
+            self._metadata_snapshot = MetadataSnapshot(
+                project_id=self.project_id,
+                project_title=self.project_title,
+                dag=self.dag,
+                instruments=self.instruments,
+                repeating_forms_events=self.repeating_forms_events,
+                codebook=self.codebook,
+                identifier_fields=self.identifier_fields,
+                raw_label_map=self.raw_label_map,
+                branching_logic_tree=self.branching_logic_tree,
+                feature_map=self.feature_map,
+                outliers=self.outliers,
+                checkbox_choices=self.checkbox_choices,
+            )
+        return self._metadata_snapshot
+
+    def invalidate_metadata(self) -> None:
+        """Drop the metadata snapshot. Call it after modifying the codebook or other metadata in place."""
+        self._metadata_snapshot = None
 
     def check_unmapped_labels(self, label_df, label_columns) -> list[dict] | None:
         """
@@ -367,12 +751,23 @@ class REDCapProject:
             return unmapped_df.to_dict(orient='records')
         return None
 
+    def expand_checkboxes(self, df: DataFrame) -> DataFrame:
+        """
+        Return a copy of df with checkbox bitmask columns expanded to lists of selected choices, e.g. before saving
+        a form or loading it into MongoDB. df is returned as is if it has no bitmask column.
+        """
+        columns = [col for col in self.checkbox_choices if col in df.columns]
+        if not columns:
+            return df
+        return df.assign(**{col: CheckboxHandler.to_lists(df[col], self.checkbox_choices[col]) for col in columns})
+
     def to_csv(
             self,
             dir_path: str,
             forms: str | list[str] = None,
             makedir: bool = True,
             metadata_format: Literal['yaml', 'json'] | None = 'yaml',
+            expand_checkboxes: bool = True,
     ) -> None:
         # Check if dir_path exists
         if makedir and not os.path.exists(dir_path):
@@ -383,9 +778,11 @@ class REDCapProject:
         # Cast to list if string
         if isinstance(forms, str):
             forms = [forms]
-        # Save each form as csv
+        # Save each form as csv, lazy forms not used yet are built without being kept in memory
         for form in forms:
-            self.forms[form].to_csv(f'{dir_path}/{form}.csv', index=False)
+            df = self.forms.peek(form) if isinstance(self.forms, LazyForms) else self.forms[form]
+            df = self.expand_checkboxes(df) if expand_checkboxes else df
+            df.to_csv(f'{dir_path}/{form}.csv', index=False)
         # Save metadata
         if metadata_format == 'yaml':
             yaml.dump(self.get_metadata(), open(f'{dir_path}/metadata.yaml', 'w'))
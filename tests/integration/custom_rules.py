@@ -28,7 +28,7 @@ class CustomRules(CustomRulesBase):
     def check_invalid_cpf(self) -> dict:
         cpf_df: Series = self.forms['identificacao'].set_index('record_id')['cpf'].dropna().copy()
 
-        valid_cpf_mask = cpf_df.apply(self.th.validate_cpf, return_value=False)
+        valid_cpf_mask, _ = self.th.validate_cpf_batch(cpf_df)
         invalid_records = cpf_df[~valid_cpf_mask].index.tolist()
         return {
             'df': self.forms['identificacao'],
@@ -0,0 +1,9 @@
+import pytest
+
+from mock_server import MockREDCapServer
+
+
+@pytest.fixture
+def server():
+    with MockREDCapServer() as mock_server:
+        yield mock_server
@@ -0,0 +1,291 @@
+"""
+Local stand-in for the REDCap API used by the unit tests and benchmarks.
+
+The server answers the same form-encoded POST requests the package sends to a real REDCap instance, using a small
+synthetic project (see ``make_project``). It records every request and every client connection so tests can assert
+on round trips and connection reuse.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from urllib.parse import parse_qs
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+FIELD_DEFAULTS = {
+    'section_header': '',
+    'field_type': 'text',
+    'field_label': '',
+    'select_choices_or_calculations': '',
+    'field_note': '',
+    'text_validation_type_or_show_slider_number': '',
+    'text_validation_min': '',
+    'text_validation_max': '',
+    'identifier': '',
+    'branching_logic': '',
+    'required_field': '',
+    'custom_alignment': '',
+    'question_number': '',
+    'matrix_group_name': '',
+    'matrix_ranking': '',
+    'field_annotation': '',
+}
+
+
+def _field(field_name: str, form_name: str, **kwargs) -> dict:
+    field = {'field_name': field_name, 'form_name': form_name}
+    field.update(FIELD_DEFAULTS)
+    field.update(kwargs)
+    return field
+
+
+def make_codebook() -> list[dict]:
+    """Data dictionary of the synthetic project, as returned by ``content=metadata``."""
+    return [
+        _field('record_id', 'identificacao', field_label='Record ID'),
+        _field('nome', 'identificacao', identifier='y'),
+        _field('cpf', 'identificacao', identifier='y'),
+        _field('sexo', 'identificacao', field_type='radio',
+               select_choices_or_calculations='1, Masculino | 2, Feminino | 3, Outro'),
+        _field('sexo_outro', 'identificacao', branching_logic="[sexo] = '3'"),
+        _field('dta_nasc', 'identificacao', text_validation_type_or_show_slider_number='date_ymd',
+               text_validation_min='1900-01-01', text_validation_max='2024-12-31'),
+        _field('peso', 'identificacao', text_validation_type_or_show_slider_number='integer',
+               text_validation_min='500', text_validation_max='6000'),
+        _field('sintomas', 'identificacao', field_type='checkbox',
+               select_choices_or_calculations='1, Febre | 2, Dor | 3, Tosse'),
+        _field('doenca_sql', 'identificacao', field_type='sql',
+               select_choices_or_calculations='select value, label from lookup'),
+        _field('data_seguimento', 'seguimento', text_validation_type_or_show_slider_number='date_ymd',
+               required_field='y'),
+        _field('desfecho', 'seguimento', field_type='dropdown',
+               select_choices_or_calculations='1, Alta | 2, Obito | 99, Outro desfecho'),
+        _field('desfecho_outro', 'seguimento', branching_logic="[desfecho] = '99'"),
+        _field('altura', 'seguimento', text_validation_type_or_show_slider_number='number',
+               text_validation_min='0.3', text_validation_max='2.5'),
+    ]
+
+
+def make_records(n_records: int = 20, instances: int = 2, seed: int = 0) -> DataFrame:
+    """Flat raw export of the synthetic project: one base row plus ``instances`` repeating rows per record."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(1, n_records + 1):
+        dag = 'centro_a' if i % 2 else 'centro_b'
+        symptoms = rng.integers(0, 2, size=3)
+        rows.append({
+            'record_id': i,
+            'redcap_repeat_instrument': np.nan,
+            'redcap_repeat_instance': np.nan,
+            'redcap_data_access_group': dag,
+            'nome': f'Paciente {i}',
+            'cpf': '529.982.247-25' if i % 3 else '111.222.333-44',
+            'sexo': int(rng.integers(1, 4)),
+            'sexo_outro': 'NI' if i % 5 == 0 else np.nan,
+            'dta_nasc': f'19{50 + i % 50:02d}-0{1 + i % 9}-1{i % 10}',
+            'peso': 'NI' if i % 7 == 0 else str(int(rng.integers(400, 6500))),
+            'sintomas___1': symptoms[0],
+            'sintomas___2': symptoms[1],
+            'sintomas___3': symptoms[2],
+            'doenca_sql': f'D{i % 4}',
+            'identificacao_complete': 2 if i % 4 else 1,
+        })
+        for instance in range(1, instances + 1):
+            rows.append({
+                'record_id': i,
+                'redcap_repeat_instrument': 'seguimento',
+                'redcap_repeat_instance': instance,
+                'redcap_data_access_group': dag,
+                'data_seguimento': f'2023-0{instance}-1{i % 10}',
+                'desfecho': [1, 2, 99][(i + instance) % 3],
+                'desfecho_outro': 'Transferencia' if (i + instance) % 3 == 2 else np.nan,
+                'altura': f'{1 + rng.random():.2f}',
+                'seguimento_complete': 2,
+            })
+    columns = ['record_id', 'redcap_repeat_instrument', 'redcap_repeat_instance', 'redcap_data_access_group',
+               'nome', 'cpf', 'sexo', 'sexo_outro', 'dta_nasc', 'peso', 'sintomas___1', 'sintomas___2',
+               'sintomas___3', 'doenca_sql', 'identificacao_complete', 'data_seguimento', 'desfecho',
+               'desfecho_outro', 'altura', 'seguimento_complete']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def make_project(n_records: int = 20, instances: int = 2, seed: int = 0) -> dict:
+    """All payloads served by ``MockREDCapServer`` for a synthetic project."""
+    return {
+        'project': {'project_id': '123', 'project_title': 'Mock project'},
+        'metadata': make_codebook(),
+        'instrument': [
+            {'instrument_name': 'identificacao', 'instrument_label': 'Identificação'},
+            {'instrument_name': 'seguimento', 'instrument_label': 'Seguimento'},
+        ],
+        'dag': [
+            {'data_access_group_name': 'Centro A', 'unique_group_name': 'centro_a', 'data_access_group_id': '1'},
+            {'data_access_group_name': 'Centro B', 'unique_group_name': 'centro_b', 'data_access_group_id': '2'},
+        ],
+        'repeatingFormsEvents': [{'form_name': 'seguimento', 'custom_form_label': ''}],
+        'record': make_records(n_records, instances, seed),
+        'sql_labels': {'D0': 'Doença zero', 'D1': 'Doença um', 'D2': 'Doença dois'},
+        # Labels of yesno and truefalse fields in the project language
+        'language': {'yesno': {1: 'Sim', 0: 'Não'}, 'truefalse': {1: 'Verdadeiro', 0: 'Falso'}},
+        'modified': {},
+    }
+
+
+class MockREDCapServer:
+    """
+    Threaded HTTP server answering REDCap API calls from an in-memory project.
+
+    Parameters
+    ----------
+    project : dict, optional
+        Payloads to serve, see ``make_project`` (default is a fresh synthetic project).
+    latency : float, optional
+        Seconds to sleep before answering each request (default is 0).
+    failures : list[int], optional
+        HTTP status codes returned, in order, by the first requests (default is no failures).
+
+    Attributes
+    ----------
+    requests : list[dict]
+        Decoded payload of every request received.
+    connections : set
+        Client (host, port) pairs seen, one per TCP connection.
+    max_in_flight : int
+        Highest number of requests being answered at the same time.
+    """
+
+    def __init__(self, project: dict = None, latency: float = 0.0, failures: list[int] = None):
+        self.project = project or make_project()
+        self.latency = latency
+        self.failures = list(failures or [])
+        self.requests: list[dict] = []
+        self.connections: set = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address
+        return f'http://{host}:{port}/api/'
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def count(self, content: str) -> int:
+        """Number of requests received for a content type."""
+        return sum(1 for params in self.requests if params.get('content') == content)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                length = int(self.headers.get('Content-Length', 0))
+                params = {key: value if len(value) > 1 else value[0]
+                          for key, value in parse_qs(self.rfile.read(length).decode(),
+                                                     keep_blank_values=True).items()}
+                with server.lock:
+                    server.requests.append(params)
+                    server.connections.add(self.client_address)
+                    status = server.failures.pop(0) if server.failures else 200
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    if status != 200:
+                        body, content_type = b'{"error": "transient failure"}', 'application/json'
+                    else:
+                        status, body, content_type = server.respond(params)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def respond(self, params: dict) -> tuple[int, bytes, str]:
+        """Build the (status, body, content type) answer for a decoded request."""
+        content = params.get('content')
+        if content not in self.project:
+            return 400, b'{"error": "unsupported content"}', 'application/json'
+        if content == 'record':
+            return 200, self._export_records(params).encode(), 'text/csv'
+        payload = self.project[content]
+        if params.get('format') == 'csv' and isinstance(payload, list):
+            return 200, pd.DataFrame(payload).to_csv(index=False).encode(), 'text/csv'
+        return 200, json.dumps(payload).encode(), 'application/json'
+
+    def _export_records(self, params: dict) -> str:
+        df: DataFrame = self.project['record'].copy()
+        records = _as_list(params, 'records')
+        if records:
+            df = df[df['record_id'].astype(str).isin(records)]
+        if params.get('dateRangeBegin'):
+            modified = self.project['modified']
+            changed = [record for record, timestamp in modified.items() if timestamp >= params['dateRangeBegin']]
+            df = df[df['record_id'].astype(str).isin([str(record) for record in changed])]
+        fields = _as_list(params, 'fields')
+        if fields:
+            keep = [column for column in df.columns
+                    if column.split('___')[0] in fields
+                    or column in ('redcap_repeat_instrument', 'redcap_repeat_instance', 'redcap_data_access_group')]
+            df = df[keep]
+        if params.get('rawOrLabel') == 'label':
+            df = self._label_records(df)
+        buffer = StringIO()
+        df.to_csv(buffer, index=False)
+        return buffer.getvalue()
+
+    def _label_records(self, df: DataFrame) -> DataFrame:
+        df = df.copy()
+        for field in self.project['metadata']:
+            name = field['field_name']
+            if field['field_type'] in ('radio', 'dropdown') and name in df.columns:
+                choices = dict(pair.split(', ', 1) for pair in field['select_choices_or_calculations'].split(' | '))
+                df[name] = df[name].map(lambda x, c=choices: c.get(str(int(x))) if pd.notna(x) else x)
+            elif field['field_type'] == 'sql' and name in df.columns:
+                df[name] = df[name].map(self.project['sql_labels'])
+            elif field['field_type'] in ('yesno', 'truefalse') and name in df.columns:
+                df[name] = df[name].map(self.project['language'][field['field_type']])
+            elif field['field_type'] == 'checkbox':
+                for column in df.columns[df.columns.str.startswith(f'{name}___')]:
+                    df[column] = df[column].map({0: 'Unchecked', 1: 'Checked'})
+        if 'redcap_repeat_instrument' in df.columns:
+            labels = {item['instrument_name']: item['instrument_label'] for item in self.project['instrument']}
+            df['redcap_repeat_instrument'] = df['redcap_repeat_instrument'].map(labels)
+        return df
+
+
+def _as_list(params: dict, key: str) -> list[str]:
+    """Read an array parameter sent either comma separated or as ``key[i]`` entries."""
+    values = [value for name, value in params.items() if name == key or name.startswith(f'{key}[')]
+    items = []
+    for value in values:
+        for item in value if isinstance(value, list) else [value]:
+            items.extend(part for part in item.split(',') if part)
+    return items
@@ -0,0 +1,83 @@
+import copy
+from tempfile import SpooledTemporaryFile
+from unittest import mock
+
+import pytest
+import requests
+
+from mock_server import MockREDCapServer
+from pyredcap.handlers.api_handler import APIHandler
+
+
+def test_calls_reuse_one_connection(server):
+    api = APIHandler(server.url, 'token')
+    for content in ['project', 'metadata', 'instrument', 'dag', 'repeatingFormsEvents', 'record']:
+        api.make_api_call(content, format='json')
+
+    assert len(server.requests) == 6
+    assert len(server.connections) == 1
+
+
+def test_retries_transient_failures():
+    with MockREDCapServer(failures=[502, 429, 503]) as server:
+        api = APIHandler(server.url, 'token', max_retries=3, backoff_factor=0.01)
+        response = api.make_api_call('project', format='json')
+
+    assert response.json()['project_id'] == '123'
+    assert server.count('project') == 4
+
+
+def test_raises_after_max_retries():
+    with MockREDCapServer(failures=[500, 500, 500]) as server:
+        api = APIHandler(server.url, 'token', max_retries=2, backoff_factor=0.01)
+        with pytest.raises(requests.exceptions.HTTPError):
+            api.make_api_call('project', format='json')
+
+    assert server.count('project') == 3
+    assert api.get_stats()['project']['failed'] == 1
+
+
+def test_stats_counters(server):
+    api = APIHandler(server.url, 'token')
+    api.make_api_call('metadata', format='json')
+    api.make_api_call('metadata', format='json')
+
+    stats = api.get_stats()['metadata']
+    assert stats['calls'] == 2
+    assert stats['failed'] == 0
+    assert stats['bytes'] > 0
+    assert stats['seconds'] > 0
+
+    api.reset_stats()
+    assert not api.get_stats()
+
+
+def test_deepcopy(server):
+    api = APIHandler(server.url, 'token')
+    api_copy = copy.deepcopy(api)
+    assert api_copy.make_api_call('project', format='json').status_code == 200
+
+
+def test_download_streams_to_file(server):
+    api = APIHandler(server.url, 'token')
+    expected = api.make_api_call('record', format='csv').content
+
+    with api.download('record', chunk_size=64, format='csv') as file:
+        assert file.read() == expected
+    assert api.get_stats()['record']['bytes'] == 2 * len(expected)
+
+
+def test_download_closes_file_on_failure():
+    files = []
+
+    def spooled_file(**kwargs):
+        files.append(SpooledTemporaryFile(**kwargs))
+        return files[-1]
+
+    with MockREDCapServer(failures=[500, 500]) as server, \
+            mock.patch('pyredcap.handlers.api_handler.SpooledTemporaryFile', spooled_file):
+        api = APIHandler(server.url, 'token', max_retries=1, backoff_factor=0.01)
+        with pytest.raises(requests.exceptions.HTTPError):
+            api.download('record', format='csv')
+
+    assert len(files) == 1 and files[0].closed
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from mock_server import MockREDCapServer
+from pyredcap import REDCapProject
+from pyredcap.handlers.cache_handler import CacheHandler
+
+
+def test_project_metadata_cache(server, tmp_path):
+    project = REDCapProject(server.url, 'token', cache_dir=str(tmp_path))
+    cached_project = REDCapProject(server.url, 'token', cache_dir=str(tmp_path))
+
+    # The second instance makes no API call
+    assert server.count('metadata') == 1 and server.count('project') == 1
+    assert cached_project.project_id == project.project_id
+    pd.testing.assert_frame_equal(cached_project.codebook, project.codebook)
+    pd.testing.assert_frame_equal(cached_project.instruments, project.instruments)
+    assert cached_project.raw_label_map == project.raw_label_map
+
+    cached_project.init_project(refresh=True)
+    assert server.count('metadata') == 2
+
+
+def test_cache_invalidation(server, tmp_path):
+    project = REDCapProject(server.url, 'token', cache_dir=str(tmp_path))
+    project.invalidate_cache()
+    REDCapProject(server.url, 'token', cache_dir=str(tmp_path))
+    assert server.count('metadata') == 2
+
+    # Other tokens have their own entry
+    REDCapProject(server.url, 'other token', cache_dir=str(tmp_path))
+    assert server.count('metadata') == 3
+
+
+def test_cache_ttl_and_version(server, tmp_path):
+    REDCapProject(server.url, 'token', cache_dir=str(tmp_path))
+
+    assert CacheHandler(str(tmp_path), ttl=0).load(server.url, 'token') is None
+    assert CacheHandler(str(tmp_path), ttl=None).load(server.url, 'token') is not None
+
+    CacheHandler.CACHE_VERSION += 1
+    try:
+        assert CacheHandler(str(tmp_path)).load(server.url, 'token') is None
+    finally:
+        CacheHandler.CACHE_VERSION -= 1
+
+
+def test_failed_fetch_is_not_cached(server, tmp_path):
+    # Serial calls fail the instrument export (project, dag, instrument): one failure per attempt
+    api_options = {'max_retries': 1, 'backoff_factor': 0.01}
+    with MockREDCapServer(failures=[200, 200, 500, 500]) as failing_server:
+        with pytest.raises(ValueError, match='instrument'):
+            REDCapProject(failing_server.url, 'token', api_options=api_options, max_workers=1,
+                          cache_dir=str(tmp_path))
+    assert CacheHandler(str(tmp_path)).load(failing_server.url, 'token') is None
+
+    project = REDCapProject(server.url, 'token', max_workers=1)
+    metadata = project.mh.load_all_metadata(max_workers=1)
+    metadata['instrument'] = None
+    with pytest.raises(ValueError, match='instrument'):
+        CacheHandler(str(tmp_path)).save(server.url, 'token', metadata)
+    assert CacheHandler(str(tmp_path)).load(server.url, 'token') is None
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyredcap import REDCapProject
+from pyredcap.handlers.checkbox_handler import CheckboxHandler
+
+CHOICES = ['1', '2', '3']
+
+
+def test_encode_and_expand():
+    selected = np.array([[True, False, True], [False, False, False], [False, True, False]])
+    bitmask = CheckboxHandler.encode(selected, index=pd.Index([10, 11, 12]))
+
+    assert bitmask.dtype == 'Int64'
+    assert bitmask.tolist() == [5, pd.NA, 2]
+    lists = CheckboxHandler.to_lists(bitmask, CHOICES)
+    assert lists.tolist()[0] == ['1', '3'] and np.isnan(lists[11]) and lists[12] == ['2']
+    pd.testing.assert_series_equal(CheckboxHandler.from_lists(lists, CHOICES), bitmask)
+
+    assert CheckboxHandler.contains(bitmask, CHOICES, '3').tolist() == [True, False, False]
+    assert CheckboxHandler.contains(bitmask, CHOICES, ['2', '3']).tolist() == [True, False, True]
+    assert CheckboxHandler.map_labels(CHOICES, {'1': 'Febre', '2': 'Dor'}) == ['Febre', 'Dor', '3']
+
+    with pytest.raises(ValueError):
+        CheckboxHandler.from_lists(pd.Series([['4']]), CHOICES)
+
+
+def test_compact_decode_checkbox(server):
+    project = REDCapProject(server.url, 'token')
+    project.load_records()
+    compact_project = REDCapProject(server.url, 'token')
+    compact_project.load_records()
+
+    project.preprocess_forms()
+    compact_project.preprocess_forms({'remove_missing_datacodes': None,
+                                      'decode_checkbox': {'compact': True},
+                                      'subset_forms': None})
+
+    form = compact_project.forms['identificacao']
+    assert form['sintomas'].dtype == 'Int64'
+    assert compact_project.checkbox_choices == {'sintomas': CHOICES}
+    assert compact_project.get_metadata()['checkbox_choices'] == {'sintomas': CHOICES}
+    assert 'checkbox_choices' not in project.get_metadata()
+    expanded = compact_project.expand_checkboxes(form)
+    assert (expanded['sintomas'].fillna('').tolist()
+            == project.forms['identificacao']['sintomas'].fillna('').tolist())
+
+    # Relabeling only maps the choice table
+    compact_project.clean_data({'identificacao': {'remap_categorical_labels': {'columns': ['sintomas']}}})
+    assert compact_project.checkbox_choices['sintomas'] == ['Febre', 'Dor', 'Tosse']
+    pd.testing.assert_series_equal(compact_project.forms['identificacao']['sintomas'], form['sintomas'])
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyredcap import DataCleaning, Preprocessing
+from pyredcap.handlers.column_handler import ColumnHandler
+
+
+def test_staged_edits():
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z'], 'c': [1.5, 2.5, 3.5]})
+    staged = ColumnHandler(df)
+    assert staged.commit() is df
+
+    staged.insert(staged.get_loc('b') + 1, 'd', pd.Series([10, 30], index=[0, 2], dtype='Int64'))
+    staged.drop('a')
+    staged.assign('c', df['c'] * 2)
+    staged.insert(0, 'e', 'const')
+    assert staged.columns == ['e', 'b', 'd', 'c']
+    assert staged['d'].tolist() == [10, pd.NA, 30]
+    # Nothing is applied before the commit
+    assert df.columns.tolist() == ['a', 'b', 'c']
+
+    result = staged.commit()
+    expected = pd.DataFrame({'e': 'const', 'b': ['x', 'y', 'z'], 'd': pd.array([10, None, 30], dtype='Int64'),
+                             'c': [3.0, 5.0, 7.0]})
+    pd.testing.assert_frame_equal(result, expected)
+    assert df['c'].tolist() == [1.5, 2.5, 3.5]
+
+    with pytest.raises(ValueError):
+        staged.insert(0, 'b', 1)
+    with pytest.raises(KeyError):
+        staged.drop(['a'])
+    with pytest.raises(ValueError):
+        staged.reorder(['b', 'c'])
+    staged.reorder(['c', 'd', 'b', 'e'])
+    assert staged.commit().columns.tolist() == ['c', 'd', 'b', 'e']
+
+
+def test_aggregate_columns():
+    df = pd.DataFrame({
+        'record_id': [1, 2, 3],
+        'cid_1': ['A01', np.nan, 'B02'],
+        'nome': ['x', 'y', 'z'],
+        'cid_2': [np.nan, 'C03', 'D04'],
+        'omim_1': ['100', np.nan, np.nan],
+        'omim_2': [np.nan, '200', np.nan],
+    })
+    codebook = pd.DataFrame({'field_name': df.columns, 'field_type': 'text'})
+    project = SimpleNamespace(df=df, codebook=codebook, missing_datacodes={})
+
+    preprocessing = Preprocessing(project)
+    preprocessing.aggregate_columns([{'search_str': '^cid_'}, {'search_str': '^omim_', 'col_name': 'omim'}])
+
+    assert preprocessing.df.columns.tolist() == ['record_id', 'cid', 'nome', 'omim']
+    assert preprocessing.df['cid'].tolist() == [['A01'], ['C03'], ['B02', 'D04']]
+    assert preprocessing.df['omim'].tolist() == ['100', '200', np.nan]
+    assert preprocessing.codebook['field_name'].tolist() == ['record_id', 'cid', 'nome', 'omim']
+
+
+def test_data_cleaning_column_edits():
+    df = pd.DataFrame({
+        'record_id': ['R1', 'R2', 'R3'],
+        'idade': ['2', '3', np.nan],
+        'unidade': ['year', 'day', np.nan],
+        'doenca': ['CID10 - A01 - Febre', np.nan, 'CID10 - B02 - Dor'],
+        'doenca_2': ['ORPHA - 558 - Marfan', 'Sem codigo', np.nan],
+    })
+    metadata = {'codebook': [], 'raw_label_map': {}, 'outliers': {}}
+    data_cleaning = DataCleaning('form', df, metadata, {
+        'recalculate_age': {'age_column': 'idade', 'age_unit_column': 'unidade', 'new_column': 'idade_dias'},
+        'split_code_descrpition': [
+            {'column': 'doenca', 'filter_pattern': r'(?<=- )[A-Z]\d{2}', 'code_name': 'cid', 'desc_name': 'cid_desc'},
+            {'column': 'doenca_2', 'filter_pattern': r'(?<=- )\d{3}', 'code_name': 'orpha',
+             'desc_name': 'orpha_desc'},
+        ],
+    })
+
+    result = data_cleaning.df
+    assert result.columns.tolist() == ['record_id', 'idade_dias', 'cid', 'cid_desc', 'orpha', 'orpha_desc']
+    assert result['idade_dias'].tolist() == [730, 3, pd.NA]
+    assert result['cid'].tolist() == ['A01', np.nan, 'B02']
+    assert result['cid_desc'].tolist() == ['Febre', np.nan, 'Dor']
+    assert result['orpha'].dtype == 'Int64'
+    assert result['orpha'].tolist() == [558, pd.NA, pd.NA]
+    assert result['orpha_desc'].tolist() == ['Marfan', np.nan, np.nan]
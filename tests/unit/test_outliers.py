@@ -0,0 +1,150 @@
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyredcap import Outliers
+from pyredcap.outliers import CSVSink
+
+
+def make_project() -> SimpleNamespace:
+    form = pd.DataFrame({
+        'record_id': ['R1', 'R2', 'R3', 'R4'],
+        'redcap_data_access_group': ['dag_a', 'dag_a', 'dag_b', 'dag_b'],
+        'peso': ['3200', 'abc', '9000', np.nan],
+        'altura': ['50', '40', '20', '45'],
+        'dta_diag': ['2020-01-01', '2010-05-01', 'x', '2021-01-01'],
+        'identificacao_complete': [2, 2, 0, 2],
+    })
+    codebook = pd.DataFrame({
+        'field_name': ['peso', 'altura', 'dta_diag'],
+        'form_name': 'identificacao',
+        'field_type': 'text',
+        'field_annotation': '',
+        'text_validation_type_or_show_slider_number': ['integer', 'number', 'date_dmy'],
+        'text_validation_min': ['500', '30', '2018-01-01'],
+        'text_validation_max': ['6000', '', ''],
+        'required_field': '',
+        'branching_logic': '',
+    })
+    return SimpleNamespace(forms={'identificacao': form}, codebook=codebook)
+
+
+def test_generate_outliers(tmp_path):
+    fragments = []
+    out = Outliers(make_project(), sink=fragments.append)
+    out.generate_outliers(filter_incomplete=False)
+
+    result = out.outliers_df
+    assert list(zip(result['record_id'], result['field_name'])) == [
+        ('R2', 'peso'), ('R3', 'peso'), ('R3', 'altura'), ('R3', 'dta_diag'), ('R2', 'dta_diag')]
+    assert result['form_status'].tolist() == ['complete'] + ['incomplete'] * 3 + ['complete']
+    assert result['instance'].dtype == 'Int64'
+    # The sink receives each fragment as produced, formatted
+    assert len(fragments) == 5
+    pd.testing.assert_frame_equal(pd.concat(fragments, ignore_index=True), result)
+
+    path = tmp_path / 'outliers.csv'
+    path.write_text('previous run\n')
+    sink = CSVSink(str(path))
+    # The file is only replaced by the first fragment
+    assert path.read_text() == 'previous run\n'
+    out = Outliers(make_project(), sink=sink)
+    out.generate_outliers()
+    assert out.outliers_df['field_name'].tolist() == ['peso', 'dta_diag']
+    saved = pd.read_csv(path)
+    assert saved['field_name'].tolist() == ['peso', 'dta_diag']
+    assert saved.columns.tolist() == out.outliers_df.columns.tolist()
+
+    # Outliers only sent to the sink
+    fragments.clear()
+    out = Outliers(make_project(), sink=fragments.append, keep=False)
+    out.generate_outliers(filter_incomplete=False)
+    assert out.outliers_df.empty
+    pd.testing.assert_frame_equal(pd.concat(fragments, ignore_index=True), result)
+    with pytest.raises(ValueError):
+        Outliers(make_project(), keep=False)
+
+
+def test_update_outliers_df():
+    project = make_project()
+    out = Outliers(project)
+    assert out.outliers_df.empty
+    form = project.forms['identificacao']
+    out.update_outliers_df(form, 'peso', 'identificacao', ['R1'], 'first')
+    # Fragments are concatenated when outliers_df is read
+    assert out.outliers_df['reason'].tolist() == ['first']
+    out.update_outliers_df(form, 'peso', 'identificacao', ['R2', 'R3'], 'second')
+    out.update_outliers_df(form, 'altura', 'identificacao', ['R4'], 'third')
+    assert out.outliers_df['reason'].tolist() == ['first', 'second', 'second', 'third']
+    assert out.outliers_df.index.tolist() == [0, 1, 2, 3]
+
+
+def make_messy_project() -> SimpleNamespace:
+    rng = np.random.default_rng(0)
+    rows = 60
+    dates = pd.Series(pd.Timestamp('2017-06-01') + pd.to_timedelta(rng.integers(0, 1000, rows), unit='D'))
+    identificacao = pd.DataFrame({
+        'record_id': [f'R{i % 40}' for i in range(rows)],
+        'redcap_data_access_group': rng.choice(['dag_a', 'dag_b'], rows),
+        'redcap_repeat_instance': np.where(np.arange(rows) >= 40, 2.0, np.nan),
+        'peso': rng.choice(np.array(['3200', '450', '7000', 'abc', '', np.nan], dtype=object), rows),
+        'altura': rng.normal(50, 20, rows).round(1),
+        'idade': pd.array(rng.integers(-5, 130, rows), dtype='Int64'),
+        'dta_iso': dates.dt.strftime('%Y-%m-%d').where(rng.random(rows) > 0.1, 'x'),
+        # The type check infers another format from the first value
+        'dta_br': dates.dt.strftime('%d/%m/%Y').where(rng.random(rows) > 0.2, dates.dt.strftime('%Y-%m-%d')),
+        'dta_parsed': dates,
+        # No format inferred from the first value, values are parsed one by one
+        'dta_texto': dates.dt.strftime('%Y-%m-%d').where(rng.random(rows) > 0.2, dates.dt.strftime('%d/%m/%Y'))
+        .where(rng.random(rows) > 0.1, 'ontem'),
+        'identificacao_complete': rng.choice([0, 1, 2], rows),
+    })
+    identificacao.loc[3, 'dta_br'] = np.nan
+    identificacao.loc[0, 'dta_texto'] = 'ontem'
+    diagnostico = identificacao[['record_id', 'redcap_data_access_group', 'peso', 'dta_iso']].copy()
+    diagnostico['diagnostico_complete'] = 2
+    codebook = pd.DataFrame([
+        ('peso', 'identificacao', 'integer', '500', '6000'),
+        ('altura', 'identificacao', 'number', '', '60'),
+        ('idade', 'identificacao', 'integer', '0', ''),
+        ('dta_iso', 'identificacao', 'date_dmy', '2018-01-01', '2019-06-01'),
+        ('dta_br', 'identificacao', 'date_dmy', '2018-01-01', ''),
+        ('dta_parsed', 'identificacao', 'date_dmy', '', '2019-01-01'),
+        ('dta_texto', 'identificacao', 'date_dmy', '2018-01-01', ''),
+        # Same fields in another form, validated with the ranges of their first rows
+        ('peso', 'diagnostico', 'integer', '1000', ''),
+        ('dta_iso', 'diagnostico', 'date_dmy', '', ''),
+    ], columns=['field_name', 'form_name', 'text_validation_type_or_show_slider_number', 'text_validation_min',
+                'text_validation_max'])
+    codebook['field_type'] = 'text'
+    codebook['field_annotation'] = ''
+    codebook['required_field'] = ''
+    codebook['branching_logic'] = ''
+    return SimpleNamespace(forms={'identificacao': identificacao, 'diagnostico': diagnostico}, codebook=codebook)
+
+
+@pytest.mark.filterwarnings('ignore:Parsing dates in:UserWarning', 'ignore:Could not infer format:UserWarning')
+def test_validation_plan_matches_field_checks():
+    out = Outliers(make_messy_project())
+    # Formats are passed explicitly, day first dates and values parsed one by one aren't warned about
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', UserWarning)
+        out.generate_outliers(filter_incomplete=False)
+
+    # Field by field checks, warning about day first dates and values parsed one by one
+    expected = Outliers(make_messy_project())
+    expected._instance_validation_df(expected.codebook)
+    validation_df = expected.validation_df
+    for form_name, form in expected.forms.items():
+        for column in validation_df.loc[validation_df['form_name'] == form_name, 'field_name']:
+            field_info = validation_df[validation_df['field_name'] == column].to_dict(orient='records')[0]
+            data_type = 'numeric' if column in expected.cols_to_validate['numeric_cols'] else 'date'
+            expected.check_dtype(form, column, form_name, data_type)
+            expected.check_range(form, column, form_name, data_type, field_info['min'], field_info['max'])
+
+    assert len(out.outliers_df) > 40
+    assert set(out.outliers_df['reason']) > {'Dado inválido (date)', 'Dado inválido (numeric)'}
+    pd.testing.assert_frame_equal(out.outliers_df, expected._format_outliers(expected.outliers_df, False))
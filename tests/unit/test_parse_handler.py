@@ -0,0 +1,67 @@
+import logging
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from pyredcap import REDCapProject
+from pyredcap.handlers.parse_handler import ParseHandler
+
+pytest.importorskip('pyarrow')
+
+CSV = b'record_id,sexo,peso,dta_nasc,nome\n1,1,3200,2000-01-02,Ana\n2,2,NI,,Bia\n3,,2800,2001-05-06,\n'
+
+
+def test_invalid_engine():
+    with pytest.raises(ValueError):
+        ParseHandler('polars')
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'pyarrow'])
+def test_read_records(engine):
+    df = ParseHandler(engine).read_records(CSV)
+
+    assert df.shape == (3, 5)
+    assert df['nome'].isna().tolist() == [False, False, True]
+    assert df['peso'].astype(str).tolist()[:2] == ['3200', 'NI']
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'pyarrow'])
+def test_read_records_dtype_schema(engine, caplog):
+    with caplog.at_level(logging.INFO):
+        df = ParseHandler(engine).read_records(
+            CSV, dtype={'sexo': 'category', 'peso': 'Int64', 'missing': 'Float64'}, parse_dates=['dta_nasc'])
+
+    assert isinstance(df['sexo'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df['dta_nasc'])
+    assert not pd.api.types.is_numeric_dtype(df['peso'])
+    # Missing data codes are routine: no error, the column keeping its dtype is named
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+    assert [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING] == [
+        f'Column peso has values that are not Int64, keeping {df["peso"].dtype} dtype.']
+
+
+def test_join_csv():
+    joined = ParseHandler.join_csv([BytesIO(b'a,b\n1,2\n'), BytesIO(b'a,b\n3,4')])
+    assert joined.read() == b'a,b\n1,2\n3,4\n'
+    assert ParseHandler.join_csv([BytesIO(b'a,b\n1,2\n'), BytesIO(b'a\n3\n')]) is None
+
+
+def test_pyarrow_engine_returns_arrow_dtypes():
+    df = ParseHandler('pyarrow').read_records(CSV)
+
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+
+
+def test_project_pyarrow_engine(server):
+    pandas_project = REDCapProject(server.url, 'token')
+    arrow_project = REDCapProject(server.url, 'token', parse_engine='pyarrow')
+
+    pd.testing.assert_frame_equal(arrow_project.codebook, pandas_project.codebook)
+    assert arrow_project.raw_label_map == pandas_project.raw_label_map
+    assert arrow_project.dag.equals(pandas_project.dag)
+
+    pandas_project.load_records()
+    arrow_project.load_records()
+    assert arrow_project.df.shape == pandas_project.df.shape
+    assert arrow_project.df.columns.tolist() == pandas_project.df.columns.tolist()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from pyredcap import DataCleaning
+from pyredcap.handlers.plan_handler import PlanHandler
+
+INSTRUCTIONS = {
+    'remap_categorical_labels': None,
+    'remap_boolean_labels': {'columns': ['flag', 'flag_old']},
+    'normalize_string': {'columns': ['nome', 'obs'], 'method': 'upper'},
+    'enforce_dtype': {'dtype_map': {'Int64': ['peso', 'flag']}},
+    'rename_features': {'mapping': {'obs': 'observacao', 'flag_old': 'flag_antigo'}},
+    'drop_features': {'columns': ['observacao', 'flag_antigo']},
+}
+
+
+def make_form() -> pd.DataFrame:
+    return pd.DataFrame({
+        'record_id': ['R1', 'R2', 'R3', 'R4'],
+        'nome': ['ana', 'bia', np.nan, 'caio'],
+        'sexo': [1, 2, np.nan, 1],
+        'obs': ['a', np.nan, 'b', 'c'],
+        'flag': ['Sim', 'nao', np.nan, 'sim'],
+        'flag_old': ['nao', 'sim', 'sim', np.nan],
+        'peso': ['3200', '2800', np.nan, '4100'],
+    })
+
+
+def make_metadata() -> dict:
+    return {
+        'codebook': [],
+        'raw_label_map': {'sexo': {'1': 'Masculino', '2': 'Feminino'}},
+        'outliers': {'invalid_records': {}},
+    }
+
+
+def test_plan_matches_sequential_run():
+    sequential = DataCleaning('form', make_form(), make_metadata(), INSTRUCTIONS)
+    planned = DataCleaning('form', make_form(), make_metadata(), INSTRUCTIONS, plan=True)
+
+    pd.testing.assert_frame_equal(planned.df, sequential.df)
+    assert planned.df.columns.tolist() == ['record_id', 'nome', 'sexo', 'flag', 'peso']
+    assert planned.df['sexo'].tolist() == ['Masculino', 'Feminino', np.nan, 'Masculino']
+    assert planned.df['flag'].tolist() == [1, 0, pd.NA, 1]
+
+
+def test_build_plan():
+    data_cleaning = DataCleaning('form', make_form(), make_metadata())
+    plan = PlanHandler.build_plan(data_cleaning, INSTRUCTIONS)
+
+    assert [step['kind'] for step in plan] == ['columns', 'call', 'call']
+    fused = {instruction['method']: instruction for instruction in plan[0]['instructions']}
+    assert list(fused) == ['remap_categorical_labels', 'remap_boolean_labels', 'normalize_string', 'enforce_dtype']
+    assert fused['remap_categorical_labels']['columns'] == ['sexo']
+    # Columns dropped after being renamed are followed back to their name at each step
+    assert fused['remap_boolean_labels']['pruned'] == {'flag_old'}
+    assert fused['normalize_string']['pruned'] == {'obs'}
+    assert not fused['enforce_dtype']['pruned']
+
+    explain = PlanHandler.explain(plan)
+    assert explain.splitlines()[0] == '6 instructions in 3 steps, 2 column operations pruned'
+    assert 'fused column pass remap_categorical_labels + remap_boolean_labels + normalize_string + enforce_dtype ' \
+           'over 4 columns' in explain
+
+    # Instructions that may read a column stop the pruning
+    plan = PlanHandler.build_plan(data_cleaning, {
+        'normalize_string': {'columns': ['obs', 'nome'], 'method': 'lower'},
+        'remove_duplicates': {'column': 'obs'},
+        'drop_features': ['obs'],
+    })
+    assert not plan[0]['instructions'][0]['pruned']
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+from mock_server import MockREDCapServer, make_project
+from pyredcap import REDCapProject
+from pyredcap.lazy_forms import LazyForms
+from pyredcap.preprocessing import Preprocessing
+
+
+def test_remove_missing_datacodes():
+    project_data = make_project()
+    records = project_data['record']
+    records['sintomas___ni'] = np.where(records.index % 4 == 0, 1, 0)
+    with MockREDCapServer(project_data) as server:
+        project = REDCapProject(server.url, 'token')
+        project.load_records()
+    raw_df = project.df.copy()
+
+    preprocessing = Preprocessing(project)
+    preprocessing.remove_missing_datacodes()
+
+    assert preprocessing.outliers['missing_datacodes'] == {
+        'sexo_outro': {'NI': 4}, 'peso': {'NI': 2}, 'sintomas': {'NI': 15.0}}
+    df = preprocessing.df
+    assert not df.isin(['NI']).any().any()
+    assert 'sintomas___ni' not in df.columns
+    # Columns left with no values are inferred again, like a replace over the whole frame
+    assert df['sexo_outro'].dtype == 'float64'
+    assert df['peso'].dropna().tolist() == raw_df['peso'][raw_df['peso'] != 'NI'].dropna().tolist()
+    # The project records are left untouched
+    pd.testing.assert_frame_equal(project.df, raw_df)
+
+
+def test_decode_checkbox(server):
+    project = REDCapProject(server.url, 'token')
+    project.load_records()
+    raw_df = project.df
+
+    preprocessing = Preprocessing(project)
+    preprocessing.decode_checkbox()
+    df = preprocessing.df
+
+    columns = raw_df.columns.tolist()
+    position = columns.index('sintomas___1')
+    expected_columns = columns[:position] + ['sintomas'] + [col for col in columns[position:]
+                                                           if not col.startswith('sintomas___')]
+    assert df.columns.tolist() == expected_columns
+    for (_, row), decoded in zip(raw_df.iterrows(), df['sintomas']):
+        selected = [choice for choice in ['1', '2', '3'] if row[f'sintomas___{choice}'] == 1]
+        if selected:
+            assert decoded.tolist() == selected
+        else:
+            assert np.isnan(decoded)
+
+
+def test_subset_forms(server):
+    project = REDCapProject(server.url, 'token')
+    project.load_records()
+    raw_df = project.df
+
+    preprocessing = Preprocessing(project)
+    preprocessing.decode_checkbox()
+    preprocessing.subset_forms()
+    forms = preprocessing.forms
+
+    repeating_mask = raw_df['redcap_repeat_instrument'] == 'seguimento'
+    assert forms['seguimento'].index.tolist() == raw_df.index[repeating_mask].tolist()
+    assert forms['identificacao'].index.tolist() == raw_df.index[raw_df['redcap_repeat_instrument'].isna()].tolist()
+    assert forms['seguimento'].columns.tolist() == preprocessing.feature_map['seguimento']
+    pd.testing.assert_series_equal(forms['seguimento']['altura'], raw_df.loc[repeating_mask, 'altura'])
+
+
+def test_lazy_forms(server, tmp_path):
+    project = REDCapProject(server.url, 'token')
+    project.load_records()
+    lazy_project = REDCapProject(server.url, 'token')
+    lazy_project.load_records()
+
+    project.preprocess_forms()
+    lazy_project.preprocess_forms({'remove_missing_datacodes': None,
+                                   'decode_checkbox': None,
+                                   'subset_forms': {'lazy': True}})
+    forms = lazy_project.forms
+
+    assert isinstance(forms, LazyForms)
+    assert list(forms) == list(project.forms) and not forms.built
+
+    # Saving builds forms without keeping them
+    lazy_project.to_csv(str(tmp_path), metadata_format=None)
+    assert not forms.built
+    assert pd.read_csv(tmp_path / 'seguimento.csv').shape == project.forms['seguimento'].shape
+
+    pd.testing.assert_frame_equal(forms['seguimento'], project.forms['seguimento'])
+    assert forms.touched == {'seguimento'} and forms.built == {'seguimento'}
+
+    lazy_project.clean_data({'identificacao': {'remap_categorical_labels': {'columns': ['sexo']}}})
+    assert forms.touched == {'seguimento', 'identificacao'}
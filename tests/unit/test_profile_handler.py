@@ -0,0 +1,60 @@
+import json
+import logging
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from pyredcap import DataCleaning
+from pyredcap.handlers.profile_handler import JSONLinesHook, LoggingHook, ProfileHandler
+
+INSTRUCTIONS = {
+    'normalize_string': {'columns': ['nome'], 'method': 'upper'},
+    'enforce_dtype': {'dtype_map': {'Int64': ['peso']}},
+    'drop_features': {'columns': ['obs']},
+}
+
+
+def make_data_cleaning(instructions: dict = None, plan: bool = False) -> DataCleaning:
+    df = pd.DataFrame({'record_id': ['R1', 'R2'], 'nome': ['ana', 'bia'], 'peso': ['3200', '2800'],
+                       'obs': ['a', 'b']})
+    metadata = {'codebook': [], 'raw_label_map': {}, 'outliers': {'invalid_records': {}}}
+    return DataCleaning('identificacao', df, metadata, instructions, plan=plan)
+
+
+def test_profile_events(tmp_path, caplog):
+    events = []
+    path = tmp_path / 'profile.jsonl'
+    with ProfileHandler.hooked(events.append, JSONLinesHook(str(path)), LoggingHook()), \
+            caplog.at_level(logging.INFO):
+        make_data_cleaning(INSTRUCTIONS)
+    assert not ProfileHandler.hooks
+
+    assert [event['method'] for event in events] == list(INSTRUCTIONS)
+    event = events[-1]
+    assert event['transformer'] == 'DataCleaning' and event['form_name'] == 'identificacao'
+    assert (event['rows_in'], event['columns_in'], event['rows_out'], event['columns_out']) == (2, 4, 2, 3)
+    assert event['wall_time'] >= 0 and event['cpu_time'] >= 0 and event['error'] is None
+    assert [json.loads(line) for line in path.read_text().splitlines()] == events
+    assert 'DataCleaning.drop_features (form identificacao)' in caplog.text
+
+    # Column passes of a plan are profiled as one step
+    events.clear()
+    with ProfileHandler.hooked(events.append):
+        make_data_cleaning(INSTRUCTIONS, plan=True)
+    assert [event['method'] for event in events] == ['normalize_string + enforce_dtype', 'drop_features']
+
+
+def test_profile_errors_and_disabled():
+    events = []
+    with ProfileHandler.hooked(events.append), pytest.raises(KeyError):
+        make_data_cleaning({'drop_features': {'columns': ['missing']}})
+    assert events[0]['error'].startswith('KeyError')
+
+    # A failing hook doesn't stop the instructions
+    with ProfileHandler.hooked(mock.Mock(side_effect=RuntimeError)):
+        assert make_data_cleaning(INSTRUCTIONS).df.columns.tolist() == ['record_id', 'nome', 'peso']
+
+    with mock.patch.object(ProfileHandler, 'profile') as profile:
+        make_data_cleaning(INSTRUCTIONS)
+    profile.assert_not_called()
@@ -0,0 +1,255 @@
+from datetime import datetime, timedelta
+from io import BytesIO
+from unittest import mock
+
+import pandas as pd
+
+from mock_server import MockREDCapServer, make_codebook
+from pyredcap import REDCapProject
+from pyredcap.handlers.metadata_handler import MetadataHandler
+
+
+def test_init_project(server):
+    project = REDCapProject(server.url, 'token')
+
+    assert project.project_id == '123'
+    assert project.project_title == 'Mock project'
+    assert project.dag.shape[0] == 2
+    assert project.instruments['instrument_name'].tolist() == ['identificacao', 'seguimento']
+    assert project.repeating_forms_events['form_name'].tolist() == ['seguimento']
+    assert project.identifier_fields == ['nome', 'cpf']
+    assert project.raw_label_map['sexo'] == {'1': 'Masculino', '2': 'Feminino', '3': 'Outro'}
+    assert project.branching_logic_tree == {'sexo': {'sexo_outro': {}}, 'desfecho': {'desfecho_outro': {}}}
+    for content in ['project', 'dag', 'instrument', 'repeatingFormsEvents', 'metadata']:
+        assert server.count(content) == 1
+
+
+def test_init_project_concurrent():
+    # The latency keeps each call open long enough for the others to overlap it
+    with MockREDCapServer(latency=0.2) as server:
+        REDCapProject(server.url, 'token', max_workers=5)
+    assert server.max_in_flight > 1
+
+    with MockREDCapServer(latency=0.05) as server:
+        REDCapProject(server.url, 'token', max_workers=1)
+    assert server.max_in_flight == 1
+
+
+def test_load_records(server):
+    project = REDCapProject(server.url, 'token')
+    project.load_records()
+
+    assert project.df.shape == server.project['record'].shape
+    assert project.df.columns.tolist() == server.project['record'].columns.tolist()
+
+
+def test_load_records_chunked_matches_single_export(server):
+    project = REDCapProject(server.url, 'token', max_workers=3)
+    project.load_records()
+    single_df = project.df
+
+    project.load_records(chunk_size=3)
+
+    pd.testing.assert_frame_equal(project.df, single_df)
+    # One call for the record ids plus ceil(20 / 3) batches
+    assert server.count('record') == 1 + 1 + 7
+
+
+def test_load_records_chunked_subset(server):
+    project = REDCapProject(server.url, 'token')
+    project.load_records(records=['2', '5', '9'], chunk_size=2)
+
+    assert project.df['record_id'].unique().tolist() == [2, 5, 9]
+
+
+def test_load_records_stream(server):
+    project = REDCapProject(server.url, 'token', max_workers=3)
+    project.load_records()
+    single_df = project.df
+
+    project.load_records(stream=True)
+    pd.testing.assert_frame_equal(project.df, single_df)
+
+    project.load_records(chunk_size=3, stream=True)
+    pd.testing.assert_frame_equal(project.df, single_df)
+
+
+def test_load_records_incremental(server, tmp_path):
+    project = REDCapProject(server.url, 'token')
+    project.load_records(snapshot_dir=str(tmp_path))
+    assert server.count('record') == 1
+
+    # Modify record 3, add record 21 and delete record 5 on the server
+    records = server.project['record']
+    records.loc[records['record_id'] == 3, 'nome'] = 'Paciente modificado'
+    new_record = records[records['record_id'] == 1].assign(record_id=21, nome='Paciente novo')
+    records = pd.concat([records[records['record_id'] != 5], new_record], ignore_index=True)
+    server.project['record'] = records
+    server.project['modified'] = {3: '2999-01-01 00:00:00', 21: '2999-01-01 00:00:00'}
+
+    project.load_records(snapshot_dir=str(tmp_path), prune_deleted=True)
+    delta_request = server.requests[-2]
+    assert 'dateRangeBegin' in delta_request and 'dateRangeEnd' not in delta_request
+
+    expected = records.reset_index(drop=True)
+    assert project.df['record_id'].tolist() == expected['record_id'].tolist()
+    assert project.df.loc[project.df['record_id'] == 3, 'nome'].iloc[0] == 'Paciente modificado'
+    assert project.df.shape == expected.shape
+
+
+def test_load_records_incremental_skewed_clock(server, tmp_path):
+    # Local clock three hours ahead of the server, e.g. a client in another time zone
+    class SkewedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(hours=3)
+
+    project = REDCapProject(server.url, 'token')
+    with mock.patch('pyredcap.redcap_project.datetime', SkewedDatetime):
+        project.load_records(snapshot_dir=str(tmp_path))
+
+        # Modified on the server after the first sync, in server time
+        records = server.project['record']
+        records.loc[records['record_id'] == 3, 'nome'] = 'Paciente modificado'
+        server.project['modified'] = {3: (datetime.now() + timedelta(minutes=1)).strftime('%Y-%m-%d %H:%M:%S')}
+
+        project.load_records(snapshot_dir=str(tmp_path))
+
+    assert project.df.loc[project.df['record_id'] == 3, 'nome'].iloc[0] == 'Paciente modificado'
+
+
+def test_load_records_incremental_new_parameters(server, tmp_path):
+    project = REDCapProject(server.url, 'token')
+    project.load_records(snapshot_dir=str(tmp_path))
+    project.load_records(fields=['record_id', 'nome'], snapshot_dir=str(tmp_path))
+
+    assert 'dateRangeBegin' not in server.requests[-1]
+    assert 'sexo' not in project.df.columns
+
+
+def test_create_dtype_schema():
+    codebook = pd.DataFrame(make_codebook())
+    dtype, parse_dates = MetadataHandler.create_dtype_schema(codebook)
+
+    assert dtype == {'sexo': 'category', 'desfecho': 'category', 'peso': 'Int64', 'altura': 'Float64'}
+    assert parse_dates == ['dta_nasc', 'data_seguimento']
+
+
+def test_load_records_dtype_schema(server):
+    project = REDCapProject(server.url, 'token')
+    project.load_records(dtype_schema=True)
+    df = project.df
+
+    assert isinstance(df['sexo'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['desfecho'].dtype, pd.CategoricalDtype)
+    assert df['altura'].dtype == 'Float64'
+    assert pd.api.types.is_datetime64_any_dtype(df['dta_nasc'])
+    assert pd.api.types.is_datetime64_any_dtype(df['data_seguimento'])
+    # Missing data codes ('NI') keep the column as parsed by pandas
+    assert df['peso'].dtype == object
+    assert (df['peso'] == 'NI').any()
+
+
+def test_load_records_label_columns(server):
+    # yesno field, labelled in the project language
+    server.project['metadata'].append({**make_codebook()[1], 'field_name': 'consentimento', 'identifier': '',
+                                       'field_type': 'yesno'})
+    records = server.project['record']
+    records['consentimento'] = (records['record_id'] % 2).where(records['redcap_repeat_instrument'].isna())
+    label_columns = ['sexo', 'desfecho', 'doenca_sql', 'redcap_repeat_instrument', 'consentimento', 'sintomas___2']
+    project = REDCapProject(server.url, 'token')
+    project.load_records()
+    response = project.api.make_api_call('record', type='flat', format='csv', rawOrLabel='label')
+    label_df = pd.read_csv(BytesIO(response.content))
+    expected_unmapped = project.check_unmapped_labels(label_df, label_columns)
+
+    server.requests.clear()
+    project.load_records(label_columns=label_columns)
+
+    pd.testing.assert_frame_equal(project.df[label_columns], label_df[label_columns])
+    assert project.outliers['unmapped_labels'] == expected_unmapped
+    assert set(project.df['consentimento'].dropna()) == {'Sim', 'Não'}
+    assert set(project.df['sintomas___2'].dropna()) == {'Checked', 'Unchecked'}
+    # Only the fields labelled by the server are exported again, as raw and as label
+    label_requests = server.requests[1:]
+    assert [request['rawOrLabel'] for request in label_requests] == ['raw', 'label']
+    assert all(request['fields'] == 'doenca_sql,consentimento,sintomas' for request in label_requests)
+
+
+def test_metadata_snapshot(server):
+    project = REDCapProject(server.url, 'token')
+    project.load_records()
+
+    snapshot = project.get_metadata_snapshot()
+    assert project.get_metadata_snapshot() is snapshot
+    assert snapshot['codebook'] is project.codebook
+    metadata = project.get_metadata()
+    assert metadata == snapshot.to_dict() and metadata is not snapshot.to_dict()
+    assert metadata['codebook'] == project.codebook.to_dict(orient='records')
+
+    # Changes to a returned dictionary, e.g. insert_one adding _id, don't leak into the next calls
+    metadata['_id'] = 'inserted'
+    metadata['codebook'][0]['field_label'] = 'Changed'
+    metadata['raw_label_map']['sexo']['1'] = 'Changed'
+    metadata['identifier_fields'].append('sexo')
+    assert project.get_metadata() == snapshot.to_dict() != metadata
+    assert project.raw_label_map['sexo']['1'] == 'Masculino' and project.identifier_fields == ['nome', 'cpf']
+
+    project.preprocess_forms()
+    assert project.get_metadata_snapshot() is not snapshot
+    assert project.get_metadata()['feature_map'] == project.feature_map
+
+    project.clean_data({'identificacao': {'remove_duplicates': {'column': 'cpf', 'drop': False}}})
+    assert project.forms['identificacao'].shape[0] == 20
+
+
+def test_clean_data_parallel(server):
+    instructions = {
+        'identificacao': {
+            'remove_incomplete_forms': None,
+            'remap_categorical_labels': None,
+            'normalize_string': {'columns': ['nome'], 'method': 'upper'},
+            'remove_duplicates': {'column': 'cpf', 'drop': False},
+        },
+        # No duplicates searched, the form outliers keep the initial (empty) duplicated_values
+        'seguimento': {
+            'remove_incomplete_forms': None,
+            'remap_categorical_labels': {'columns': ['desfecho']},
+            'enforce_dtype': {'dtype_map': {'Float64': ['altura'], 'datetime': ['data_seguimento']}},
+        },
+    }
+    # Same CPF for the records of each DAG: duplicates found in identificacao
+    records = server.project['record']
+    records['cpf'] = records['redcap_data_access_group'].where(records['cpf'].notna())
+    projects = []
+    for workers in [None, 2]:
+        project = REDCapProject(server.url, 'token')
+        project.load_records()
+        project.preprocess_forms({'remove_missing_datacodes': None,
+                                  'decode_checkbox': {'compact': True},
+                                  'subset_forms': None})
+        project.clean_data(instructions, workers=workers)
+        projects.append(project)
+    sequential, parallel = projects
+
+    for form_name in instructions:
+        pd.testing.assert_frame_equal(parallel.forms[form_name], sequential.forms[form_name])
+    assert parallel.outliers == sequential.outliers
+    assert list(sequential.outliers['duplicated_values']) == ['cpf']
+    assert parallel.checkbox_choices == sequential.checkbox_choices == {'sintomas': ['Febre', 'Dor', 'Tosse']}
+    # Form outliers are merged once
+    unverified = sequential.outliers['unverified_records']
+    assert len(unverified) == len(set(unverified))
+
+
+def test_update_outliers(server):
+    project = REDCapProject(server.url, 'token')
+    project.outliers = {'invalid_records': [], 'duplicated_values': {'cpf': {}}, 'flagged': None}
+
+    flagged = pd.DataFrame({'record_id': ['1']})
+    project.update_outliers({'invalid_records': ['1'], 'duplicated_values': [], 'flagged': flagged})
+    project.update_outliers({'invalid_records': ['2'], 'flagged': pd.DataFrame()})
+
+    assert project.outliers['invalid_records'] == ['1', '2']
+    assert project.outliers['duplicated_values'] == {'cpf': {}}
+    pd.testing.assert_frame_equal(project.outliers['flagged'], flagged)
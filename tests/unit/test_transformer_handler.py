@@ -0,0 +1,203 @@
+import random
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyredcap import DataCleaning
+from pyredcap.handlers.transformer_handler import TransformerHandler
+
+MAPPING = {'1': 'Febre', '2': 'Dor', '3': 'Tosse'}
+
+
+def test_replace_labels_matches_replace_label():
+    rng = np.random.default_rng(0)
+    choices = ['1', '2', '3', '4', np.nan, 'outro']
+    values = pd.Series(rng.choice(np.array(choices, dtype=object), 500), index=rng.permutation(1000)[:500])
+    expected = values.apply(partial(TransformerHandler.replace_label, mapping=MAPPING))
+    pd.testing.assert_series_equal(TransformerHandler.replace_labels(values, MAPPING), expected)
+
+    # Lists and arrays of decoded checkbox fields, mixed with scalars
+    values = pd.Series([np.array(['1', '3'], dtype=object), ['2'], np.nan, ['1', '9'], np.array(['9']), '2', []],
+                       dtype=object)
+    result = TransformerHandler.replace_labels(values, MAPPING)
+    expected = values.apply(partial(TransformerHandler.replace_label, mapping=MAPPING))
+    assert result.tolist()[:2] == expected.tolist()[:2] == [['Febre', 'Tosse'], ['Dor']]
+    assert np.isnan(result[2])
+    # Lists holding unmapped values are kept as is
+    assert result[3] is values[3] and result[4] is values[4]
+    assert result[5] == 'Dor' and result[6] == []
+
+    # Columns with no mapped value are inferred like Series.apply
+    values = pd.Series([np.nan, np.nan], dtype=object)
+    assert TransformerHandler.replace_labels(values, MAPPING).dtype == 'float64'
+
+
+def test_remap_categorical_labels():
+    df = pd.DataFrame({'sexo': [1.0, 2.0, np.nan, 3.0], 'tipo': ['a', 'b', 'a', 'c'],
+                       'sintomas': [['1', '2'], np.nan, ['3'], ['1']]})
+    metadata = {
+        'codebook': [], 'outliers': {},
+        'raw_label_map': {'sexo': {'1': 'Masculino', '2': 'Feminino'}, 'tipo': {'a': 'A', 'b': 'B', 'c': 'C'},
+                          'sintomas': MAPPING, 'missing': {'1': 'x'}},
+    }
+
+    data_cleaning = DataCleaning('form', df.copy(), metadata, {'remap_categorical_labels': None})
+    assert data_cleaning.df['sexo'].tolist()[:2] == ['Masculino', 'Feminino']
+    assert data_cleaning.df['sexo'].tolist()[3] == '3'
+    assert data_cleaning.df['sintomas'].tolist()[2] == ['Tosse']
+
+    data_cleaning = DataCleaning('form', df.copy(), metadata,
+                                 {'remap_categorical_labels': {'categorical': True}})
+    result = data_cleaning.df
+    assert result['tipo'].dtype == pd.CategoricalDtype(['A', 'B', 'C'])
+    # Unmapped values are added after the codebook labels
+    assert result['sexo'].cat.categories.tolist() == ['Masculino', 'Feminino', '3']
+    assert result['sexo'].tolist()[:2] == ['Masculino', 'Feminino']
+    assert result['sintomas'].dtype == object
+
+
+def test_replace_list_items_matches_replace_array_item():
+    df = pd.DataFrame({
+        'sintomas': [['Febre', 'Outro'], np.array(['OUTRO']), np.nan, ['Dor'], 'Outro', []],
+        'sintomas_outro': ['cefaleia', 'náusea', 'x', 'y', 'z', np.nan],
+    }, index=[5, 3, 8, 1, 0, 2])
+    expected = [TransformerHandler.replace_array_item(index, value, df, 'sintomas_outro', 'outro')
+                for index, value in df['sintomas'].items()]
+    result = TransformerHandler.replace_list_items(df['sintomas'], df['sintomas_outro'], 'outro')
+    assert result.index.equals(df.index)
+    assert result.iloc[:2].tolist() == expected[:2] == [['Febre', 'cefaleia'], ['náusea']]
+    assert result.iloc[3:].tolist() == expected[3:]
+    assert np.isnan(result.iloc[2])
+
+
+def test_replace_other_columns():
+    df = pd.DataFrame({
+        'record_id': ['R1', 'R2', 'R3'],
+        'sexo': ['1', '3', np.nan],
+        'sexo_outro': [np.nan, 'Não Binário', np.nan],
+        'sintomas': [['1', '9'], ['2'], np.nan],
+        'sintomas_outro': ['Cefaleia', np.nan, 1],
+    })
+    codebook = pd.DataFrame({
+        'field_name': ['sexo', 'sexo_outro', 'sintomas', 'sintomas_outro'],
+        'form_name': 'form',
+        'field_type': ['radio', 'text', 'checkbox', 'text'],
+        'branching_logic': ['', "[sexo] = '3'", '', "[sintomas(9)] = '1'"],
+    })
+    metadata = {'codebook': codebook, 'outliers': {},
+                'raw_label_map': {'sexo': {'1': 'Masculino', '3': 'Outro'},
+                                  'sintomas': {'1': 'Febre', '2': 'Dor', '9': 'Outro'}}}
+
+    data_cleaning = DataCleaning('form', df, metadata, {'replace_other_columns': {'search_str': 'outro'}})
+    result = data_cleaning.df
+    # Other values are the last codes of the fields
+    assert result['sexo'].tolist()[:2] == ['1', 'não binário']
+    assert result['sintomas'].tolist()[:2] == [['1', 'cefaleia'], ['2']]
+    assert result['sintomas_outro'].tolist() == ['cefaleia', np.nan, 1]
+
+
+def make_cpf(rng: random.Random) -> str:
+    digits = [rng.randrange(10) for _ in range(9)]
+    for weights in (range(10, 1, -1), range(11, 1, -1)):
+        digits.append(sum(a * b for a, b in zip(digits, weights)) * 10 % 11 % 10)
+    return ''.join(map(str, digits))
+
+
+def make_cns(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        # Valid about once in 11 tries
+        return rng.choice('789') + ''.join(str(rng.randrange(10)) for _ in range(14))
+    pis = rng.choice('12') + ''.join(str(rng.randrange(10)) for _ in range(10))
+    # Verification digit of the PIS, with the suffix for digit 10
+    product_sum = sum(int(digit) * (15 - i) for i, digit in enumerate(pis))
+    check_digit = (11 - product_sum % 11) % 11
+    if check_digit == 10:
+        return pis + '001' + str((11 - (product_sum + 2) % 11) % 11)
+    return pis + '000' + str(check_digit)
+
+
+def perturb(rng: random.Random, value: str) -> any:
+    """Valid identifiers, formatted, mistyped or truncated ones and unrelated values."""
+    return rng.choice([
+        value,
+        value,
+        value[:3] + '.' + value[3:6] + '.' + value[6:9] + '-' + value[9:],
+        value[:4] + str(rng.randrange(10)) + value[5:],
+        value[:-1],
+        value + '0',
+        ' ' + value,
+        value + ' ',
+        value[:5] + 'x' + value[6:],
+        value.replace('1', '\u0661'),  # Arabic-Indic digit one
+        int(value),
+        '',
+        'sem cpf',
+    ])
+
+
+def check_batch(values: list, batch, scalar):
+    values = pd.Series(values, index=np.arange(len(values))[::-1] * 2, dtype=object)
+    valid, normalized = batch(values)
+    assert valid.index.equals(values.index) and normalized.index.equals(values.index)
+    assert valid.tolist() == [scalar(value, return_value=False) for value in values]
+    expected = [scalar(value) for value in values]
+    assert [np.nan if pd.isna(value) else value for value in normalized] == \
+        [np.nan if pd.isna(value) else value for value in expected]
+    return valid
+
+
+def test_validate_batch_matches_scalar():
+    rng = random.Random(0)
+    cpf = [perturb(rng, make_cpf(rng)) for _ in range(3000)] + [np.nan, None, 12345678909.0]
+    # Values longer than ID_MAX_WIDTH
+    cpf += ['CPF informado pelo paciente na ficha: ' + make_cpf(rng) for _ in range(10)]
+    valid = check_batch(cpf, TransformerHandler.validate_cpf_batch, TransformerHandler.validate_cpf)
+    assert 0 < valid.sum() < len(cpf)
+
+    # The scalar function raises on values other than strings and on letters among the digits
+    cns = [value for value in (perturb(rng, make_cns(rng)) for _ in range(3000))
+           if isinstance(value, str) and 'x' not in value]
+    valid = check_batch(cns, TransformerHandler.validate_cns_batch, TransformerHandler.validate_cns)
+    assert 0 < valid.sum() < len(cns)
+
+
+SPLIT_PATTERNS = [
+    r'(?:CID-10|CID10)?\s*-\s*([A-Z]\d{2}(?:\.\d{1}|\.\d\+|\.\d\*|\d{3}[+*][^\s]+)?)(?=\s*-\s*|$)',
+    r'(?<=- )\d{6}(?= -|$)',
+    r'ORPHA\s*-\s*((?:\d{1,6}(?:\.\d)?(?:\s*-\s*\d{3,6}(?:\.\d)?)*)?)',
+]
+
+
+@pytest.mark.parametrize('pattern', SPLIT_PATTERNS)
+def test_extract_ids_and_descriptions_batch(pattern):
+    values = pd.Series([
+        'CID10 - Q87.4 - Síndrome de Marfan',
+        'CID-10  -   E75.2\t- Descrição   com   espaços ',
+        'CID10 - G71.0 - A - CID10 - G71.0 - repetido',
+        'OMIM - 154700 - Marfan - 154705',
+        '154700 - Síndrome de Marfan',
+        'ORPHA - 558 - Síndrome de Marfan',
+        'ORPHA - 558 - 2834 - Síndrome de Marfan',
+        'ORPHA - ',
+        'Sem código',
+        '',
+        np.nan,
+        10,
+    ], index=[3, 3, 1, 0, 5, 2, 8, 8, 4, 6, 7, 9], dtype=object)
+    strings = values[values.map(lambda x: isinstance(x, str))]
+    expected = strings.apply(TransformerHandler.extract_ids_and_descriptions, pattern=pattern).dropna()
+
+    result = TransformerHandler.extract_ids_and_descriptions_batch(values, pattern)
+    assert result.index.equals(expected.index)
+    assert result['code'].tolist() == [x[0].strip() for x in expected]
+    assert result['description'].tolist() == [x[1].strip() for x in expected]
+
+
+def test_extract_ids_and_descriptions_batch_groups():
+    values = pd.Series(['A - 01 - Febre'])
+    with pytest.raises(ValueError):
+        TransformerHandler.extract_ids_and_descriptions_batch(values, r'([A-Z]) - (\d{2})')
+    assert TransformerHandler.extract_ids_and_descriptions_batch(pd.Series([], dtype=object), r'\d').empty
+    assert TransformerHandler.extract_ids_and_descriptions_batch(pd.Series(['Febre', 1]), r'\d').empty